@@ -1,5 +1,4 @@
 from enum import Enum
-import numpy as np
 
 class Color(Enum):
     """Enum for the six possible colors of a Rubik's Cube
@@ -32,21 +31,13 @@ class Face(Enum):
     LEFT = 3    # Orange
     RIGHT = 2   # Red
 
+# Where every face starts in CubeState's 54 sticker buffer, row by row
+# Used in state.py and execution.py
+FACE_OFFSETS = {face: 9 * index for index, face in enumerate(Face)}
 
-# Color ranges in HSV
-# Used in camera.py for color detection
-COLOR_RANGES = {
-    Color.WHITE: (np.array([0, 0, 150]), np.array([180, 60, 255])),
-    Color.YELLOW: (np.array([20, 100, 100]), np.array([35, 255, 255])),
-    Color.RED: (np.array([0, 100, 100]), np.array([10, 255, 255])),  # Red also wraps around HSV
-    Color.ORANGE: (np.array([10, 100, 100]), np.array([25, 255, 255])),
-    Color.BLUE: (np.array([100, 100, 100]), np.array([130, 255, 255])),
-    Color.GREEN: (np.array([50, 100, 100]), np.array([70, 255, 255]))
-}
-
-# The second range for red (which wraps around the HSV scale)
-# Used in camera.py for red color detection
-RED_RANGE_2 = (np.array([170, 100, 100]), np.array([180, 255, 255]))
+# Buffer value of a sticker that hasn't been scanned yet (Color values are 0-6)
+# Used in state.py
+NO_COLOR = 255
 
 # Default DroidCam URL (can be configured via the UI)
 # Used in camera.py for camera initialization
@@ -1,17 +1,28 @@
+import numpy as np
+
 from .movements import rotate_face_counter_clockwise, rotate_face_clockwise
-from .constants import Face
+from .constants import Face, FACE_OFFSETS
+from .notation import LAYERS, codes_of, move_code, parse_move
 
-def apply_move(cube_state, move_str: str):
-    """Apply a move to the cube state"""
-    if not move_str:
+def apply_move(cube_state, move):
+    """Apply a move to the cube state, given as text (e.g. "R'") or as a move code"""
+    code = move_code(move)
+    if code is None:
+        return
+    stickers = cube_state.stickers
+    stickers[:] = stickers[MOVE_TABLES[code]]
+
+def apply_moves(cube_state, moves):
+    """Apply a sequence of moves, given as text or as move codes from notation.parse"""
+    stickers = cube_state.stickers
+    for code in codes_of(moves):
+        stickers[:] = stickers[MOVE_TABLES[code]]
+
+def _apply_move_to_grids(cube_state, move):
+    """Apply a move sticker by sticker to anything with a faces dict of 3x3 lists"""
+    face, modifier = parse_move(move)
+    if face is None:
         return
-        
-    # Parse the move
-    face = move_str[0]
-    if len(move_str) > 1:
-        modifier = move_str[1]
-    else:
-        modifier = ''
         
     # Get the face to rotate
     if face == 'F':
@@ -38,14 +49,10 @@ def apply_move(cube_state, move_str: str):
         # Middle layer move (between F and B)
         apply_middle_layer_move(cube_state, 'S', modifier)
         return
-    elif face == 'm':
-        # Cube rotation moves (mR, mL)
-        if len(move_str) >= 2:
-            cube_rotation_face = move_str[1]
-            apply_cube_rotation(cube_state, cube_rotation_face, modifier)
-            return
-        else:
-            raise ValueError(f"Invalid cube rotation move: {move_str}")
+    elif face == 'mR':
+        # Cube rotation moves (mR, mL), mL is parsed as mR'
+        apply_cube_rotation(cube_state, 'R', modifier)
+        return
     else:
         raise ValueError(f"Invalid face: {face}")
         
@@ -250,32 +257,32 @@ def apply_middle_layer_move(cube_state, move_type: str, modifier: str):
         # E = D U' (clockwise), E' = D' U (counter-clockwise)
         if modifier == "'":
             # E' (counter-clockwise) = D' U
-            apply_move(cube_state, "D'")
-            apply_move(cube_state, "U")
+            _apply_move_to_grids(cube_state, "D'")
+            _apply_move_to_grids(cube_state, "U")
         elif modifier == '2':
             # E2 = D2 U2
-            apply_move(cube_state, "D2")
-            apply_move(cube_state, "U2")
+            _apply_move_to_grids(cube_state, "D2")
+            _apply_move_to_grids(cube_state, "U2")
         else:
             # E (clockwise) = D U'
-            apply_move(cube_state, "D")
-            apply_move(cube_state, "U'")
+            _apply_move_to_grids(cube_state, "D")
+            _apply_move_to_grids(cube_state, "U'")
             
     elif move_type == 'S':
         # S move: middle layer between F and B
         # S = F B' (clockwise), S' = F' B (counter-clockwise)
         if modifier == "'":
             # S' (counter-clockwise) = F' B
-            apply_move(cube_state, "F'")
-            apply_move(cube_state, "B")
+            _apply_move_to_grids(cube_state, "F'")
+            _apply_move_to_grids(cube_state, "B")
         elif modifier == '2':
             # S2 = F2 B2
-            apply_move(cube_state, "F2")
-            apply_move(cube_state, "B2")
+            _apply_move_to_grids(cube_state, "F2")
+            _apply_move_to_grids(cube_state, "B2")
         else:
             # S (clockwise) = F B'
-            apply_move(cube_state, "F")
-            apply_move(cube_state, "B'") 
+            _apply_move_to_grids(cube_state, "F")
+            _apply_move_to_grids(cube_state, "B'") 
 
 def apply_cube_rotation(cube_state, rotation_face: str, modifier: str):
     """Apply cube rotation moves (mR, mL) - rotates the entire cube"""
@@ -342,4 +349,25 @@ def rotate_cube_around_vertical_axis(cube_state, clockwise: bool = True):
         
         # Rotate UP and DOWN faces 90 degrees counter-clockwise
         cube_state.faces[Face.UP] = rotate_face_clockwise(up)
-        cube_state.faces[Face.DOWN] = rotate_face_counter_clockwise(down) 
\ No newline at end of file
+        cube_state.faces[Face.DOWN] = rotate_face_counter_clockwise(down)
+
+
+class _LabeledGrids:
+    """Stand-in cube whose stickers are labeled with their own buffer position"""
+    def __init__(self):
+        self.faces = {face: [[FACE_OFFSETS[face] + 3 * row + col for col in range(3)] for row in range(3)]
+                      for face in Face}
+
+def _trace_move(code):
+    """Run a move on labeled stickers and read off where every sticker came from"""
+    grids = _LabeledGrids()
+    _apply_move_to_grids(grids, code)
+    table = np.zeros(54, dtype=np.intp)
+    for face in Face:
+        for row in range(3):
+            for col in range(3):
+                table[FACE_OFFSETS[face] + 3 * row + col] = grids.faces[face][row][col]
+    return table
+
+# For every move code: the new buffer takes stickers[MOVE_TABLES[code]]
+MOVE_TABLES = [_trace_move(code) for code in range(3 * len(LAYERS))]
@@ -0,0 +1,26 @@
+"""
+Verbosity switch for the cube and ui packages.
+
+Modules log through logging.getLogger(__name__), and the rubiks_cube solver
+logs under 'Cube'. The default is QUIET: per-solve messages are dropped by a
+level check before any formatting happens. DEBUG prints the cube state,
+moves and timings the bridge sends to and gets back from the solver.
+"""
+import logging
+
+QUIET = logging.WARNING
+INFO = logging.INFO
+DEBUG = logging.DEBUG
+
+LOGGERS = ('cube', 'ui', 'Cube')
+
+
+def set_verbosity(level=QUIET):
+    """Set the level of every application logger and attach a console handler when needed"""
+    for name in LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        if level < QUIET and not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
@@ -1,9 +1,81 @@
-def parse_move(move_str: str):
-    """Parse a move string and return the face and modifier"""
-    if not move_str:
+import os
+import re
+import sys
+from array import array
+from functools import lru_cache
+
+# Moves are read by the tokenizer in rubiks_cube, so both cube engines agree on
+# what a move string means and can share the parsed move codes
+rubiks_cube_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'rubiks_cube')
+if rubiks_cube_path not in sys.path:
+    sys.path.insert(0, rubiks_cube_path)
+
+try:
+    from Cube.notation import LAYERS, codes_of, inverse, move_name, names, parse  # noqa: E402
+except ImportError:
+    # Without rubiks_cube the moves are read here, into the same codes
+    LAYERS = ['U', 'L', 'F', 'R', 'B', 'D', 'M', 'E', 'S', 'mR']
+    _ROTATION = LAYERS.index('mR')
+    _SUFFIXES = {'': 1, '2': 2, "'": 3, '`': 3}
+    _CODES = {name + suffix: 3 * layer + turns - 1
+              for layer, name in enumerate(LAYERS) for suffix, turns in _SUFFIXES.items()}
+    _CODES.update({'mL' + suffix: 3 * _ROTATION + (-turns) % 4 - 1 for suffix, turns in _SUFFIXES.items()})
+    # Longest names first so R2 is read as one move and not as R and a stray 2
+    _TOKEN = re.compile('|'.join(re.escape(name) for name in sorted(_CODES, key=len, reverse=True)))
+    _SEPARATORS = re.compile(r'[\s,]*')
+
+    def move_name(code, mark="'"):
+        """Return the text of a move code"""
+        layer, turns = divmod(code, 3)
+        if layer == _ROTATION:
+            return ('mR', 'mR2', 'mL')[turns]
+        return LAYERS[layer] + ('', '2', mark)[turns]
+
+    def names(codes, mark="'"):
+        """Return a list with the text of every move in codes"""
+        return [move_name(code, mark) for code in codes]
+
+    @lru_cache(maxsize=1024)
+    def parse(sequence):
+        """Read a sequence of moves into an array('B') of move codes, shared between callers"""
+        codes = array('B')
+        pos = _SEPARATORS.match(sequence).end()
+        while pos < len(sequence):
+            match = _TOKEN.match(sequence, pos)
+            if match is None:
+                raise ValueError(f'unknown move {sequence[pos:].split()[0]!r}')
+            codes.append(_CODES[match.group()])
+            pos = _SEPARATORS.match(sequence, match.end()).end()
+        return codes
+
+    def inverse(code):
+        """Return the code of the move that undoes code"""
+        return code - code % 3 + 2 - code % 3
+
+    def codes_of(moves):
+        """Return the move codes of a sequence given as text or codes"""
+        return parse(moves) if isinstance(moves, str) else moves
+
+# (face, modifier) for every move code, mL is read as mR'
+MOVE_PARTS = [(LAYERS[code // 3], ('', '2', "'")[code % 3]) for code in range(3 * len(LAYERS))]
+
+
+def move_code(move):
+    """Return the move code of a single move given as text or as a code, None for an empty move"""
+    if move is None or move == '':
+        return None
+    if isinstance(move, str):
+        codes = parse(move)
+        if len(codes) != 1:
+            raise ValueError(f"Expected a single move, got {move!r}")
+        return codes[0]
+    return move
+
+
+def parse_move(move):
+    """Parse a move (text like "R'" or a move code) and return the face and modifier"""
+    code = move_code(move)
+    if code is None:
         return None, None
-        
-    face = move_str[0]
-    modifier = move_str[1] if len(move_str) > 1 else ''
-    
-    return face, modifier
+    return MOVE_PARTS[code]
@@ -1,6 +1,7 @@
 import sys
 import os
 import time
+import logging
 
 # Fix the path to correctly find rubiks_cube from MainThesis directory
 current_dir = os.path.dirname(os.path.abspath(__file__))  # cube/ directory
@@ -14,25 +15,47 @@ sys.path.insert(0, rubiks_cube_path)
 
 from .state import CubeState
 from .constants import Color, Face
+from .notation import inverse, names, parse
+
+logger = logging.getLogger(__name__)
 
 try:
-    from Cube.cube import Cube
+    from Cube.invariants import check
     from Cube.Solver.beginners.solver import solve_3x3
+    from Cube.Solver.budget import SolveCancelled, SolverStalled
+    from Cube.Solver.cache import SolutionCache
+    from Cube.Solver.profile import SolveStats
+    from Cube.Solver.twophase.solver import solve_3x3 as solve_3x3_twophase
+    SOLVERS = {"beginners": solve_3x3, "twophase": solve_3x3_twophase}
+    # Shared by every bridge, the app makes a new one per solve. Set RUBIKS_CUBE_SOLUTIONS
+    # to an SQLite file to keep the solutions between sessions. A cube scanned held another
+    # way round is the same entry
+    SOLUTION_CACHES = {name: SolutionCache(name, path=os.environ.get('RUBIKS_CUBE_SOLUTIONS'), symmetric=True)
+                       for name in SOLVERS}
     RUBIKS_CUBE_AVAILABLE = True
 except ImportError as e:
     RUBIKS_CUBE_AVAILABLE = False
-    print(f"Warning: rubiks_cube module not available: {e}")
-    print(f"Expected path: {rubiks_cube_path}")
-    print("To install: cd ../rubiks_cube && pip install -e .")
+    logger.warning("rubiks_cube module not available: %s (expected path: %s)", e, rubiks_cube_path)
+
+# get_state_at_step replays at most this many moves from a stored snapshot
+CHECKPOINT_INTERVAL = 16
 
 class RubiksCubeBridge:
     """Bridge between MainThesis cube state and rubiks_cube solver"""
     
-    def __init__(self):
+    def __init__(self, profile: bool = False):
+        """
+        Args:
+            profile: count the time, turns and sticker reads of every solver step in
+                     solve_stats, counting makes a solve a few percent slower
+        """
         # Timing variables for bridge-solver communication
         self.solver_send_time = None
         self.solver_receive_time = None
         self.solver_duration = None
+        self.profile = profile
+        self.cache_hit = False
+        self.solve_stats = None  # SolveStats of the last solve, None when not profiling or it came from the cache
         self.rubiks_cube_available = RUBIKS_CUBE_AVAILABLE
     
     def convert_to_rubiks_cube_format(self, cube_state: CubeState) -> str:
@@ -88,66 +111,76 @@ class RubiksCubeBridge:
         
         return result
     
-    def solve_with_rubiks_cube(self, cube_state: CubeState) -> tuple[str, dict]:
+    def solve_with_rubiks_cube(self, cube_state: CubeState, solver: str = "beginners",
+                               progress=None, cancel=None) -> tuple[str, dict]:
         """
         Solve the cube using the proven rubiks_cube solver
         
+        Args:
+            solver: "beginners" for the layer by layer method, "twophase" for
+                    short (about 20 move) solutions from Kociemba's algorithm
+            progress: called with (stage name, stage number, number of stages) as the solver goes,
+                      on the thread that solves
+            cancel: threading.Event that stops the solver with SolveCancelled when it is set
+        
         Returns:
             tuple: (solution_string, moves_by_step_dict)
         """
         if not self.rubiks_cube_available:
             raise ImportError("rubiks_cube module not available")
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver {solver!r}, expected one of {sorted(SOLVERS)}")
         
-        # DEBUG: Print the exact MainThesis cube state being sent
-        print("\nDEBUG: MainThesis Cube State Being Sent:")
-        for face in Face:
-            face_data = cube_state.get_face(face)
-            print(f"{face.name} face:")
-            for row_idx, row in enumerate(face_data):
-                row_colors = [cell.name if cell else 'None' for cell in row]
-                print(f"  Row {row_idx}: {row_colors}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("MainThesis cube state being sent:")
+            for face in Face:
+                face_data = cube_state.get_face(face)
+                logger.debug("%s face:", face.name)
+                for row_idx, row in enumerate(face_data):
+                    logger.debug("  Row %d: %s", row_idx, [cell.name if cell else 'None' for cell in row])
         
         # Convert to rubiks_cube format
         rubiks_cube_string = self.convert_to_rubiks_cube_format(cube_state)
+        logger.debug("load_cube string: %s (%d characters)", rubiks_cube_string, len(rubiks_cube_string))
         
-        # DEBUG: Print the complete load_cube string
-        print(f"Length: {len(rubiks_cube_string)} characters")
-        
-        # Create rubiks_cube instance
-        cube = Cube()
-        # Try load_cube first (bypasses complex mirroring logic)
-        try:
-            print(f"\nCalling cube.load_cube('{rubiks_cube_string}')...")
-            cube.load_cube(rubiks_cube_string)
-            print("\nUsed load_cube() method")
-        except Exception as e:
-            print(f"load_cube failed, trying load_scramble(): {e}")
-            print(f"Calling cube.load_scramble('{rubiks_cube_string}')...")
-            cube.load_scramble(rubiks_cube_string)
-            print("Used load_scramble() method")
+        # Turn impossible cubes away here, the solvers would search for a solution that isn't there
+        reason = check(rubiks_cube_string)
+        if reason:
+            raise ValueError(f"This cube can't be solved: {reason}")
         
-        # Try to solve using the proven beginner's method
-        print("Solving with proven rubiks_cube solver...")
-        print("About to call solve_3x3(cube)...")
+        # A state solved before is answered from the cache without building a Cube. A miss
+        # is solved by the cache, which solves the state as held the standard way and
+        # stores it once for every way round it can be scanned
+        cache = SOLUTION_CACHES[solver]
         
         # Record timing: Bridge sends data to solver
         self.solver_send_time = time.time()
-        print(f"BRIDGE → SOLVER: {time.strftime('%H:%M:%S', time.localtime(self.solver_send_time))}")
+        if debug:
+            logger.debug("BRIDGE → SOLVER: %s", time.strftime('%H:%M:%S', time.localtime(self.solver_send_time)))
+        
+        stats = SolveStats() if self.profile else None
+        self.cache_hit = True
+        
+        def solve_miss(cube, **kwargs):
+            # The cache only calls the solver when it has no solution
+            self.cache_hit = False
+            return SOLVERS[solver](cube, **kwargs)
         
         try:
-            print("Calling solve_3x3(cube) now...\n")
-            solution = solve_3x3(cube)
+            solution = cache.solve(rubiks_cube_string, solve_miss,
+                                   progress=progress, cancel=cancel, stats=stats)
+            self.solve_stats = None if self.cache_hit else stats
+            if self.cache_hit:
+                logger.debug("Solution cache hit (%s)", cache.stats())
             
             # Record timing: Bridge receives results from solver
             self.solver_receive_time = time.time()
             self.solver_duration = self.solver_receive_time - self.solver_send_time
-            print(f"SOLVER → BRIDGE: {time.strftime('%H:%M:%S', time.localtime(self.solver_receive_time))}")
-            print(f"SOLVER DURATION: {self.solver_duration:.3f} seconds")
-            
-            print(f"\nRaw solution: {solution}")
-            print(f"Solver returned, processing solution...")
-            
-            print(f" Complete solution: {solution}")
+            if debug:
+                logger.debug("SOLVER → BRIDGE: %s", time.strftime('%H:%M:%S', time.localtime(self.solver_receive_time)))
+                logger.debug("SOLVER DURATION: %.3f seconds", self.solver_duration)
+                logger.debug("Raw solution: %s", solution)
             
             if isinstance(solution, tuple) and len(solution) >= 2:
                 # Extract the solution string and moves by step
@@ -162,30 +195,21 @@ class RubiksCubeBridge:
                     if isinstance(moves, str):
                         moves_by_step[step_name] = moves.replace('`', "'")
                 
-                print(f" Solution string: {solution_str}")
-                print(f"Moves by step: {moves_by_step}")
-                
-                # DEBUG: Check if moves_by_step contains the same moves as solution_str
-                all_moves_from_steps = []
-                for step_name, moves in moves_by_step.items():
-                    if isinstance(moves, str) and moves.strip():
-                        step_moves = moves.split()
-                        all_moves_from_steps.extend(step_moves)
-                        print(f"  {step_name}: {step_moves}")
-                
                 # CRITICAL: Use the original moves from steps for navigation, not the optimized solution
-                print("Using original moves from steps")
-                navigation_moves = all_moves_from_steps
+                navigation_moves = ' '.join(moves for moves in moves_by_step.values() if isinstance(moves, str))
                 
-                # Store the solution for navigation
-                self.solution_moves = navigation_moves
+                # Store the solution for navigation, parsed once into move codes
+                self.solution_moves = parse(navigation_moves)
                 self.original_cube_state = cube_state.copy()
                 self.moves_by_step = moves_by_step  # Store for UI access
+                self._build_checkpoints()
                 
-                print(f"Final navigation moves: {self.solution_moves}")
-                print(f"Total navigation moves: {len(self.solution_moves)}")
+                if debug:
+                    logger.debug("Solution string: %s", solution_str)
+                    for step_name, moves in moves_by_step.items():
+                        logger.debug("  %s: %s", step_name, moves)
+                    logger.debug("Total navigation moves: %d", len(self.solution_moves))
                 
-                print("About to return from bridge...")
                 return solution_str, moves_by_step
             else:
                 # Fallback if solution format is unexpected
@@ -193,35 +217,33 @@ class RubiksCubeBridge:
                 
                 # Replace backticks with apostrophes for proper notation
                 solution_str = solution_str.replace('`', "'")
-                
-                print(f" Total moves: " + " ".join(solution_str.split()))
+                logger.debug("Total moves: %s", solution_str)
                 
                 # Store the solution for navigation
-                self.solution_moves = solution_str.split() if solution_str else []
+                self.solution_moves = parse(solution_str)
                 self.original_cube_state = cube_state.copy()
                 self.moves_by_step = {} # No moves_by_step for fallback
+                self._build_checkpoints()
                 
-                print("About to return from bridge...")
                 return solution_str, {"Complete Solution": solution_str}
+
+        except (SolveCancelled, ValueError):
+            # Cancelled by the user, or the solver turned the cube away (it can't solve
+            # a cube whose centers were turned out of place), the caller reports both
+            raise
+
+        except SolverStalled as e:
+            self.solver_receive_time = time.time()
+            self.solver_duration = self.solver_receive_time - self.solver_send_time
+            logger.warning("rubiks_cube solver stalled after %.3f seconds: %s", self.solver_duration, e)
+            raise ValueError(f"The solver got stuck at the {e.stage} step, check the scanned colors") from e
             
-        except Exception as e:
+        except Exception:
             # Record timing: Bridge receives error from solver
             self.solver_receive_time = time.time()
             self.solver_duration = self.solver_receive_time - self.solver_send_time
-            print(f"⏰ SOLVER → BRIDGE (ERROR): {time.strftime('%H:%M:%S', time.localtime(self.solver_receive_time))}")
-            print(f"⏱️  SOLVER DURATION (ERROR): {self.solver_duration:.3f} seconds")
-            
-            print(f"rubiks_cube solver failed with error: {e}")
-            print(f"Error type: {type(e).__name__}")
-            import traceback
-            print(f"Full traceback:")
-            traceback.print_exc()
-            print("This is a known bug in the rubiks_cube library at PLL Step 1.")
-            print("Providing intelligent fallback solution...")
-            
-            # The solver got through most steps, so we can provide a better fallback
-            # that completes the solving process
-            return self._provide_intelligent_fallback_solution(cube_state, e)
+            logger.exception("rubiks_cube solver failed after %.3f seconds", self.solver_duration)
+            raise
     
     def get_timing_info(self) -> dict:
         """
@@ -234,6 +256,8 @@ class RubiksCubeBridge:
             'solver_send_time': self.solver_send_time,
             'solver_receive_time': self.solver_receive_time,
             'solver_duration': self.solver_duration,
+            'cache_hit': self.cache_hit,
+            'solve_stats': self.solve_stats.as_dict() if self.solve_stats else None,
             'solver_send_formatted': time.strftime('%H:%M:%S', time.localtime(self.solver_send_time)) if self.solver_send_time else None,
             'solver_receive_formatted': time.strftime('%H:%M:%S', time.localtime(self.solver_receive_time)) if self.solver_receive_time else None,
             'duration_formatted': f"{self.solver_duration:.3f} seconds" if self.solver_duration else None
@@ -255,21 +279,38 @@ class RubiksCubeBridge:
         if step < 0 or step > len(self.solution_moves):
             raise ValueError(f"Step {step} is out of range. Available steps: 0-{len(self.solution_moves)}")
         
-        # Start with the original cube state
-        current_state = self.original_cube_state.copy()
-        
-        # Apply moves up to the specified step
-        for i in range(step):
-            if i < len(self.solution_moves):
-                move = self.solution_moves[i]
-                current_state.move(move)
+        # Next/Previous only move one step away from the last state handed out
+        cursor_step, cursor_state = self._cursor
+        if step == cursor_step:
+            current_state = cursor_state.copy()
+        elif step == cursor_step + 1:
+            current_state = cursor_state.copy()
+            current_state.move(self.solution_moves[cursor_step])
+        elif step == cursor_step - 1:
+            current_state = cursor_state.copy()
+            current_state.move(inverse(self.solution_moves[step]))
+        else:
+            # Jumps start from the closest snapshot at or before the step
+            checkpoint = step // CHECKPOINT_INTERVAL
+            current_state = self._checkpoints[checkpoint].copy()
+            current_state.sequence(self.solution_moves[checkpoint * CHECKPOINT_INTERVAL:step])
         
+        self._cursor = (step, current_state.copy())
         return current_state
     
+    def _build_checkpoints(self):
+        """Snapshot the cube every CHECKPOINT_INTERVAL moves of the solution"""
+        state = self.original_cube_state.copy()
+        self._checkpoints = [state.copy()]
+        for end in range(CHECKPOINT_INTERVAL, len(self.solution_moves) + 1, CHECKPOINT_INTERVAL):
+            state.sequence(self.solution_moves[end - CHECKPOINT_INTERVAL:end])
+            self._checkpoints.append(state.copy())
+        self._cursor = (0, self._checkpoints[0])
+    
     @property
     def solution_steps(self):
         """Get the solution moves as a list"""
-        return getattr(self, 'solution_moves', [])
+        return names(getattr(self, 'solution_moves', []))
     
     def _provide_fallback_solution(self, cube_state: CubeState) -> tuple[str, dict]:
         """
@@ -277,8 +318,6 @@ class RubiksCubeBridge:
         
         This uses basic algorithms that should work for most cube states
         """
-        print("Generating fallback solution...")
-        
         # Basic fallback solution - this is a simplified approach
         # In practice, you might want to implement a more sophisticated fallback
         
@@ -294,7 +333,6 @@ class RubiksCubeBridge:
             "PLL Step 2": "M2 U M2 U2 M2 U M2"
         }
         
-        print("Fallback solution generated")
         return fallback_solution, moves_by_step
     
     def _parse_solution_into_steps(self, solution: str) -> dict:
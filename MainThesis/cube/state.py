@@ -1,61 +1,196 @@
-from typing import Dict, List
-from .constants import Color, Face
-from .execution import apply_move
+import logging
+from collections import Counter
+from typing import List
+import numpy as np
+from .constants import Color, Face, FACE_OFFSETS, NO_COLOR
+from .execution import apply_move, apply_moves
+
+logger = logging.getLogger(__name__)
+
+# Colors of a solved cube, face by face
+SOLVED_COLORS = {
+    Face.UP: Color.WHITE,
+    Face.DOWN: Color.YELLOW,
+    Face.FRONT: Color.GREEN,
+    Face.BACK: Color.BLUE,
+    Face.LEFT: Color.ORANGE,
+    Face.RIGHT: Color.RED,
+}
+
+# Buffer value -> Color (None for stickers that haven't been scanned)
+_DECODE = [None] * 256
+for _color in Color:
+    _DECODE[_color.value] = _color
+
+# Buffer value -> letter used by as_string, "?" for anything else
+_LETTERS = bytearray(b'?' * 256)
+for _color, _letter in {Color.WHITE: 'W', Color.YELLOW: 'Y', Color.RED: 'R',
+                        Color.ORANGE: 'O', Color.BLUE: 'B', Color.GREEN: 'G'}.items():
+    _LETTERS[_color.value] = ord(_letter)
+_LETTERS = bytes(_LETTERS)
+
+# Buffer positions in the order as_string writes the faces
+_STRING_ORDER = np.concatenate([np.arange(FACE_OFFSETS[face], FACE_OFFSETS[face] + 9)
+                                for face in [Face.UP, Face.RIGHT, Face.FRONT, Face.DOWN, Face.LEFT, Face.BACK]])
+
+
+def _encode(color) -> int:
+    return NO_COLOR if color is None else color.value
+
+
+def _solved_stickers():
+    stickers = np.empty(54, dtype=np.uint8)
+    for face, color in SOLVED_COLORS.items():
+        stickers[FACE_OFFSETS[face]:FACE_OFFSETS[face] + 9] = color.value
+    return stickers
+
+
+_SOLVED = _solved_stickers()
+
+
+class RowView:
+    """One row of a face, reads and writes go straight to the sticker buffer"""
+    __slots__ = ('stickers', 'start')
+
+    def __init__(self, stickers, start):
+        self.stickers = stickers
+        self.start = start
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[i] for i in range(3)[col]]
+        if not -3 <= col < 3:
+            raise IndexError("row index out of range")
+        return _DECODE[self.stickers[self.start + col % 3]]
+
+    def __setitem__(self, col, color):
+        if not -3 <= col < 3:
+            raise IndexError("row index out of range")
+        self.stickers[self.start + col % 3] = _encode(color)
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter([_DECODE[value] for value in self.stickers[self.start:self.start + 3]])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self) -> List[Color]:
+        return list(self)
+
+
+class FaceView:
+    """A face as a 3x3 grid, reads and writes go straight to the sticker buffer"""
+    __slots__ = ('stickers', 'start')
+
+    def __init__(self, stickers, start):
+        self.stickers = stickers
+        self.start = start
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(3)[row]]
+        if not -3 <= row < 3:
+            raise IndexError("face index out of range")
+        return RowView(self.stickers, self.start + 3 * (row % 3))
+
+    def __setitem__(self, row, colors):
+        if not -3 <= row < 3:
+            raise IndexError("face index out of range")
+        start = self.start + 3 * (row % 3)
+        self.stickers[start:start + 3] = [_encode(color) for color in colors]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter([RowView(self.stickers, self.start + 3 * row) for row in range(3)])
+
+    def __eq__(self, other):
+        return self.copy() == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self) -> List[List[Color]]:
+        return [list(row) for row in self]
+
+
+class FaceMap:
+    """Dict-like access to all six faces as FaceViews"""
+    __slots__ = ('state',)
+
+    def __init__(self, state):
+        self.state = state
+
+    def __getitem__(self, face: Face) -> FaceView:
+        return self.state.get_face(face)
+
+    def __setitem__(self, face: Face, colors):
+        self.state.set_face(face, colors)
+
+    def __iter__(self):
+        return iter(Face)
+
+    def __len__(self):
+        return len(Face)
+
+    def __eq__(self, other):
+        return all(self[face] == other[face] for face in Face)
+
+    def keys(self):
+        return list(Face)
+
+    def values(self):
+        return [self[face] for face in Face]
+
+    def items(self):
+        return [(face, self[face]) for face in Face]
+
 
 class CubeState:
-    """Represents the current state of the Rubik's Cube"""
+    """Represents the current state of the Rubik's Cube
+
+    All 54 stickers live in one uint8 buffer, face by face in FACE_OFFSETS
+    order and row by row inside a face. A sticker holds its Color value or
+    NO_COLOR until it has been scanned.
+    """
     def __init__(self):
-        # Initialize cube with None values (unknown)
-        self.faces = {face: [[None for _ in range(3)] for _ in range(3)] for face in Face}
-        
+        # Initialize cube with unknown stickers
+        self.stickers = np.full(54, NO_COLOR, dtype=np.uint8)
+
+    @property
+    def faces(self) -> FaceMap:
+        """The faces as 3x3 views, kept for code that indexes faces[face][row][col]"""
+        return FaceMap(self)
+
     def set_face(self, face: Face, colors: List[List[Color]]):
         """Set the colors for a specific face"""
-        self.faces[face] = colors
-        
-    def get_face(self, face: Face) -> List[List[Color]]:
-        """Get the colors for a specific face"""
-        return self.faces[face]
-    
+        start = FACE_OFFSETS[face]
+        self.stickers[start:start + 9] = [_encode(color) for row in colors for color in row]
+
+    def get_face(self, face: Face) -> FaceView:
+        """Get the colors for a specific face, as a view that writes back into the cube"""
+        return FaceView(self.stickers, FACE_OFFSETS[face])
+
     def is_complete(self) -> bool:
         """Check if all faces have been scanned"""
-        for face in Face:
-            if any(None in row for row in self.faces[face]):
-                return False
-        return True
-    
+        return not (self.stickers == NO_COLOR).any()
+
     def as_string(self) -> str:
         """Convert the cube state to a string representation for the solver"""
-        result = ""
-        for face in [Face.UP, Face.RIGHT, Face.FRONT, Face.DOWN, Face.LEFT, Face.BACK]:
-            for row in self.faces[face]:
-                for cell in row:
-                    if cell == Color.WHITE:
-                        result += "W"
-                    elif cell == Color.YELLOW:
-                        result += "Y"
-                    elif cell == Color.RED:
-                        result += "R"
-                    elif cell == Color.ORANGE:
-                        result += "O"
-                    elif cell == Color.BLUE:
-                        result += "B"
-                    elif cell == Color.GREEN:
-                        result += "G"
-                    else:
-                        result += "?"
-        return result
-    
+        return self.stickers[_STRING_ORDER].tobytes().translate(_LETTERS).decode()
+
     def color_count(self):
         """Count the number of each color on the cube"""
-        from collections import Counter
-        counts = Counter()
-        for face in Face:
-            for row in self.faces[face]:
-                for cell in row:
-                    if cell is not None:
-                        counts[cell] += 1
-        return counts
-    
+        counts = np.bincount(self.stickers, minlength=256)
+        return Counter({color: int(counts[color.value]) for color in Color if counts[color.value]})
+
     def is_valid(self) -> bool:
         """Check if the cube state is valid (has exactly 9 of each color)"""
         counts = self.color_count()
@@ -63,139 +198,35 @@ class CubeState:
         for color in Color:
             if color != Color.UNKNOWN:
                 if counts[color] != 9:
-                    print(f"Invalid cube: {color.name} has {counts[color]} squares (should be 9)")
+                    logger.info("Invalid cube: %s has %d squares (should be 9)", color.name, counts[color])
                     return False
         return True
-    
+
     def reset_face(self, face: Face):
         """Reset a specific face to unknown state"""
-        self.faces[face] = [[None for _ in range(3)] for _ in range(3)]
-        
+        start = FACE_OFFSETS[face]
+        self.stickers[start:start + 9] = NO_COLOR
+
     def copy(self) -> 'CubeState':
-        """Create a deep copy of the cube state"""
-        new_state = CubeState()
-        for face in Face:
-            new_state.faces[face] = [row[:] for row in self.faces[face]]
+        """Create a copy of the cube state"""
+        new_state = CubeState.__new__(CubeState)
+        new_state.stickers = self.stickers.copy()
         return new_state
-        
-    def move(self, move_str: str):
-        """Perform a cube move (F, R, U, L, D, B and their inverses/double turns)"""
-        apply_move(self, move_str)
-    
+
+    def move(self, move):
+        """Perform a cube move (F, R, U, L, D, B and their inverses/double turns), as text or a move code"""
+        apply_move(self, move)
+
+    def sequence(self, moves):
+        """Perform a sequence of moves, as text or move codes from notation.parse"""
+        apply_moves(self, moves)
+
     def set_solved(self):
         """Set the cube to a solved state."""
-        color_map = {
-            Face.UP: Color.WHITE,
-            Face.DOWN: Color.YELLOW,
-            Face.FRONT: Color.GREEN,
-            Face.BACK: Color.BLUE,
-            Face.LEFT: Color.ORANGE,
-            Face.RIGHT: Color.RED,
-        }
-        for face, color in color_map.items():
-            # Create a proper 3x3 grid with 9 squares of the same color
-            self.faces[face] = []
-            for row in range(3):
-                face_row = []
-                for col in range(3):
-                    face_row.append(color)
-                self.faces[face].append(face_row)
-    
+        self.stickers[:] = _SOLVED
+
     def is_solved(self) -> bool:
         """Check if the cube is in a solved state (all faces have uniform colors)"""
-        # Define the expected solved state
-        solved_colors = {
-            Face.UP: Color.WHITE,
-            Face.DOWN: Color.YELLOW,
-            Face.FRONT: Color.GREEN,
-            Face.BACK: Color.BLUE,
-            Face.LEFT: Color.ORANGE,
-            Face.RIGHT: Color.RED,
-        }
-        
-        # Check each face
-        for face, expected_color in solved_colors.items():
-            face_data = self.faces[face]
-            for row in face_data:
-                for cell in row:
-                    if cell != expected_color:
-                        return False
-        return True
-    
-    def _rotate_adjacent(self, face: Face, clockwise: bool):
-        # Update adjacent edge/corner stickers for F, R, U, L, D faces
-        if face == Face.FRONT:
-            if clockwise:
-                temp = [self.faces[Face.UP][2][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][2][i] = self.faces[Face.LEFT][2-i][2]
-                    self.faces[Face.LEFT][2-i][2] = self.faces[Face.DOWN][0][2-i]
-                    self.faces[Face.DOWN][0][2-i] = self.faces[Face.RIGHT][i][0]
-                    self.faces[Face.RIGHT][i][0] = temp[i]
-            else:
-                temp = [self.faces[Face.UP][2][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][2][i] = self.faces[Face.RIGHT][i][0]
-                    self.faces[Face.RIGHT][i][0] = self.faces[Face.DOWN][0][2-i]
-                    self.faces[Face.DOWN][0][2-i] = self.faces[Face.LEFT][2-i][2]
-                    self.faces[Face.LEFT][2-i][2] = temp[i]
-        elif face == Face.RIGHT:
-            if clockwise:
-                temp = [self.faces[Face.UP][i][2] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][i][2] = self.faces[Face.FRONT][i][2]
-                    self.faces[Face.FRONT][i][2] = self.faces[Face.DOWN][i][2]
-                    self.faces[Face.DOWN][i][2] = self.faces[Face.BACK][2-i][0]
-                    self.faces[Face.BACK][2-i][0] = temp[i]
-            else:
-                temp = [self.faces[Face.UP][i][2] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][i][2] = self.faces[Face.BACK][2-i][0]
-                    self.faces[Face.BACK][2-i][0] = self.faces[Face.DOWN][i][2]
-                    self.faces[Face.DOWN][i][2] = self.faces[Face.FRONT][i][2]
-                    self.faces[Face.FRONT][i][2] = temp[i]
-        elif face == Face.UP:
-            if clockwise:
-                temp = [self.faces[Face.FRONT][0][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.FRONT][0][i] = self.faces[Face.RIGHT][0][i]
-                    self.faces[Face.RIGHT][0][i] = self.faces[Face.BACK][0][i]
-                    self.faces[Face.BACK][0][i] = self.faces[Face.LEFT][0][i]
-                    self.faces[Face.LEFT][0][i] = temp[i]
-            else:
-                temp = [self.faces[Face.FRONT][0][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.FRONT][0][i] = self.faces[Face.LEFT][0][i]
-                    self.faces[Face.LEFT][0][i] = self.faces[Face.BACK][0][i]
-                    self.faces[Face.BACK][0][i] = self.faces[Face.RIGHT][0][i]
-                    self.faces[Face.RIGHT][0][i] = temp[i]
-        elif face == Face.LEFT:
-            if clockwise:
-                temp = [self.faces[Face.UP][i][0] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][i][0] = self.faces[Face.BACK][2-i][2]
-                    self.faces[Face.BACK][2-i][2] = self.faces[Face.DOWN][i][0]
-                    self.faces[Face.DOWN][i][0] = self.faces[Face.FRONT][i][0]
-                    self.faces[Face.FRONT][i][0] = temp[i]
-            else:
-                temp = [self.faces[Face.UP][i][0] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.UP][i][0] = self.faces[Face.FRONT][i][0]
-                    self.faces[Face.FRONT][i][0] = self.faces[Face.DOWN][i][0]
-                    self.faces[Face.DOWN][i][0] = self.faces[Face.BACK][2-i][2]
-                    self.faces[Face.BACK][2-i][2] = temp[i]
-        elif face == Face.DOWN:
-            if clockwise:
-                temp = [self.faces[Face.FRONT][2][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.FRONT][2][i] = self.faces[Face.LEFT][2][i]
-                    self.faces[Face.LEFT][2][i] = self.faces[Face.BACK][2][i]
-                    self.faces[Face.BACK][2][i] = self.faces[Face.RIGHT][2][i]
-                    self.faces[Face.RIGHT][2][i] = temp[i]
-            else:
-                temp = [self.faces[Face.FRONT][2][i] for i in range(3)]
-                for i in range(3):
-                    self.faces[Face.FRONT][2][i] = self.faces[Face.RIGHT][2][i]
-                    self.faces[Face.RIGHT][2][i] = self.faces[Face.BACK][2][i]
-                    self.faces[Face.BACK][2][i] = self.faces[Face.LEFT][2][i]
-                    self.faces[Face.LEFT][2][i] = temp[i] 
\ No newline at end of file
+        # A cube scanned held another way round is solved with other colors on the faces
+        faces = self.stickers.reshape(6, 9)
+        return bool((faces == faces[:, :1]).all() and (faces[:, 0] != NO_COLOR).all())
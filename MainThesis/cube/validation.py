@@ -0,0 +1,237 @@
+"""
+Whole-cube checks for scanned states and automatic correction of misread stickers.
+
+A scan with nine stickers of every color can still be no cube at all. The
+stickers of every corner and edge position must belong to a real piece, every
+piece must be there once, and the corner twists, the edge flips and the
+parities of both permutations must add up the way turning a cube keeps them.
+
+correct() looks for the valid cube that is most likely given how sure the
+camera was of every sticker. It assigns a piece and an orientation to every
+corner and edge position with a branch and bound search. Each choice costs
+what it takes to recolor the stickers that don't match it, so a good scan is
+settled at once and only the doubtful positions are searched.
+"""
+import logging
+import math
+from typing import Dict, List, NamedTuple, Optional, Union
+import numpy as np
+from .constants import Color, Face, FACE_OFFSETS, NO_COLOR
+from .notation import rubiks_cube_path  # noqa: F401, puts rubiks_cube on sys.path
+from .state import CubeState
+
+logger = logging.getLogger(__name__)
+
+try:
+    from Cube.invariants import CORNER_READINGS, EDGE_READINGS  # noqa: E402
+    from Cube.pieces import (CENTER_SLOTS, CORNER_NAMES, CORNER_SLOTS, EDGE_NAMES, EDGE_SLOTS,  # noqa: E402
+                             FACES, parity)
+    PIECES_AVAILABLE = True
+except ImportError as e:
+    # Without the piece tables of rubiks_cube only the sticker counts are checked and nothing is corrected
+    PIECES_AVAILABLE = False
+    logger.warning("rubiks_cube piece tables not available, scans are only partly checked: %s", e)
+
+# Faces in the order rubiks_cube numbers its slots, as sent by RubiksCubeBridge
+_SLOT_FACES = [Face.UP, Face.LEFT, Face.FRONT, Face.RIGHT, Face.BACK, Face.DOWN]
+
+# Give up and keep the best cube found after this many search steps
+MAX_NODES = 200000
+
+# Stickers at least this sure are never changed
+LOCKED = 0.999
+
+
+def _index(slot: int) -> int:
+    """CubeState buffer index of a rubiks_cube slot"""
+    return FACE_OFFSETS[_SLOT_FACES[slot // 9]] + slot % 9
+
+
+if PIECES_AVAILABLE:
+    CORNER_INDICES = [tuple(_index(slot) for slot in slots) for slots in CORNER_SLOTS]
+    EDGE_INDICES = [tuple(_index(slot) for slot in slots) for slots in EDGE_SLOTS]
+    CENTER_INDICES = [_index(slot) for slot in CENTER_SLOTS]
+
+class Correction(NamedTuple):
+    face: Face
+    row: int
+    col: int
+    old: Optional[Color]
+    new: Color
+
+
+def _locate(index: int):
+    """(face, row, col) of a CubeState buffer index"""
+    face = next(face for face in Face if FACE_OFFSETS[face] <= index < FACE_OFFSETS[face] + 9)
+    row, col = divmod(index - FACE_OFFSETS[face], 3)
+    return face, row, col
+
+
+def _position_name(index: int) -> str:
+    face, row, col = _locate(index)
+    return f"{face.name} row {row + 1} column {col + 1}"
+
+
+def find_problems(state: CubeState) -> List[str]:
+    """
+    Check that the state is a cube that can be solved
+
+    Returns:
+        list: what is wrong, empty if the state is a valid cube
+    """
+    stickers = state.stickers
+    if (stickers == NO_COLOR).any() or (stickers == Color.UNKNOWN.value).any():
+        return ["Not every sticker has a color"]
+    counts = np.bincount(stickers, minlength=len(Color))
+    problems = [f"{color.name} has {counts[color.value]} stickers (should be 9)"
+                for color in Color if color != Color.UNKNOWN and counts[color.value] != 9]
+    if problems or not PIECES_AVAILABLE:
+        return problems
+    face_of = {int(stickers[index]): face for index, face in zip(CENTER_INDICES, FACES)}
+    if len(face_of) != 6:
+        return ["The centers must all have different colors"]
+
+    def read(indices, readings, kind):
+        pieces, orientations = [], []
+        for indices_at in indices:
+            faces = ''.join(face_of[int(stickers[index])] for index in indices_at)
+            if faces not in readings:
+                colors = '/'.join(Color(int(stickers[index])).name for index in indices_at)
+                problems.append(f"The {kind} at {_position_name(indices_at[0])} is {colors}, no {kind} has these colors")
+                continue
+            piece, orientation = readings[faces]
+            pieces.append(piece)
+            orientations.append(orientation)
+        return pieces, orientations
+
+    corners, twists = read(CORNER_INDICES, CORNER_READINGS, "corner")
+    edges, flips = read(EDGE_INDICES, EDGE_READINGS, "edge")
+    if problems:
+        return problems
+    if len(set(corners)) != len(corners):
+        problems.append("A corner appears twice")
+    if len(set(edges)) != len(edges):
+        problems.append("An edge appears twice")
+    if problems:
+        return problems
+    if sum(twists) % 3:
+        problems.append("A corner is twisted")
+    if sum(flips) % 2:
+        problems.append("An edge is flipped")
+    if parity(corners) != parity(edges):
+        problems.append("Two pieces are swapped")
+    return problems
+
+
+def _change_cost(confidence: float) -> float:
+    """Cost of deciding a sticker was misread: -log of how much less likely that is than a good read"""
+    if confidence >= LOCKED:
+        return math.inf
+    # A misread sticker is equally likely to really be any of the other five colors
+    return max(0.0, math.log(5 * confidence / (1 - confidence)))
+
+
+def _options(stickers, costs, indices, names, colors_of, orientations):
+    """Every (cost, piece, orientation, colors) a position could hold, cheapest first, impossible ones left out"""
+    options = []
+    for piece, name in enumerate(names):
+        for orientation in range(orientations):
+            if len(name) == 3:
+                faces = name[-orientation:] + name[:-orientation] if orientation else name
+            else:
+                faces = name[::-1] if orientation else name
+            colors = [colors_of[face] for face in faces]
+            cost = sum(costs[index] for index, color in zip(indices, colors) if stickers[index] != color)
+            if cost < math.inf:
+                options.append((cost, piece, orientation, colors))
+    options.sort(key=lambda option: option[0])
+    return options
+
+
+def correct(state: CubeState, confidence: Union[Dict[Face, np.ndarray], np.ndarray]) -> Optional[List[Correction]]:
+    """
+    Find the most likely valid cube for a scan
+
+    Args:
+        state: the scanned cube, the centers are taken as they are
+        confidence: how sure the camera was of every sticker, 3x3 per face or 54 values in buffer order;
+                    stickers at least LOCKED sure are never changed, unscanned and UNKNOWN stickers are free to fill
+
+    Returns:
+        list: the stickers to change (empty if the scan is already valid), None if no valid cube is close enough
+              or the piece tables of rubiks_cube aren't available
+    """
+    if not PIECES_AVAILABLE:
+        return None
+    if isinstance(confidence, dict):
+        confidence = np.concatenate([np.asarray(confidence[face], dtype=float).reshape(9) for face in Face])
+    stickers = [int(value) for value in state.stickers]
+    costs = [0.0 if value in (NO_COLOR, Color.UNKNOWN.value) else _change_cost(float(c))
+             for value, c in zip(stickers, confidence)]
+
+    colors_of = {face: stickers[index] for index, face in zip(CENTER_INDICES, FACES)}
+    if len(set(colors_of.values())) != 6 or any(c in (NO_COLOR, Color.UNKNOWN.value) for c in colors_of.values()):
+        logger.info("Can't correct a cube without six different centers")
+        return None
+
+    positions = [(indices, _options(stickers, costs, indices, CORNER_NAMES, colors_of, 3), True)
+                 for indices in CORNER_INDICES]
+    positions += [(indices, _options(stickers, costs, indices, EDGE_NAMES, colors_of, 2), False)
+                  for indices in EDGE_INDICES]
+    if any(not options for _, options, _ in positions):
+        return None
+    # Settle the positions with one clearly cheapest piece first, they hardly branch
+    order = sorted(range(len(positions)), key=lambda i: (positions[i][1][0][0], len(positions[i][1])))
+    rest = [0.0] * (len(order) + 1)
+    for depth in range(len(order) - 1, -1, -1):
+        rest[depth] = rest[depth + 1] + positions[order[depth]][1][0][0]
+
+    best = {"cost": math.inf, "choice": None}
+    choice = [None] * len(positions)
+    used = [0, 0]  # Bit masks of the corners and edges placed so far
+    nodes = 0
+
+    def search(depth, cost, twist, flip):
+        nonlocal nodes
+        nodes += 1
+        if nodes > MAX_NODES or cost + rest[depth] >= best["cost"]:
+            return
+        if depth == len(order):
+            if twist % 3 or flip % 2:
+                return
+            corners = [choice[i][1] for i in range(8)]
+            edges = [choice[i][1] for i in range(8, 20)]
+            if parity(corners) == parity(edges):
+                best["cost"], best["choice"] = cost, list(choice)
+            return
+        position = order[depth]
+        _, options, is_corner = positions[position]
+        group = 0 if is_corner else 1
+        for option in options:
+            option_cost, piece, orientation, _ = option
+            if used[group] >> piece & 1:
+                continue
+            used[group] |= 1 << piece
+            choice[position] = option
+            if is_corner:
+                search(depth + 1, cost + option_cost, twist + orientation, flip)
+            else:
+                search(depth + 1, cost + option_cost, twist, flip + orientation)
+            used[group] &= ~(1 << piece)
+            choice[position] = None
+
+    search(0, 0.0, 0, 0)
+    if nodes > MAX_NODES:
+        logger.info("Correction search stopped after %d steps", MAX_NODES)
+    if best["choice"] is None:
+        return None
+
+    corrections = []
+    for (indices, _, _), option in zip(positions, best["choice"]):
+        for index, color in zip(indices, option[3]):
+            if stickers[index] != color:
+                old = Color(stickers[index]) if stickers[index] != NO_COLOR else None
+                corrections.append(Correction(*_locate(index), old, Color(color)))
+    logger.info("Correction search: %d steps, %d stickers changed, cost %.2f",
+                nodes, len(corrections), best["cost"])
+    return corrections
@@ -1,13 +1,23 @@
 import sys
 import os
+import argparse
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from cube.log import QUIET, INFO, DEBUG, set_verbosity
 from ui.app import RubiksCubeApp
 
 def main():
-    app = RubiksCubeApp()
+    parser = argparse.ArgumentParser(description="Rubik's Cube Solver")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="-v shows solver progress, -vv also shows bridge debug output")
+    parser.add_argument("--profile", action="store_true",
+                        help="show the time and moves of every solver step, solving gets a little slower")
+    args = parser.parse_args()
+    set_verbosity([QUIET, INFO, DEBUG][min(args.verbose, 2)])
+    
+    app = RubiksCubeApp(profile=args.profile)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
 
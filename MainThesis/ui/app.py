@@ -1,22 +1,31 @@
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
-from PIL import Image, ImageTk
 import numpy as np
 from typing import Optional
 
 from cube.constants import Color, Face
-from cube.state import CubeState
-from cube.rubiks_cube_bridge import RubiksCubeBridge
-from ui.camera import CameraHandler
+from cube.state import CubeState, SOLVED_COLORS
+from cube.validation import correct, find_problems
+from ui.camera import CameraHandler, STREAM_CONFIDENCE
+from ui.calibration import CalibrationSession, ColorCalibration
+from ui.preview import CameraPreview
+from ui.solving import SolveResult, SolveTask
 from ui.manual_solver import ManualSolutionInput
 
+logger = logging.getLogger(__name__)
+
 class RubiksCubeApp(tk.Tk):
     """Main application window for the Rubik's Cube solver"""
-    def __init__(self):
+    def __init__(self, profile: bool = False):
+        """
+        Args:
+            profile: show the time and moves of every solver step with the solution
+        """
         super().__init__()
         
         self.title("Rubik's Cube Solver")
+        self.profile = profile
         
         # Make the window full screen
         self.state('zoomed')  # On Windows, this maximizes the window
@@ -29,23 +38,28 @@ class RubiksCubeApp(tk.Tk):
         
         # Initialize components
         self.cube_state = CubeState()
+        # How sure the camera was of every sticker, 1.0 for stickers set by hand
+        self.confidence = {face: np.ones((3, 3)) for face in Face}
         self.camera = CameraHandler()
+        self.camera.calibration = ColorCalibration.load()
+        self.calibration_session = None
         self.current_face = Face.UP
         self.solver = None
         self.is_solving = False
+        self.solve_task = None
         self.solution_step = -1
         
         self._create_widgets()
         self._create_bindings()
+        self.preview = CameraPreview(self, self.camera_label, self.camera, self.camera_frame)
         
         # Start camera
         try:
             self.camera.start()
-            self.after(100, self._update_camera)
+            self.preview.start()
         except Exception as e:
             # Automatically launch in manual mode without showing messagebox
-            print(f"Camera connection failed: {e}")
-            print("Launching in manual mode...")
+            logger.warning("Camera connection failed: %s - launching in manual mode", e)
             # No messagebox - just continue in manual mode
             
     def _create_widgets(self):
@@ -100,6 +114,15 @@ class RubiksCubeApp(tk.Tk):
         self.simple_scramble_button = ttk.Button(self.capture_frame, text="Simple Scramble", command=self._simple_scramble_cube)
         self.simple_scramble_button.pack(side=tk.LEFT, padx=5)
         
+        self.calibrate_button = ttk.Button(self.capture_frame, text="Calibrate", command=self._calibrate_face)
+        self.calibrate_button.pack(side=tk.LEFT, padx=5)
+        
+        self.auto_capture_var = tk.BooleanVar(value=False)
+        self.auto_capture_check = ttk.Checkbutton(self.capture_frame, text="Auto Capture",
+                                                variable=self.auto_capture_var,
+                                                command=self._toggle_auto_capture)
+        self.auto_capture_check.pack(side=tk.LEFT, padx=5)
+        
         # Cube display
         self.display_frame = ttk.LabelFrame(self.control_frame, text="Cube State")
         self.display_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -195,23 +218,6 @@ class RubiksCubeApp(tk.Tk):
                     cells[row][col].bind("<Button-1>", 
                                        lambda e, f=face, r=row, c=col: self._on_cell_click(f, r, c))
                                        
-    def _update_camera(self):
-        """Update the camera feed"""
-        frame = self.camera.get_frame()
-        if frame is not None:
-            # Draw grid on frame
-            frame = self.camera.draw_grid(frame)
-            
-            # Convert to PhotoImage
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image = Image.fromarray(frame)
-            photo = ImageTk.PhotoImage(image=image)
-            
-            self.camera_label.configure(image=photo)
-            self.camera_label.image = photo
-            
-        self.after(16, self._update_camera)  # Update at ~60 FPS (reduced from 33ms to 16ms)
-        
     def _on_face_change(self):
         """Handle face selection change"""
         face_name = self.face_var.get()
@@ -219,37 +225,109 @@ class RubiksCubeApp(tk.Tk):
         
     def _capture_face(self):
         """Capture the current face colors"""
-        colors = self.camera.capture_face()
-        if colors:
-            self.cube_state.set_face(self.current_face, colors)
+        if not self.camera.camera_available:
+            self._store_face(self.camera.capture_face(), np.ones((3, 3)))
+            # Show message if in manual mode
+            messagebox.showinfo("Manual Mode", 
+                              "In manual mode, each face is set to all white by default.\n"
+                              "You can click on the cells to change their colors.")
+            return
+            
+        vote = self.camera.capture_votes()
+        if vote is not None:
+            self._store_face(vote.colors(), vote.confidence())
+            
+    def _store_face(self, colors, confidence):
+        """Put captured colors on the current face and move on to the next face"""
+        self.cube_state.set_face(self.current_face, colors)
+        self.confidence[self.current_face] = np.asarray(confidence, dtype=float)
+        self._update_display()
+        
+        # Auto-advance to next face
+        current_idx = list(Face).index(self.current_face)
+        next_idx = (current_idx + 1) % len(Face)
+        self.current_face = list(Face)[next_idx]
+        self.face_var.set(self.current_face.name)
+        
+    def _toggle_auto_capture(self):
+        """Start or stop taking faces from the live camera stream"""
+        enabled = self.auto_capture_var.get() and self.camera.camera_available
+        self.auto_capture_var.set(enabled)
+        self.camera.set_streaming(enabled)
+        if enabled:
+            self.after(100, self._poll_auto_capture)
+        else:
             self._update_display()
             
-            # Auto-advance to next face
-            current_idx = list(Face).index(self.current_face)
-            next_idx = (current_idx + 1) % len(Face)
-            self.current_face = list(Face)[next_idx]
+    def _poll_auto_capture(self):
+        """Store the face the camera settled on and show the running vote on the current face"""
+        if not self.auto_capture_var.get():
+            return
+        face = self.camera.take_stream_face()
+        if face is not None:
+            self._store_face(*face)
+        self._update_display(live=self.camera.stream_state())
+        self.after(100, self._poll_auto_capture)
+            
+    def _calibrate_face(self):
+        """Record the current face of a solved cube for color calibration, fits the colors after the sixth face"""
+        if self.calibration_session is None:
+            self.calibration_session = CalibrationSession()
+            self.current_face = Face.UP
             self.face_var.set(self.current_face.name)
+            messagebox.showinfo("Calibration",
+                              "Hold a solved cube with the selected face to the camera and press Calibrate, "
+                              "once for each of the six faces.")
+            self.calibrate_button.configure(text="Calibrate (0/6)")
+            return
             
-            # Show message if in manual mode
-            if not self.camera.camera_available:
-                messagebox.showinfo("Manual Mode", 
-                                  "In manual mode, each face is set to all white by default.\n"
-                                  "You can click on the cells to change their colors.")
+        samples = self.camera.capture_face_bgr()
+        if samples is None or not len(samples):
+            messagebox.showerror("Calibration", "Calibration needs the camera")
+            self.calibration_session = None
+            self.calibrate_button.configure(text="Calibrate")
+            return
+        self.calibration_session.add(SOLVED_COLORS[self.current_face], samples)
+        
+        missing = self.calibration_session.missing()
+        if missing:
+            self.calibrate_button.configure(text=f"Calibrate ({6 - len(missing)}/6)")
+            # Move on to a face whose color is still missing
+            self.current_face = next(face for face in Face if SOLVED_COLORS[face] in missing)
+            self.face_var.set(self.current_face.name)
+            return
             
+        calibration = self.calibration_session.finish()
+        self.calibration_session = None
+        self.calibrate_button.configure(text="Calibrate")
+        self.camera.calibration = calibration
+        try:
+            calibration.save()
+        except OSError as e:
+            logger.warning("Could not save the color calibration: %s", e)
+        messagebox.showinfo("Calibration", "Colors calibrated")
+        
     def _reset_face(self):
         """Reset the current face"""
         self.cube_state.reset_face(self.current_face)
+        self.confidence[self.current_face] = np.ones((3, 3))
         self._update_display()
         
+    def _reset_confidence(self):
+        """Forget how sure the camera was, once the stickers are known another way"""
+        self.confidence = {face: np.ones((3, 3)) for face in Face}
+        
     def _complete_cube(self):
         """Set the cube to a solved state and update the display."""
         self.cube_state.set_solved()
+        self._reset_confidence()
         self._update_display()
         
     def _scramble_cube(self):
         """Set the cube state to a simple, manageable scrambled state."""
         # Start with a solved cube
         self.cube_state.set_solved()
+        self._reset_confidence()
         
         # Apply a sequence of moves to create a manageable scramble
         # This creates a simple scramble that's only a few moves away from solved
@@ -266,6 +344,7 @@ class RubiksCubeApp(tk.Tk):
         
         # Start with a complete solved cube (same as Complete button)
         self.cube_state.set_solved()
+        self._reset_confidence()
         
         # Define available moves
         faces = ['R', 'L', 'U', 'D', 'F', 'B']
@@ -293,21 +372,29 @@ class RubiksCubeApp(tk.Tk):
             self.cube_state.move(move)
         
         # Output the scramble to console
-        scramble_string = " ".join(scramble_moves)
-        print(f"\nSIMPLE SCRAMBLE: {scramble_string}")
-        print(f"Scramble length: {len(scramble_moves)} moves")
+        logger.info("SIMPLE SCRAMBLE: %s (%d moves)", " ".join(scramble_moves), len(scramble_moves))
         
         self._update_display()
         
-    def _update_display(self):
-        """Update the cube state display"""
+    def _update_display(self, live=None):
+        """
+        Update the cube state display, stickers the camera wasn't sure of get a red border
+        
+        Args:
+            live: (colors, confidence) the streaming capture currently sees, shown on the current face
+        """
         for face in Face:
             colors = self.cube_state.get_face(face)
+            confidence = self.confidence[face]
+            if live is not None and face == self.current_face:
+                colors, confidence = live
             for row in range(3):
                 for col in range(3):
                     color = colors[row][col]
                     bg_color = self._get_display_color(color)
-                    self.face_displays[face][row][col].configure(bg=bg_color)
+                    unsure = color is not None and confidence[row][col] < STREAM_CONFIDENCE
+                    self.face_displays[face][row][col].configure(
+                        bg=bg_color, highlightthickness=2 if unsure else 0, highlightbackground="red")
                     
     def _get_display_color(self, color: Optional[Color]) -> str:
         """Get the display color for a cube color"""
@@ -344,33 +431,56 @@ class RubiksCubeApp(tk.Tk):
             
         colors[row][col] = new_color
         self.cube_state.set_face(face, colors)
+        self.confidence[face][row, col] = 1.0
         self._update_display()
         
     def _solve_cube(self):
-        """Start solving the cube using the proven rubiks_cube solver via bridge"""
+        """Start solving the cube on a worker thread, or cancel the solve that is running"""
+        if self.solve_task is not None:
+            self.solve_task.cancel()
+            # Stays disabled until the solver has stopped
+            self.solve_button.configure(state=tk.DISABLED)
+            return
+            
         if not self.cube_state.is_complete():
             messagebox.showerror("Error", "Please scan all faces first")
             return
             
-        if not self.cube_state.is_valid():
-            messagebox.showerror("Error", "Invalid cube state")
+        if not self._check_cube():
             return
             
+        self.is_solving = True
+        self.solve_button.configure(text="Cancel Solve")
+        self.steps_text.delete(1.0, tk.END)
+        self.steps_text.insert(tk.END, "Solving...\n")
+        self.solve_task = SolveTask(self, self.cube_state, self._on_solve_progress,
+                                    self._on_solve_done, self._on_solve_error, profile=self.profile)
+        self.solve_task.start()
+        
+    def _on_solve_progress(self, stage: str, number: int, total: int):
+        self.steps_text.delete(1.0, tk.END)
+        self.steps_text.insert(tk.END, f"Solving... step {number} of {total}: {stage}\n")
+        
+    def _finish_solve(self):
+        self.solve_task = None
+        self.is_solving = False
+        self.solve_button.configure(text="Solve Cube", state=tk.NORMAL)
+        
+    def _on_solve_error(self, error: Exception):
+        cancelled = self.solve_task.cancelled
+        self._finish_solve()
+        self.steps_text.delete(1.0, tk.END)
+        if cancelled:
+            self.steps_text.insert(tk.END, "Solve cancelled\n")
+            return
+        messagebox.showerror("Error", str(error))
+        
+    def _on_solve_done(self, result: SolveResult):
+        """Show the solution the worker found"""
+        self._finish_solve()
         try:
-            self.solve_button.configure(state=tk.DISABLED)
-            self.is_solving = True
-            
-            # Store the original scrambled state
-            original_state = self.cube_state.copy()
-            
-            # Create bridge and solve using proven rubiks_cube solver
-            bridge = RubiksCubeBridge()
-            if not bridge.rubiks_cube_available:
-                messagebox.showerror("Error", "rubiks_cube solver not available. Please install it first.")
-                return
-                
-            # Solve using the bridge (which calls the proven rubiks_cube solver)
-            optimized_solution, moves_by_step = bridge.solve_with_rubiks_cube(original_state)
+            bridge = result.bridge
+            optimized_solution = result.solution
             
             # Store the bridge for later use in navigation
             self.solver = bridge
@@ -385,26 +495,24 @@ class RubiksCubeApp(tk.Tk):
                 self.steps_text.insert(tk.END, f"  Bridge → Solver: {timing_info['solver_send_formatted']}\n")
                 self.steps_text.insert(tk.END, f"  Solver → Bridge: {timing_info['solver_receive_formatted']}\n")
                 self.steps_text.insert(tk.END, f"  Duration: {timing_info['duration_formatted']}\n")
-                
-                # Check if the cube can be solved (verify solution correctness)
+                stats = timing_info['solve_stats']
+                if timing_info['cache_hit']:
+                    self.steps_text.insert(tk.END, "  Solution from cache\n")
+                elif stats:
+                    self.steps_text.insert(tk.END, f"  Moves: {stats['moves_before']} made, "
+                                                   f"{stats['moves_after']} after simplifying\n")
+                    for step_name, step in stats['steps'].items():
+                        self.steps_text.insert(tk.END, f"    {step_name}: {1000 * step['seconds']:.1f} ms, "
+                                                       f"{step['moves_before']} moves\n")
+
+                # The worker replayed the solution on the scanned cube
                 self.steps_text.insert(tk.END, "  Solution Verification: ")
-                try:
-                    # Create a test cube with the original scrambled state
-                    test_cube = original_state.copy()
-                    
-                    # Apply the solution moves
-                    solution_moves = optimized_solution.split()
-                    for move in solution_moves:
-                        if move.strip():  # Skip empty moves
-                            test_cube.move(move)
-                    
-                    # Check if the cube is now solved
-                    if test_cube.is_solved():
-                        self.steps_text.insert(tk.END, "CORRECT\n\n")
-                    else:
-                        self.steps_text.insert(tk.END, "INCORRECT\n\n")
-                except Exception as e:
-                    self.steps_text.insert(tk.END, f"ERROR: {str(e)}\n\n")
+                if result.verified is None:
+                    self.steps_text.insert(tk.END, "ERROR\n\n")
+                elif result.verified:
+                    self.steps_text.insert(tk.END, "CORRECT\n\n")
+                else:
+                    self.steps_text.insert(tk.END, "INCORRECT\n\n")
             else:
                 self.steps_text.insert(tk.END, "\n")
             
@@ -432,6 +540,7 @@ class RubiksCubeApp(tk.Tk):
             self.prev_button.configure(state=tk.NORMAL)
             self.next_button.configure(state=tk.NORMAL)
             self.solution_step = 0
+            self._reset_confidence()
             
             # Highlight the current move and update guide
             self._highlight_current_move_in_section(current_section, current_move)
@@ -444,10 +553,29 @@ class RubiksCubeApp(tk.Tk):
             
         except Exception as e:
             messagebox.showerror("Error", str(e))
-        finally:
-            self.solve_button.configure(state=tk.NORMAL)
-            self.is_solving = False
             
+    def _check_cube(self) -> bool:
+        """Check the scan is a real cube, offer to fix the stickers the camera wasn't sure of if it isn't"""
+        problems = find_problems(self.cube_state)
+        if not problems:
+            return True
+        corrections = correct(self.cube_state, self.confidence)
+        if not corrections:
+            messagebox.showerror("Invalid cube state", "\n".join(problems))
+            return False
+            
+        changes = "\n".join(f"{c.face.name} row {c.row + 1} column {c.col + 1}: "
+                            f"{c.old.name if c.old else 'none'} -> {c.new.name}" for c in corrections)
+        if not messagebox.askyesno("Invalid cube state",
+                                   "\n".join(problems) + "\n\nThe cube is valid with these changes:\n" +
+                                   changes + "\n\nApply them?"):
+            return False
+        for c in corrections:
+            self.cube_state.get_face(c.face)[c.row][c.col] = c.new
+            self.confidence[c.face][c.row, c.col] = 1.0
+        self._update_display()
+        return True
+        
     def _open_manual_solution(self):
         """Open dialog for entering a manual solution"""
         # Create the manual solution dialog and pass the callback
@@ -480,6 +608,7 @@ class RubiksCubeApp(tk.Tk):
             self.prev_button.configure(state=tk.NORMAL)
             self.next_button.configure(state=tk.NORMAL)
             self.solution_step = 0
+            self._reset_confidence()
             self._update_display()
             
             # Update move guide with first move
@@ -788,5 +917,7 @@ class RubiksCubeApp(tk.Tk):
             
     def on_closing(self):
         """Handle window closing"""
+        if self.solve_task is not None:
+            self.solve_task.cancel()
         self.camera.stop()
         self.destroy() 
\ No newline at end of file
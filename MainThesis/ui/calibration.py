@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+from typing import Dict, Optional
+import cv2
+import numpy as np
+from cube.constants import Color
+from ui.camera import CODE_COLORS
+
+logger = logging.getLogger(__name__)
+
+# Where the calibration is kept between sessions
+CALIBRATION_PATH = os.environ.get('RUBIKS_CUBE_CALIBRATION',
+                                  os.path.join(os.path.expanduser('~'), '.config', 'rubiks_cube', 'calibration.json'))
+CALIBRATION_VERSION = 1
+
+# The lookup table keeps all 180 hues and cuts saturation and value down to 256 >> SV_SHIFT levels
+SV_SHIFT = 2
+
+# Colors further than this from every centroid (in Lab units) are UNKNOWN
+MAX_DISTANCE = 60.0
+
+UNKNOWN_CODE = CODE_COLORS.index(Color.UNKNOWN)
+
+
+def to_lab(bgr: np.ndarray) -> np.ndarray:
+    """Convert BGR values of shape (..., 3) to float Lab values of the same shape"""
+    bgr = np.asarray(bgr, dtype=np.uint8)
+    lab = cv2.cvtColor(bgr.reshape(-1, 1, 3), cv2.COLOR_BGR2Lab)
+    return lab.reshape(bgr.shape).astype(np.float32)
+
+
+class ColorCalibration:
+    """
+    Nearest-centroid color classifier fitted to the stickers of one cube under one light
+
+    Every color is the mean of its samples in Lab, where distances follow what the
+    eye sees much better than in HSV. The classifier is baked into a lookup table
+    over (hue, saturation, value) once, so classifying a sticker is one index.
+    """
+    def __init__(self, centroids: Dict[Color, np.ndarray]):
+        self.centroids = {color: np.asarray(lab, dtype=np.float32) for color, lab in centroids.items()}
+        self.lut = self._bake()
+
+    @classmethod
+    def fit(cls, samples: Dict[Color, np.ndarray]) -> 'ColorCalibration':
+        """
+        Fit the centroids
+
+        Args:
+            samples: BGR sticker values of shape (n, 3) for every color
+        """
+        return cls({color: to_lab(bgr).reshape(-1, 3).mean(axis=0) for color, bgr in samples.items()})
+
+    def _bake(self) -> np.ndarray:
+        """Classify the center of every (hue, saturation, value) bin, returns indices into CODE_COLORS"""
+        levels = 256 >> SV_SHIFT
+        half_step = (1 << SV_SHIFT) // 2
+        h, s, v = np.meshgrid(np.arange(180), np.arange(levels) << SV_SHIFT | half_step,
+                              np.arange(levels) << SV_SHIFT | half_step, indexing='ij')
+        hsv = np.stack([h, s, v], axis=-1).astype(np.uint8)
+        bgr = cv2.cvtColor(hsv.reshape(-1, levels, 3), cv2.COLOR_HSV2BGR)
+        lab = to_lab(bgr).reshape(hsv.shape)
+
+        best = np.full(hsv.shape[:3], MAX_DISTANCE ** 2, dtype=np.float32)
+        lut = np.full(hsv.shape[:3], UNKNOWN_CODE, dtype=np.uint8)
+        for color, centroid in self.centroids.items():
+            distance = ((lab - centroid) ** 2).sum(axis=-1)
+            closer = distance < best
+            best[closer] = distance[closer]
+            lut[closer] = CODE_COLORS.index(color)
+        return lut
+
+    def classify(self, hsv: np.ndarray) -> np.ndarray:
+        """
+        Classify HSV values with the lookup table
+
+        Args:
+            hsv: uint8 array of shape (..., 3) as OpenCV makes it
+
+        Returns:
+            np.ndarray: index into CODE_COLORS for every HSV value
+        """
+        hsv = np.asarray(hsv, dtype=np.uint8)
+        return self.lut[hsv[..., 0], hsv[..., 1] >> SV_SHIFT, hsv[..., 2] >> SV_SHIFT]
+
+    def save(self, path: str = CALIBRATION_PATH):
+        """Write the centroids to path, the lookup table is baked again when loading"""
+        data = {
+            "version": CALIBRATION_VERSION,
+            "centroids": {color.name: [float(x) for x in lab] for color, lab in self.centroids.items()},
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = CALIBRATION_PATH) -> Optional['ColorCalibration']:
+        """Read a calibration written by save(), None if there is none or it can't be used"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring calibration in %s: %s", path, e)
+            return None
+        if data.get("version") != CALIBRATION_VERSION:
+            logger.warning("Ignoring calibration in %s: version %s, expected %d",
+                           path, data.get("version"), CALIBRATION_VERSION)
+            return None
+        try:
+            centroids = {Color[name]: lab for name, lab in data["centroids"].items()}
+        except (KeyError, AttributeError) as e:
+            logger.warning("Ignoring calibration in %s: %s", path, e)
+            return None
+        logger.info("Loaded color calibration from %s", path)
+        return cls(centroids)
+
+
+class CalibrationSession:
+    """Collects the stickers of the six faces of a solved cube and fits a ColorCalibration"""
+    def __init__(self):
+        self.samples: Dict[Color, np.ndarray] = {}
+
+    def add(self, color: Color, bgr: np.ndarray):
+        """Record the BGR values of one face, all of them showing color"""
+        self.samples[color] = np.asarray(bgr).reshape(-1, 3)
+
+    def missing(self):
+        """Colors that haven't been scanned yet"""
+        return [color for color in CODE_COLORS if color != Color.UNKNOWN and color not in self.samples]
+
+    def finish(self) -> ColorCalibration:
+        if self.missing():
+            raise ValueError(f"Not calibrated yet: {', '.join(color.name for color in self.missing())}")
+        return ColorCalibration.fit(self.samples)
@@ -1,8 +1,175 @@
+import logging
 import cv2
 import numpy as np
+import threading
+import time
 from typing import Optional, List, Tuple
 from cube.constants import Color, DEFAULT_DROIDCAM_URL
-import time
+from ui.detection import FaceDetector, PATCH_SIZE, grid_lines, patch_cell_means, warp_face
+
+logger = logging.getLogger(__name__)
+
+# Side of the square patch averaged at the center of every cell
+SAMPLE_SIZE = 10
+
+# Colors in the order classify_hsv numbers them
+CODE_COLORS = [Color.WHITE, Color.YELLOW, Color.RED, Color.ORANGE, Color.GREEN, Color.BLUE, Color.UNKNOWN]
+UNKNOWN_CODE = CODE_COLORS.index(Color.UNKNOWN)
+
+# Streaming capture: weight an old vote loses per frame, how sure every cell has to be and
+# how many frames it has to have seen before a face is taken
+VOTE_DECAY = 0.85
+STREAM_CONFIDENCE = 0.8
+STREAM_MIN_FRAMES = 5
+
+
+def classify_hsv(hsv: np.ndarray) -> np.ndarray:
+    """
+    Classify HSV values, first matching range wins
+    
+    Args:
+        hsv: array of shape (..., 3)
+        
+    Returns:
+        np.ndarray: index into CODE_COLORS for every HSV value
+    """
+    hsv = np.asarray(hsv, dtype=np.int16)
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    saturated = s > 100
+    conditions = [
+        (s < 30) & (v > 150),                        # White
+        (h >= 20) & (h <= 35) & saturated,           # Yellow
+        ((h <= 10) | (h >= 170)) & saturated,        # Red (wraps around in HSV)
+        (h >= 10) & (h <= 20) & saturated,           # Orange
+        (h >= 35) & (h <= 85) & saturated,           # Green
+        (h >= 85) & (h <= 130) & saturated,          # Blue
+    ]
+    return np.select(conditions, range(len(conditions)), default=len(conditions))
+
+
+class FrameRing:
+    """
+    The last few camera frames, written by the capture thread and read by anyone
+
+    The frames are allocated once, the camera decodes straight into the next
+    slot. latest() hands out a view into the ring, not a copy: it stays valid
+    until the capture thread has come around to its slot again, which takes
+    size - 1 more frames. Copy a frame that has to be kept longer than that.
+    last_n() copies its frames, the oldest of them would be overwritten after
+    a single frame.
+    """
+    def __init__(self, size: int = 4):
+        self.size = size
+        self.slots = [None] * size
+        self.timestamps = [0.0] * size
+        self.corners = np.zeros((size, 4, 2), dtype=np.float32)  # Face found in every frame
+        self.found = [False] * size
+        self.count = 0  # Frames written so far, the newest one is in slot (count - 1) % size
+        self.lock = threading.Lock()
+
+    def next_slot(self) -> Optional[np.ndarray]:
+        """The array the next frame should be decoded into, None before the first frame"""
+        return self.slots[self.count % self.size]
+
+    def publish(self, frame: np.ndarray, timestamp: float, corners: Optional[np.ndarray] = None):
+        """Make the frame just decoded into next_slot() the newest one, with the corners of the face found in it"""
+        with self.lock:
+            index = self.count % self.size
+            # The camera only hands back a new array on the first frame or when the size changes
+            self.slots[index] = frame
+            self.timestamps[index] = timestamp
+            self.found[index] = corners is not None
+            if corners is not None:
+                self.corners[index] = corners
+            self.count += 1
+
+    def latest(self) -> Optional[Tuple[np.ndarray, float]]:
+        """The newest frame and its time.monotonic() timestamp, None if there is no frame yet"""
+        with self.lock:
+            if not self.count:
+                return None
+            index = (self.count - 1) % self.size
+            return self.slots[index], self.timestamps[index]
+
+    def last_n(self, k: int, since: float = 0.0) -> List[Tuple[np.ndarray, float, Optional[np.ndarray]]]:
+        """
+        Copies of the newest k frames, oldest first
+
+        Args:
+            k: number of frames, at most size - 1 so none of them is being written
+            since: only return frames taken after this time.monotonic() timestamp
+
+        Returns:
+            list: (frame, time.monotonic() timestamp, corners of the face found in it or None)
+        """
+        with self.lock:
+            # The capture thread can't publish while the lock is held, so it can't move on to
+            # decoding into one of these slots before they are copied
+            k = min(k, self.size - 1, self.count)
+            frames = []
+            for n in range(self.count - k, self.count):
+                index = n % self.size
+                if self.timestamps[index] > since:
+                    corners = self.corners[index].copy() if self.found[index] else None
+                    frames.append((self.slots[index].copy(), self.timestamps[index], corners))
+            return frames
+
+    def face_corners(self, timestamp: float) -> Optional[np.ndarray]:
+        """Corners of the face found in the frame taken at timestamp, None if there was none or it is gone"""
+        with self.lock:
+            for index in range(self.size):
+                if self.timestamps[index] == timestamp and self.found[index]:
+                    return self.corners[index].copy()
+            return None
+
+
+class FaceVote:
+    """
+    Running color histogram of every cell of a face over a stream of frames
+
+    Older frames fade out by VOTE_DECAY per frame, so the vote follows the face
+    the camera sees now. UNKNOWN readings never win a cell that has any color,
+    but they do count against its confidence.
+    """
+    def __init__(self, decay: float = 1.0):
+        self.decay = decay
+        self.counts = np.zeros((9, len(CODE_COLORS)), dtype=np.float32)
+        self.frames = 0
+
+    def reset(self):
+        self.counts[:] = 0
+        self.frames = 0
+
+    def add(self, codes: np.ndarray, sampled: Optional[np.ndarray] = None):
+        """Add one frame, codes are the CODE_COLORS indices of its 3x3 cells"""
+        codes = np.asarray(codes).reshape(9)
+        if sampled is not None:
+            codes = np.where(np.asarray(sampled).reshape(9), codes, UNKNOWN_CODE)
+        self.counts *= self.decay
+        self.counts[np.arange(9), codes] += 1
+        self.frames += 1
+
+    def codes(self) -> np.ndarray:
+        """Winning CODE_COLORS index of every cell, shape (3, 3)"""
+        known = self.counts[:, :UNKNOWN_CODE]
+        return np.where(known.max(axis=1) > 0, known.argmax(axis=1), UNKNOWN_CODE).reshape(3, 3)
+
+    def confidence(self) -> np.ndarray:
+        """Share of the (weighted) votes of every cell that went to its winner, 0 for cells without a color"""
+        codes = self.codes().reshape(9)
+        total = self.counts.sum(axis=1)
+        best = np.where(codes != UNKNOWN_CODE, self.counts[np.arange(9), codes], 0.0)
+        return (best / np.maximum(total, 1e-9)).reshape(3, 3)
+
+    def colors(self) -> List[List[Color]]:
+        codes = self.codes()
+        return [[CODE_COLORS[codes[row, col]] for col in range(3)] for row in range(3)]
+
+    def is_stable(self, threshold: float = STREAM_CONFIDENCE, min_frames: int = STREAM_MIN_FRAMES) -> bool:
+        """Every cell has a color and is at least threshold sure of it"""
+        return (self.frames >= min_frames and bool((self.codes() != UNKNOWN_CODE).all())
+                and bool((self.confidence() >= threshold).all()))
+
 
 class CameraHandler:
     """Handles camera capture and color detection for the Rubik's Cube"""
@@ -14,6 +181,19 @@ class CameraHandler:
         self.grid_offset_x = 100  # X offset for grid
         self.grid_offset_y = 100  # Y offset for grid
         self.camera_available = True
+        self.frames = FrameRing()
+        self.calibration = None  # ColorCalibration to use instead of the fixed HSV ranges
+        self.detector = FaceDetector()  # Set to None to always read the fixed centered grid
+        self.face_patch = np.empty((PATCH_SIZE, PATCH_SIZE, 3), dtype=np.uint8)
+        # Streaming capture, the vote is kept by the capture thread
+        self.streaming = False
+        self.stream_vote = FaceVote(VOTE_DECAY)
+        self.stream_patch = np.empty((PATCH_SIZE, PATCH_SIZE, 3), dtype=np.uint8)
+        self.stream_lock = threading.Lock()
+        self.stream_face = None  # (colors, confidence) of a stable face not taken yet
+        self.stream_committed = None  # Codes of the last face handed out, it isn't handed out twice
+        self.capture_thread = None
+        self.running = False
         
     def start(self):
         """Start the camera capture"""
@@ -21,121 +201,243 @@ class CameraHandler:
             self.cap = cv2.VideoCapture(self.droidcam_url)
             if not self.cap.isOpened():
                 self.camera_available = False
-                print("Camera not available - running in manual mode")
+                logger.warning("Camera not available - running in manual mode")
         except Exception as e:
             self.camera_available = False
-            print(f"Camera not available - running in manual mode: {str(e)}")
+            logger.warning("Camera not available - running in manual mode: %s", e)
+            return
+        if self.camera_available:
+            self.running = True
+            self.capture_thread = threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True)
+            self.capture_thread.start()
             
     def stop(self):
         """Stop the camera capture"""
+        self.running = False
+        if self.capture_thread:
+            # A read stuck on a dead network camera only returns once the stream times out
+            self.capture_thread.join(timeout=1.0)
+            if self.capture_thread.is_alive():
+                logger.warning("Camera capture thread did not stop in time")
+            self.capture_thread = None
         if self.cap:
             self.cap.release()
             self.cap = None
+
+    def _capture_loop(self):
+        """Read frames into the ring until stop() is called, runs on the capture thread"""
+        failures = 0
+        while self.running:
+            slot = self.frames.next_slot()
+            ret, frame = self.cap.read(slot) if slot is not None else self.cap.read()
+            if not ret or frame is None:
+                failures += 1
+                if failures == 1:
+                    logger.warning("Camera read failed, retrying")
+                # Don't spin on a stream that keeps failing
+                time.sleep(min(0.01 * failures, 0.5))
+                continue
+            if failures:
+                logger.info("Camera recovered after %d failed reads", failures)
+                failures = 0
+            timestamp = time.monotonic()
+            corners = self.detector.detect(frame) if self.detector is not None else None
+            self.frames.publish(frame, timestamp, corners)
+            if self.streaming:
+                self._vote_frame(frame, corners)
+
+    def _vote_frame(self, frame: np.ndarray, corners: Optional[np.ndarray]):
+        """Add a frame to the streaming vote and keep the face once it is stable, runs on the capture thread"""
+        with self.stream_lock:
+            if self.detector is not None and corners is None:
+                # The face left the view, whatever comes next is a new face
+                self.stream_vote.reset()
+                self.stream_committed = None
+                return
+            hsv, sampled = self.get_cell_hsv(frame, corners, self.stream_patch)
+            self.stream_vote.add(self.classify(hsv), sampled)
+            if not self.stream_vote.is_stable():
+                return
+            codes = self.stream_vote.codes()
+            # Wait for the next face, faces differ at least in their centers
+            if self.stream_committed is not None and np.array_equal(codes, self.stream_committed):
+                return
+            self.stream_committed = codes
+            self.stream_face = (self.stream_vote.colors(), self.stream_vote.confidence())
+
+    def set_streaming(self, streaming: bool):
+        """Start or stop voting over the live frames"""
+        with self.stream_lock:
+            self.stream_vote.reset()
+            self.stream_face = None
+            self.stream_committed = None
+            self.streaming = streaming and self.camera_available
+
+    def stream_state(self) -> Tuple[List[List[Color]], np.ndarray]:
+        """Current vote of the streaming capture as (colors, 3x3 confidence)"""
+        with self.stream_lock:
+            return self.stream_vote.colors(), self.stream_vote.confidence()
+
+    def take_stream_face(self) -> Optional[Tuple[List[List[Color]], np.ndarray]]:
+        """The face the streaming capture settled on as (colors, 3x3 confidence), once, None if there is none"""
+        with self.stream_lock:
+            face, self.stream_face = self.stream_face, None
+            return face
+
+    def latest(self) -> Optional[Tuple[np.ndarray, float]]:
+        """The newest camera frame and its time.monotonic() timestamp, see FrameRing for how long it stays valid"""
+        return self.frames.latest()
+
+    def last_n(self, k: int, since: float = 0.0) -> List[Tuple[np.ndarray, float, Optional[np.ndarray]]]:
+        """Copies of the newest k camera frames with their timestamps and face corners, oldest first"""
+        return self.frames.last_n(k, since)
+
+    def face_corners(self, timestamp: float) -> Optional[np.ndarray]:
+        """Corners of the cube face detected in the frame taken at timestamp, None to use the fixed grid"""
+        return self.frames.face_corners(timestamp)
             
     def get_frame(self) -> Optional[np.ndarray]:
-        """Get the current frame from the camera"""
+        """Get the newest frame from the camera without waiting for the camera"""
         if not self.camera_available:
             # Return a blank frame with grid
             frame = np.zeros((480, 640, 3), dtype=np.uint8)
             frame = self.draw_grid(frame)
             return frame
             
-        if not self.cap:
-            return None
-            
-        ret, frame = self.cap.read()
-        if not ret:
+        latest = self.frames.latest()
+        if latest is None:
             return None
             
-        return frame
+        return latest[0]
         
-    def draw_grid(self, frame: np.ndarray) -> np.ndarray:
-        """Draw the 3x3 grid on the frame"""
-        height, width = frame.shape[:2]
+    def place_grid(self, width: int, height: int):
+        """Center the grid on a camera frame of the given size"""
         grid_width = 3 * self.grid_size + 2 * self.grid_margin
         grid_height = 3 * self.grid_size + 2 * self.grid_margin
-        
-        # Center the grid
         self.grid_offset_x = (width - grid_width) // 2
         self.grid_offset_y = (height - grid_height) // 2
         
+    def draw_grid(self, frame: np.ndarray, scale: Optional[float] = None,
+                  corners: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Draw the 3x3 grid on the frame
+        
+        Args:
+            frame: a camera frame, the grid is centered on it first
+            scale: draw the grid placed on the camera frame onto a copy resized by this factor instead
+            corners: draw the grid over this detected face instead of the fixed grid
+        """
+        if corners is not None:
+            for start, end in grid_lines(corners * (scale or 1.0)):
+                cv2.line(frame, (int(round(start[0])), int(round(start[1]))),
+                         (int(round(end[0])), int(round(end[1]))), (0, 255, 0), 2)
+            return frame
+        if scale is None:
+            self.place_grid(frame.shape[1], frame.shape[0])
+            scale = 1.0
+        
         # Draw grid cells
+        size = round(self.grid_size * scale)
         for row in range(3):
             for col in range(3):
-                x = self.grid_offset_x + col * (self.grid_size + self.grid_margin)
-                y = self.grid_offset_y + row * (self.grid_size + self.grid_margin)
+                x = round((self.grid_offset_x + col * (self.grid_size + self.grid_margin)) * scale)
+                y = round((self.grid_offset_y + row * (self.grid_size + self.grid_margin)) * scale)
                 cv2.rectangle(frame, (x, y), 
-                            (x + self.grid_size, y + self.grid_size),
+                            (x + size, y + size),
                             (255, 255, 255), 2)
 
         return frame
     
-    def get_cell_colors(self, frame: np.ndarray) -> List[List[Color]]:
-        """Get the colors of each cell in the grid"""
+    def get_cell_colors(self, frame: np.ndarray, corners: Optional[np.ndarray] = None) -> List[List[Color]]:
+        """Get the colors of each cell in the grid, or of the detected face inside corners"""
         if not self.camera_available:
             # Return a default face (all white) when no camera is available
             return [[Color.WHITE for _ in range(3)] for _ in range(3)]
             
-        colors = [[None for _ in range(3)] for _ in range(3)]
+        hsv, sampled = self.get_cell_hsv(frame, corners)
+        codes = self.classify(hsv)
+        return [[CODE_COLORS[codes[row, col]] if sampled[row, col] else None for col in range(3)]
+                for row in range(3)]
+    
+    def classify(self, hsv: np.ndarray) -> np.ndarray:
+        """Classify HSV values with the calibration if there is one, returns indices into CODE_COLORS"""
+        if self.calibration is not None:
+            return self.calibration.classify(hsv)
+        return classify_hsv(hsv)
+    
+    def get_cell_hsv(self, frame: np.ndarray, corners: Optional[np.ndarray] = None,
+                     patch: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Average the BGR patch at the center of every cell and convert the nine means to HSV at once
         
-        for row in range(3):
-            for col in range(3):
-                x = self.grid_offset_x + col * (self.grid_size + self.grid_margin)
-                y = self.grid_offset_y + row * (self.grid_size + self.grid_margin)
-                
-                # Get center region of cell
-                cell_center_x = x + self.grid_size // 2
-                cell_center_y = y + self.grid_size // 2
-                sample_size = 10
-                
-                # Sample colors from center region
-                color_samples = []
-                for dx in range(-sample_size//2, sample_size//2):
-                    for dy in range(-sample_size//2, sample_size//2):
-                        px = cell_center_x + dx
-                        py = cell_center_y + dy
-                        if 0 <= px < frame.shape[1] and 0 <= py < frame.shape[0]:
-                            color_samples.append(frame[py, px])
-                            
-                if color_samples:
-                    # Convert to HSV for better color detection
-                    avg_color = np.mean(color_samples, axis=0).astype(np.uint8)
-                    hsv_color = cv2.cvtColor(avg_color.reshape(1, 1, 3), cv2.COLOR_BGR2HSV)[0][0]
-                    
-                    # Detect color based on HSV ranges
-                    colors[row][col] = self._detect_color(hsv_color)
-                    
-        return colors
+        Returns:
+            tuple: (3x3x3 uint8 HSV means, 3x3 bool mask of cells that had pixels inside the frame)
+        """
+        means, sampled = self.get_cell_bgr(frame, corners, patch)
+        # Hue is averaged as BGR first, averaging hue directly breaks where red wraps around
+        return cv2.cvtColor(means, cv2.COLOR_BGR2HSV), sampled
+    
+    def get_cell_bgr(self, frame: np.ndarray, corners: Optional[np.ndarray] = None,
+                     patch: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Average the BGR patch at the center of every cell
+        
+        Args:
+            frame: camera frame
+            corners: corners of the detected face, the face is straightened and read instead of the fixed grid
+            patch: buffer for the straightened face, face_patch if not given (only for the Tk thread)
+        
+        Returns:
+            tuple: (3x3x3 uint8 BGR means, 3x3 bool mask of cells that had pixels inside the frame)
+        """
+        if corners is not None:
+            means = patch_cell_means(warp_face(frame, corners, self.face_patch if patch is None else patch))
+            return means, np.ones((3, 3), dtype=bool)
+        
+        step = self.grid_size + self.grid_margin
+        half = SAMPLE_SIZE // 2
+        offsets = np.arange(-half, SAMPLE_SIZE - half)
+        # Pixel coordinates of every patch, one row of SAMPLE_SIZE coordinates per cell row/column
+        ys = (self.grid_offset_y + self.grid_size // 2 + step * np.arange(3))[:, None] + offsets
+        xs = (self.grid_offset_x + self.grid_size // 2 + step * np.arange(3))[:, None] + offsets
+        valid_y = (ys >= 0) & (ys < frame.shape[0])
+        valid_x = (xs >= 0) & (xs < frame.shape[1])
+        
+        # patches[row, col, dy, dx] holds a BGR pixel, pixels outside the frame get weight 0
+        patches = frame[np.clip(ys, 0, frame.shape[0] - 1)[:, None, :, None],
+                        np.clip(xs, 0, frame.shape[1] - 1)[None, :, None, :]]
+        weights = valid_y[:, None, :, None] & valid_x[None, :, None, :]
+        counts = weights.sum(axis=(2, 3))
+        sums = (patches * weights[..., None]).sum(axis=(2, 3), dtype=np.float64)
+        means = (sums / np.maximum(counts, 1)[..., None]).astype(np.uint8)
+        return means, counts > 0
         
     def _detect_color(self, hsv: np.ndarray) -> Color:
         """Detect the cube color from HSV values"""
-        h, s, v = hsv
+        return CODE_COLORS[self.classify(np.asarray(hsv, dtype=np.uint8).reshape(1, 3))[0]]
         
-        # White detection
-        if s < 30 and v > 150:
-            return Color.WHITE
-            
-        # Yellow detection
-        if h >= 20 and h <= 35 and s > 100:
-            return Color.YELLOW
-            
-        # Red detection (wraps around in HSV)
-        if (h <= 10 or h >= 170) and s > 100:
-            return Color.RED
-            
-        # Orange detection
-        if h >= 10 and h <= 20 and s > 100:
-            return Color.ORANGE
-            
-        # Green detection
-        if h >= 35 and h <= 85 and s > 100:
-            return Color.GREEN
-            
-        # Blue detection
-        if h >= 85 and h <= 130 and s > 100:
-            return Color.BLUE
-            
-        return Color.UNKNOWN
+    def capture_face_bgr(self) -> Optional[np.ndarray]:
+        """Mean BGR color of the cells of the current face over the newest frames, shape (n, 3), None without a camera"""
+        if not self.camera_available or not self.cap:
+            return None
+        samples = []
+        for frame, _, corners in self.last_n(3):
+            means, sampled = self.get_cell_bgr(frame, corners)
+            samples.append(means[sampled])
+        if not samples:
+            return None
+        return np.concatenate(samples)
+        
+    def capture_votes(self) -> Optional[FaceVote]:
+        """Vote over the newest frames the capture thread already has, None without frames"""
+        frames = self.last_n(3)
+        if not frames:
+            return None
+        vote = FaceVote()
+        for frame, _, corners in frames:
+            hsv, sampled = self.get_cell_hsv(frame, corners)
+            vote.add(self.classify(hsv), sampled)
+        return vote
         
     def capture_face(self) -> Optional[List[List[Color]]]:
         """Capture and process a cube face"""
@@ -146,39 +448,5 @@ class CameraHandler:
         if not self.cap:
             return None
             
-        # Wait for camera to stabilize (reduced from 0.5 to 0.1 seconds)
-        time.sleep(0.1)
-        
-        # Capture multiple frames and average the results
-        num_frames = 3  # Reduced from 5 to 3 frames
-        all_colors = []
-        
-        for _ in range(num_frames):
-            frame = self.get_frame()
-            if frame is None:
-                continue
-                
-            colors = self.get_cell_colors(frame)
-            all_colors.append(colors)
-            time.sleep(0.05)  # Reduced from 0.1 to 0.05 seconds
-            
-        if not all_colors:
-            return None
-            
-        # Process results
-        result = [[None for _ in range(3)] for _ in range(3)]
-        for row in range(3):
-            for col in range(3):
-                # Get most common color for this cell
-                cell_colors = [colors[row][col] for colors in all_colors]
-                color_counts = {}
-                for color in cell_colors:
-                    if color != Color.UNKNOWN:
-                        color_counts[color] = color_counts.get(color, 0) + 1
-                        
-                if color_counts:
-                    result[row][col] = max(color_counts.items(), key=lambda x: x[1])[0]
-                else:
-                    result[row][col] = Color.UNKNOWN
-                    
-        return result 
\ No newline at end of file
+        vote = self.capture_votes()
+        return vote.colors() if vote is not None else None
@@ -0,0 +1,221 @@
+import logging
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Frames (or the tracked region of them) are searched at this width
+WORK_WIDTH = 320
+
+# Smallest face, as a fraction of the searched area, and the largest, so the frame border isn't taken for a face
+MIN_AREA = 0.02
+MAX_AREA = 0.9
+
+# Longest side of a face over its shortest side, the face of a cube seen at an angle is still close to square
+MAX_SIDE_RATIO = 1.6
+
+# The tracked region is the last face grown by this fraction of its size on every side
+ROI_MARGIN = 0.3
+
+# Keep showing the last face this many frames after it was lost, so the grid doesn't flicker
+HOLD_FRAMES = 3
+
+# Weight of the new corners against the tracked ones, less jitter at the cost of some lag
+SMOOTHING = 0.6
+
+# Side of one cell in the straightened face patch
+CELL_SIZE = 32
+PATCH_SIZE = 3 * CELL_SIZE
+
+# Corners of the straightened face: top left, top right, bottom right, bottom left
+PATCH_CORNERS = np.float32([[0, 0], [PATCH_SIZE, 0], [PATCH_SIZE, PATCH_SIZE], [0, PATCH_SIZE]])
+
+# The outline found is that of the cube, the dark plastic around the stickers is cut off
+# up to this fraction of the face on every side, half a cell
+MAX_BORDER = 1 / 6
+
+# Brightness the stickers must have over the border for it to be cut off
+MIN_CONTRAST = 40
+
+# The border is measured in a straightened patch of this size, twice as fine as the cells are read
+FIT_SIZE = 2 * PATCH_SIZE
+FIT_CORNERS = np.float32([[0, 0], [FIT_SIZE, 0], [FIT_SIZE, FIT_SIZE], [0, FIT_SIZE]])
+
+# Fraction of a side's columns that must show the border before it is cut off
+MIN_EDGE_POINTS = 0.3
+
+
+def order_corners(points: np.ndarray) -> np.ndarray:
+    """Order four points as top left, top right, bottom right, bottom left"""
+    points = points.reshape(4, 2).astype(np.float32)
+    total = points.sum(axis=1)
+    diff = points[:, 1] - points[:, 0]
+    return np.float32([points[np.argmin(total)], points[np.argmin(diff)],
+                       points[np.argmax(total)], points[np.argmax(diff)]])
+
+
+def grid_lines(corners: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """The 8 lines of a 3x3 grid laid over the face, in frame coordinates, each as (start, end)"""
+    ticks = np.arange(4) * CELL_SIZE
+    points = [(t, 0) for t in ticks] + [(t, PATCH_SIZE) for t in ticks] + \
+             [(0, t) for t in ticks] + [(PATCH_SIZE, t) for t in ticks]
+    homography = cv2.getPerspectiveTransform(PATCH_CORNERS, corners)
+    mapped = cv2.perspectiveTransform(np.float32(points).reshape(-1, 1, 2), homography).reshape(-1, 2)
+    return [(mapped[i], mapped[i + 4]) for i in range(4)] + [(mapped[i + 8], mapped[i + 12]) for i in range(4)]
+
+
+def warp_face(frame: np.ndarray, corners: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Straighten the face inside corners into a PATCH_SIZE square patch, written to out if given"""
+    homography = cv2.getPerspectiveTransform(corners, PATCH_CORNERS)
+    return cv2.warpPerspective(frame, homography, (PATCH_SIZE, PATCH_SIZE), dst=out, flags=cv2.INTER_LINEAR)
+
+
+def _sticker_edges(band: np.ndarray, light: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Where the stickers start in every column of a band of rows along one side of a face
+
+    Args:
+        band: brightness, rows from the outside of the face in
+        light: brightness of the stickers
+
+    Returns:
+        tuple: the columns that go from dark plastic to stickers, and the first sticker row in each
+    """
+    dark_row = band.argmin(axis=0)
+    dark = band.min(axis=0)
+    rows = np.arange(len(band))[:, None]
+    inside = (band > (dark + light) / 2) & (rows > dark_row)
+    # Columns in the gap between two stickers never turn bright
+    found = inside.any(axis=0) & (light - dark >= MIN_CONTRAST)
+    columns = np.flatnonzero(found)
+    return columns.astype(np.float32), inside.argmax(axis=0)[columns].astype(np.float32)
+
+
+def patch_cell_means(patch: np.ndarray) -> np.ndarray:
+    """Mean color of the middle half of every cell of a straightened face, shape (3, 3, 3) uint8"""
+    quarter = CELL_SIZE // 4
+    cells = patch.reshape(3, CELL_SIZE, 3, CELL_SIZE, -1)[:, quarter:CELL_SIZE - quarter, :, quarter:CELL_SIZE - quarter]
+    return cells.mean(axis=(1, 3)).astype(np.uint8)
+
+
+class FaceDetector:
+    """
+    Finds the face of the cube held to the camera
+
+    The face is the largest convex, roughly square quadrilateral among the
+    edge contours of a downscaled frame, shrunk to the stickers inside the
+    plastic around them. Once a face is found only the region around it is
+    searched in the next frame, the whole frame is only searched again when
+    the face isn't in that region any more.
+    """
+    def __init__(self):
+        self.corners: Optional[np.ndarray] = None  # Last face found, in frame coordinates
+        self.misses = 0
+        self.kernel = np.ones((3, 3), dtype=np.uint8)
+
+    def reset(self):
+        self.corners = None
+        self.misses = 0
+
+    def detect(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Find the face in a frame
+
+        Returns:
+            np.ndarray: float32 corners of shape (4, 2), top left first and clockwise, or None
+        """
+        height, width = frame.shape[:2]
+        found = None
+        if self.corners is not None:
+            found = self._search(frame, self._roi(width, height))
+        if found is None:
+            found = self._search(frame, (0, 0, width, height))
+
+        if found is None:
+            self.misses += 1
+            if self.misses > HOLD_FRAMES:
+                self.corners = None
+            return self.corners
+
+        found = self._fit_stickers(frame, found)
+        if self.corners is not None and not self.misses:
+            found = SMOOTHING * found + (1 - SMOOTHING) * self.corners
+        self.corners = found.astype(np.float32)
+        self.misses = 0
+        return self.corners
+
+    def _roi(self, width: int, height: int) -> Tuple[int, int, int, int]:
+        """Region around the tracked face as (x0, y0, x1, y1)"""
+        (x0, y0), (x1, y1) = self.corners.min(axis=0), self.corners.max(axis=0)
+        margin_x, margin_y = ROI_MARGIN * (x1 - x0), ROI_MARGIN * (y1 - y0)
+        return (max(0, int(x0 - margin_x)), max(0, int(y0 - margin_y)),
+                min(width, int(x1 + margin_x) + 1), min(height, int(y1 + margin_y) + 1))
+
+    def _search(self, frame: np.ndarray, roi: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
+        """Largest face-like quadrilateral inside roi, in frame coordinates"""
+        x0, y0, x1, y1 = roi
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        scale = min(1.0, WORK_WIDTH / (x1 - x0))
+        size = (max(1, int((x1 - x0) * scale)), max(1, int((y1 - y0) * scale)))
+        small = cv2.resize(frame[y0:y1, x0:x1], size, interpolation=cv2.INTER_AREA)
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        median = float(np.median(gray))
+        edges = cv2.Canny(gray, max(10.0, 0.66 * median), max(30.0, 1.33 * median))
+        edges = cv2.dilate(edges, self.kernel)
+        contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        area_min = MIN_AREA * size[0] * size[1]
+        area_max = MAX_AREA * size[0] * size[1]
+        best, best_area = None, 0.0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < max(area_min, best_area) or area > area_max:
+                continue
+            quad = cv2.approxPolyDP(contour, 0.04 * cv2.arcLength(contour, True), True)
+            if len(quad) != 4 or not cv2.isContourConvex(quad):
+                continue
+            sides = np.linalg.norm(quad.reshape(4, 2) - np.roll(quad.reshape(4, 2), 1, axis=0), axis=1)
+            if sides.max() > MAX_SIDE_RATIO * sides.min():
+                continue
+            best, best_area = quad, area
+
+        if best is None:
+            return None
+        return order_corners(best) / np.float32(scale) + np.float32([x0, y0])
+
+    def _fit_stickers(self, frame: np.ndarray, corners: np.ndarray) -> np.ndarray:
+        """Corners of the stickers inside the outline of the cube found by _search"""
+        # Pixel (i, j) of the patch covers the square from (i, j) to (i + 1, j + 1) of the face
+        homography = cv2.getPerspectiveTransform(corners, FIT_CORNERS - 0.5)
+        patch = cv2.warpPerspective(frame, homography, (FIT_SIZE, FIT_SIZE), flags=cv2.INTER_LINEAR)
+        # Brightest channel, colored stickers are as bright as white ones against the plastic
+        value = np.maximum(np.maximum(patch[..., 0], patch[..., 1]), patch[..., 2])
+        border = int(MAX_BORDER * FIT_SIZE)
+        light = float(np.median(value[border:-border, border:-border]))
+        # Every side as the rows from the outside in, and where a point at (along, depth) is on the face
+        sides = [(value, lambda along, depth: (along, depth)),
+                 (value.T, lambda along, depth: (depth, along)),
+                 (value[::-1], lambda along, depth: (along, FIT_SIZE - depth)),
+                 (value.T[::-1], lambda along, depth: (FIT_SIZE - depth, along))]
+        lines = []
+        for rows, point in sides:
+            along, depth = _sticker_edges(rows[:border, border:-border].astype(np.float32), light)
+            if len(along) < MIN_EDGE_POINTS * (FIT_SIZE - 2 * border):
+                # No border on this side, the outline found is the stickers' already
+                along, depth = np.float32([border, FIT_SIZE - border]), np.float32([0, 0])
+            else:
+                along = along + border + 0.5
+            x, y = point(along, depth)
+            vx, vy, x0, y0 = cv2.fitLine(np.float32(np.column_stack([x, y])), cv2.DIST_HUBER, 0, 0.01, 0.01).ravel()
+            # The line as (a, b, c) with a x + b y + c = 0
+            lines.append((vy, -vx, vx * y0 - vy * x0))
+        # Top, left, bottom and right meet at the corners top left first and clockwise
+        lines = np.float64(lines)
+        fitted = np.cross(lines[[0, 0, 2, 2]], lines[[1, 3, 3, 1]])
+        fitted = np.float32(fitted[:, :2] / fitted[:, 2:])
+        inverse = cv2.getPerspectiveTransform(FIT_CORNERS, corners)
+        return cv2.perspectiveTransform(fitted.reshape(-1, 1, 2), inverse).reshape(4, 2)
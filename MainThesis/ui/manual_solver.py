@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, Text, WORD, END, messagebox, StringVar
 
+from cube.notation import names, parse
+
 class ManualSolutionInput:
     """Dialog for manually entering a sequence of Rubik's Cube moves"""
     def __init__(self, parent, callback):
@@ -85,7 +87,11 @@ Example: R U R' U' F' U F mR mL
             return
         
         # Parse the solution
-        moves = self._parse_solution(solution_text)
+        try:
+            moves = self._parse_solution(solution_text)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Could not parse the solution: {e}")
+            return
         
         if not moves:
             messagebox.showerror("Error", "Could not parse any valid moves. Please check your input.")
@@ -103,12 +109,6 @@ Example: R U R' U' F' U F mR mL
         self.dialog.destroy()
     
     def _parse_solution(self, solution_text):
-        """Parse the solution text into a list of moves"""
-        # Remove commas, normalize spacing
-        solution_text = solution_text.replace(',', ' ')
-        
-        # Match valid move patterns including cube rotations and middle layer moves
-        import re
-        # Updated pattern to include cube rotations (mR, mL) and middle layer moves (M, E, S)
-        move_pattern = r'(?:m[RL]|[RUFLBDMES])[\'2]?'
-        return re.findall(move_pattern, solution_text)
+        """Parse the solution text into a list of moves, raises ValueError for anything that isn't a move"""
+        # Commas and spaces between moves are optional
+        return names(parse(solution_text))
@@ -0,0 +1,154 @@
+import logging
+import time
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+logger = logging.getLogger(__name__)
+
+# Delay between preview updates in ms, the preview backs off towards MAX_DELAY when drawing gets slow
+MIN_DELAY = 10
+MAX_DELAY = 100
+
+# How often the achieved frame rate is reported, in seconds
+REPORT_INTERVAL = 5.0
+
+STAGES = ("resize", "convert", "grid", "paste")
+
+
+class PreviewStats:
+    """Frame rate and time per stage of the camera preview"""
+    def __init__(self):
+        self.frames = 0      # Frames shown since the last report
+        self.skipped = 0     # Updates without a new camera frame since the last report
+        self.fps = 0.0
+        self.stage_ms: Dict[str, float] = {stage: 0.0 for stage in STAGES}  # Moving average per stage
+        self.window_start = time.monotonic()
+
+    def add(self, stage: str, seconds: float):
+        """Fold one stage duration into its moving average"""
+        self.stage_ms[stage] += 0.1 * (1000 * seconds - self.stage_ms[stage])
+
+    def tick(self) -> bool:
+        """Update fps once the report interval has passed, returns True when it did"""
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed < REPORT_INTERVAL:
+            return False
+        self.fps = self.frames / elapsed
+        logger.debug("Camera preview: %s", self)
+        self.frames = 0
+        self.skipped = 0
+        self.window_start = now
+        return True
+
+    def __str__(self):
+        stages = ", ".join(f"{stage} {ms:.1f} ms" for stage, ms in self.stage_ms.items())
+        return f"{self.fps:.1f} fps ({stages}, {self.skipped} idle updates)"
+
+
+class CameraPreview:
+    """
+    Shows the camera feed in a label
+
+    A frame is only drawn when the capture thread has a new one. It is shrunk
+    to the space the label has before anything else is done to it, converted
+    into a buffer that is reused, and pasted into the same PhotoImage every time.
+    """
+    def __init__(self, widget, label, camera, frame=None):
+        """
+        Args:
+            widget: the widget whose after() schedules the updates
+            label: the label that shows the feed, the preview fits into its parent
+            camera: the CameraHandler to read frames from
+            frame: optional LabelFrame whose title shows the achieved frame rate
+        """
+        self.widget = widget
+        self.label = label
+        self.camera = camera
+        self.frame = frame
+        self.title = frame.cget("text") if frame is not None else None
+        self.stats = PreviewStats()
+        self.delay = MIN_DELAY
+        self.last_timestamp: Optional[float] = None
+        self.small: Optional[np.ndarray] = None
+        self.rgb: Optional[np.ndarray] = None
+        self.photo: Optional[ImageTk.PhotoImage] = None
+
+    def start(self, delay: int = 100):
+        """Show the first frame after delay ms"""
+        self.widget.after(delay, self.update)
+
+    def update(self):
+        """Draw the newest frame if there is one and schedule the next update"""
+        start = time.perf_counter()
+        frame, timestamp = self._next_frame()
+        if frame is None:
+            self.stats.skipped += 1
+        else:
+            self.last_timestamp = timestamp
+            self._show(frame, timestamp)
+            self.stats.frames += 1
+            # Keep the preview to about a third of the Tk thread whatever the hardware
+            busy_ms = 1000 * (time.perf_counter() - start)
+            self.delay = max(MIN_DELAY, min(MAX_DELAY, int(2 * busy_ms)))
+        if self.stats.tick() and self.frame is not None and self.camera.camera_available:
+            self.frame.configure(text=f"{self.title} ({self.stats.fps:.0f} fps)")
+        self.widget.after(self.delay, self.update)
+
+    def _next_frame(self) -> Tuple[Optional[np.ndarray], Optional[float]]:
+        """The newest camera frame and its timestamp, (None, None) if it has already been shown"""
+        if self.camera.camera_available:
+            latest = self.camera.latest()
+            if latest is None or latest[1] == self.last_timestamp:
+                return None, None
+            return latest
+        # Without a camera there is only the blank frame, drawn once
+        if self.last_timestamp is not None:
+            return None, None
+        return self.camera.get_frame(), 0.0
+
+    def _target_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Size of the preview for a frame of width x height, fitted to the label's parent and never enlarged"""
+        parent = self.label.master
+        available_width, available_height = parent.winfo_width(), parent.winfo_height()
+        if available_width <= 1 or available_height <= 1:
+            # Not laid out yet
+            return width, height
+        scale = min(available_width / width, available_height / height, 1.0)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def _show(self, frame: np.ndarray, timestamp: float):
+        height, width = frame.shape[:2]
+        # The grid is placed on the camera frame so face capture samples the right pixels
+        self.camera.place_grid(width, height)
+        size = self._target_size(width, height)
+
+        t0 = time.perf_counter()
+        if self.rgb is None or self.rgb.shape[1::-1] != size:
+            self.small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self.rgb = np.empty_like(self.small)
+        if size == (width, height):
+            small = frame
+        else:
+            small = cv2.resize(frame, size, dst=self.small, interpolation=cv2.INTER_AREA)
+        t1 = time.perf_counter()
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        t2 = time.perf_counter()
+        corners = self.camera.face_corners(timestamp) if self.camera.camera_available else None
+        self.camera.draw_grid(self.rgb, scale=size[0] / width, corners=corners)
+        t3 = time.perf_counter()
+        image = Image.fromarray(self.rgb)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != size:
+            self.photo = ImageTk.PhotoImage(image=image)
+            self.label.configure(image=self.photo)
+            self.label.image = self.photo
+        else:
+            self.photo.paste(image)
+        t4 = time.perf_counter()
+
+        self.stats.add("resize", t1 - t0)
+        self.stats.add("convert", t2 - t1)
+        self.stats.add("grid", t3 - t2)
+        self.stats.add("paste", t4 - t3)
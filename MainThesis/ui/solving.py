@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+from cube.state import CubeState
+from cube.rubiks_cube_bridge import RubiksCubeBridge
+
+logger = logging.getLogger(__name__)
+
+# How often the Tk thread looks for news from the solve, in ms
+POLL_INTERVAL = 50
+
+
+class SolveResult:
+    """What a finished solve hands back to the Tk thread"""
+    def __init__(self, bridge: RubiksCubeBridge, solution: str, moves_by_step: dict, verified: Optional[bool]):
+        self.bridge = bridge
+        self.solution = solution
+        self.moves_by_step = moves_by_step
+        self.verified = verified  # The solution solves the scanned cube, None if checking it failed
+
+
+class SolveTask:
+    """
+    Solves a cube on a worker thread so the window keeps running
+
+    The solver and the check of its solution run on the worker, which only ever
+    puts messages in a queue. The Tk thread reads the queue with after() and
+    calls the callbacks, so they may touch the widgets.
+    """
+    def __init__(self, widget, state: CubeState, on_progress: Callable[[str, int, int], None],
+                 on_done: Callable[[SolveResult], None], on_error: Callable[[Exception], None],
+                 solver: str = "beginners", profile: bool = False):
+        """
+        Args:
+            widget: the widget whose after() polls the worker
+            state: the cube to solve, copied so it can be changed while solving
+            on_progress: called with (stage name, stage number, number of stages) when a solver stage starts
+            on_done: called with the SolveResult when a solution was found
+            on_error: called with the exception when solving failed or was cancelled
+            solver: the RubiksCubeBridge solver to use
+            profile: fill in the bridge's solve_stats, see RubiksCubeBridge
+        """
+        self.widget = widget
+        self.state = state.copy()
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.solver = solver
+        self.profile = profile
+        self.cancel_event = threading.Event()
+        self.messages: queue.Queue = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="solver", daemon=True)
+        self.thread.start()
+        self.widget.after(POLL_INTERVAL, self._poll)
+
+    def cancel(self):
+        """Ask the solver to stop, on_error gets a SolveCancelled once it has"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        """Worker thread: solve, check the solution and report back through the queue"""
+        try:
+            bridge = RubiksCubeBridge(profile=self.profile)
+            if not bridge.rubiks_cube_available:
+                raise ImportError("rubiks_cube solver not available. Please install it first.")
+            solution, moves_by_step = bridge.solve_with_rubiks_cube(
+                self.state, self.solver,
+                progress=lambda *stage: self.messages.put(("progress", stage)),
+                cancel=self.cancel_event)
+            try:
+                test_cube = self.state.copy()
+                test_cube.sequence(solution)
+                verified = test_cube.is_solved()
+            except Exception:
+                logger.exception("Checking the solution failed")
+                verified = None
+            self.messages.put(("done", SolveResult(bridge, solution, moves_by_step, verified)))
+        except Exception as e:
+            self.messages.put(("error", e))
+
+    def _poll(self):
+        """Tk thread: hand the worker's messages to the callbacks, poll again until the solve is over"""
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.on_progress(*payload)
+            elif kind == "done":
+                self.on_done(payload)
+                return
+            else:
+                self.on_error(payload)
+                return
+        self.widget.after(POLL_INTERVAL, self._poll)
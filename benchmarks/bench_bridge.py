@@ -0,0 +1,81 @@
+"""
+The MainThesis side: CubeState and the bridge to the rubiks_cube solver.
+"""
+import pytest
+
+from cube.rubiks_cube_bridge import RubiksCubeBridge
+from cube.state import CubeState
+
+
+@pytest.fixture(scope='module')
+def cube_states(scrambles):
+    res = []
+    for scramble in scrambles:
+        state = CubeState()
+        state.set_solved()
+        state.sequence(scramble)
+        res.append(state)
+    return res
+
+
+@pytest.fixture(scope='module')
+def solved_bridge(cube_states):
+    bridge = RubiksCubeBridge()
+    bridge.solve_with_rubiks_cube(cube_states[0])
+    return bridge
+
+
+@pytest.mark.benchmark(group='cube state')
+def test_move(benchmark, scrambles):
+    state = CubeState()
+    state.set_solved()
+    moves = [move for scramble in scrambles[:10] for move in scramble.split()]
+
+    def run():
+        for move in moves:
+            state.move(move)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='cube state')
+def test_sequence(benchmark, scrambles):
+    state = CubeState()
+    state.set_solved()
+
+    def run():
+        for scramble in scrambles:
+            state.sequence(scramble)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='cube state')
+def test_copy(benchmark, cube_states):
+    def run():
+        for state in cube_states:
+            state.copy()
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='bridge')
+def test_convert_to_rubiks_cube_format(benchmark, cube_states):
+    bridge = RubiksCubeBridge()
+
+    def run():
+        for state in cube_states:
+            bridge.convert_to_rubiks_cube_format(state)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='bridge')
+def test_get_state_at_step(benchmark, solved_bridge):
+    steps = range(len(solved_bridge.solution_moves) + 1)
+
+    def run():
+        for step in steps:
+            solved_bridge.get_state_at_step(step)
+
+    benchmark(run)
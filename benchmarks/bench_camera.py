@@ -0,0 +1,77 @@
+"""
+Reading sticker colors from synthetic camera frames, no camera needed.
+
+Every frame is noise with a face of nine colored stickers drawn on it, under
+the fixed grid and at a known position for the detected face path.
+"""
+import numpy as np
+import pytest
+
+from ui.camera import CameraHandler
+from ui.detection import FaceDetector
+
+FRAME_COUNT = 20
+WIDTH, HEIGHT = 1280, 720
+# BGR colors of the stickers
+STICKERS = [(255, 255, 255), (0, 220, 255), (0, 0, 200), (0, 128, 255), (0, 160, 0), (200, 60, 0)]
+
+
+@pytest.fixture(scope='module')
+def camera():
+    camera = CameraHandler()
+    camera.place_grid(WIDTH, HEIGHT)
+    return camera
+
+
+@pytest.fixture(scope='module')
+def frames(camera):
+    """
+    :return: list of (frame, corners of the face drawn on it)
+    """
+    rng = np.random.default_rng(1)
+    step = camera.grid_size + camera.grid_margin
+    size = 3 * camera.grid_size + 2 * camera.grid_margin
+    x0, y0 = camera.grid_offset_x, camera.grid_offset_y
+    res = []
+    for _ in range(FRAME_COUNT):
+        frame = rng.normal(110, 25, (HEIGHT, WIDTH, 3)).clip(0, 255).astype(np.uint8)
+        frame[y0 - 6:y0 + size + 6, x0 - 6:x0 + size + 6] = 20
+        for row in range(3):
+            for col in range(3):
+                color = STICKERS[rng.integers(len(STICKERS))]
+                y, x = y0 + row * step, x0 + col * step
+                frame[y:y + camera.grid_size, x:x + camera.grid_size] = color
+        corners = np.float32([[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size]])
+        res.append((frame, corners))
+    return res
+
+
+@pytest.mark.benchmark(group='camera')
+def test_get_cell_colors_grid(benchmark, camera, frames):
+    def run():
+        for frame, _ in frames:
+            camera.get_cell_colors(frame)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='camera')
+def test_get_cell_colors_face(benchmark, camera, frames):
+    def run():
+        for frame, corners in frames:
+            camera.get_cell_colors(frame, corners)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='camera')
+def test_detect_face(benchmark, frames):
+    detector = FaceDetector()
+
+    def run():
+        # a new detector every round searches the whole first frame and tracks the rest
+        detector.reset()
+        for frame, _ in frames:
+            detector.detect(frame)
+
+    benchmark(run)
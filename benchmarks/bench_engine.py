@@ -0,0 +1,65 @@
+"""
+The rubiks_cube sticker engine: single turns, sequences and converting states.
+"""
+import pytest
+
+from Cube.cube import Cube
+from Cube.engine import SIDES
+from Cube.notation import parse
+
+
+@pytest.mark.benchmark(group='engine')
+def test_turn(benchmark):
+    cube = Cube()
+    turns = [(side, direction) for side in SIDES for direction in ('r', 'l')]
+
+    def run():
+        for side, direction in turns:
+            cube.turn(side, direction)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='engine')
+def test_sequence_text(benchmark, scrambles):
+    cube = Cube()
+
+    def run():
+        for scramble in scrambles:
+            cube.sequence(scramble)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='engine')
+def test_sequence_codes(benchmark, scrambles):
+    cube = Cube()
+    codes = [parse(scramble) for scramble in scrambles]
+
+    def run():
+        for sequence in codes:
+            cube.sequence(sequence)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='engine')
+def test_load_cube(benchmark, states):
+    cube = Cube()
+
+    def run():
+        for state in states:
+            cube.load_cube(state)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='engine')
+def test_get_cube_colors(benchmark, states):
+    cubes = [Cube(state) for state in states]
+
+    def run():
+        for cube in cubes:
+            cube.get_cube_colors()
+
+    benchmark(run)
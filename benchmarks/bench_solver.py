@@ -0,0 +1,117 @@
+"""
+The solvers: every step of the beginners method on its own, the simplifier
+that replaced __optimize_sequence, whole solves and the solution cache.
+"""
+import pytest
+
+from Cube.cube import Cube
+from Cube.notation import simplify
+from Cube.Solver.beginners.solver import STEPS, solve_3x3
+from Cube.Solver.cache import SolutionCache
+from Cube.Solver.profile import SolveStats
+from Cube.Solver.twophase.solver import solve_3x3 as solve_3x3_twophase
+from Cube.symmetry import canonicalize
+
+# two-phase solves take tens of milliseconds, a slice of the corpus is enough
+TWOPHASE_CORPUS = 10
+
+
+@pytest.fixture(scope='module')
+def step_inputs(states):
+    """
+    :return: dict of step name -> (colors before the step for every state, raw moves of the step for every state)
+    """
+    res = {name: ([], []) for name, _, _ in STEPS}
+    for state in states:
+        cube = Cube(state)
+        for name, _, step in STEPS:
+            res[name][0].append(cube.get_cube_colors())
+            res[name][1].append(step(cube))
+    return res
+
+
+@pytest.mark.benchmark(group='beginners steps')
+@pytest.mark.parametrize('name', [name for name, _, _ in STEPS])
+def test_step(benchmark, step_inputs, name):
+    step = next(step for step_name, _, step in STEPS if step_name == name)
+    before = step_inputs[name][0]
+
+    def setup():
+        return ([Cube(colors) for colors in before],), {}
+
+    def run(cubes):
+        for cube in cubes:
+            step(cube)
+
+    benchmark.pedantic(run, setup=setup, rounds=10)
+
+
+@pytest.mark.benchmark(group='simplify')
+def test_simplify(benchmark, step_inputs):
+    # the same text comes up again and again in a solve, but not across benchmark rounds
+    sequences = [' '.join(moves) for moves in zip(*(step_inputs[name][1] for name, _, _ in STEPS))]
+
+    def run():
+        simplify.cache_clear()
+        for sequence in sequences:
+            simplify(sequence)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='solve')
+def test_solve_beginners(benchmark, states):
+    cubes = [Cube(state) for state in states]
+
+    def run():
+        for cube in cubes:
+            solve_3x3(cube)
+
+    benchmark.pedantic(run, rounds=5)
+
+
+@pytest.mark.benchmark(group='solve')
+def test_solve_beginners_profiled(benchmark, states):
+    cubes = [Cube(state) for state in states]
+
+    def run():
+        for cube in cubes:
+            solve_3x3(cube, stats=SolveStats())
+
+    benchmark.pedantic(run, rounds=5)
+
+
+@pytest.mark.benchmark(group='solve')
+def test_solve_twophase(benchmark, states):
+    cubes = [Cube(state) for state in states[:TWOPHASE_CORPUS]]
+    # building or mapping the tables isn't part of a solve
+    solve_3x3_twophase(cubes[0])
+
+    def run():
+        for cube in cubes:
+            solve_3x3_twophase(cube)
+
+    benchmark.pedantic(run, rounds=3)
+
+
+@pytest.mark.benchmark(group='cache')
+def test_canonicalize(benchmark, states):
+    def run():
+        for state in states:
+            canonicalize(state)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group='cache')
+@pytest.mark.parametrize('symmetric', [False, True], ids=['plain', 'symmetric'])
+def test_cache_hit(benchmark, states, symmetric):
+    cache = SolutionCache(symmetric=symmetric)
+    for state in states:
+        cache.solve(state, solve_3x3)
+
+    def run():
+        for state in states:
+            cache.get(state)
+
+    benchmark(run)
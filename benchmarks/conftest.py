@@ -0,0 +1,60 @@
+"""
+Shared setup for the benchmarks: import paths and fixed-seed scramble corpora.
+
+Every corpus is drawn from its own random.Random(SEED), so two runs, on two
+commits or two machines, time exactly the same cubes.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for __package in ('rubiks_cube', 'MainThesis'):
+    __path = os.path.join(ROOT, __package)
+    if __path not in sys.path:
+        sys.path.insert(0, __path)
+
+SEED = 20251201
+CORPUS_SIZE = 100
+SCRAMBLE_LENGTH = 25
+FACES = ['U', 'L', 'F', 'R', 'B', 'D']
+SUFFIXES = ['', "'", '2']
+
+
+def make_scrambles(count=CORPUS_SIZE, length=SCRAMBLE_LENGTH, seed=SEED):
+    """
+    :return: count scrambles, each a string of length face turns, the same for the same seed
+    """
+    rng = random.Random(seed)
+    scrambles = []
+    for _ in range(count):
+        moves = []
+        last = None
+        while len(moves) < length:
+            face = rng.choice(FACES)
+            if face != last:
+                moves.append(face + rng.choice(SUFFIXES))
+                last = face
+        scrambles.append(' '.join(moves))
+    return scrambles
+
+
+@pytest.fixture(scope='session')
+def scrambles():
+    return make_scrambles()
+
+
+@pytest.fixture(scope='session')
+def states(scrambles):
+    """
+    :return: the rubiks_cube color strings of the scrambles
+    """
+    from Cube.cube import Cube
+    res = []
+    for scramble in scrambles:
+        cube = Cube()
+        cube.sequence(scramble)
+        res.append(cube.get_cube_colors())
+    return res
@@ -0,0 +1,100 @@
+"""
+Solve many cubes at once on a process pool.
+
+Every state is a 54 character string in Cube.get_cube_colors() order. States
+are sent to the workers in chunks so the pickling cost is paid per chunk and
+not per cube. A state that fails to solve is reported in its result instead
+of stopping the batch. Every process keeps the solutions it found in a
+SolutionCache, so a state that comes up again is not solved again.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Cube.engine import SLOT_COUNT
+from Cube.Solver.beginners.solver import solve_3x3
+from Cube.Solver.cache import SolutionCache
+
+CHUNKSIZE = 64
+
+# error is None when the state was solved, otherwise solution and
+# moves_by_step are None and error holds "ExceptionType: message"
+SolveResult = namedtuple('SolveResult', ['state', 'solution', 'moves_by_step', 'error'])
+
+CACHE = SolutionCache()
+
+
+def solve_one(state, cache=CACHE):
+    """
+    solve a single state without touching the caller's cubes
+    :param state: 54 character string of colors
+    :param cache: SolutionCache to look the state up in and to remember the solution in
+    :return: SolveResult
+    """
+    try:
+        if len(state) != SLOT_COUNT:
+            raise ValueError(f'expected {SLOT_COUNT} colors, got {len(state)}')
+        solution, moves_by_step = cache.solve(state, solve_3x3)
+        return SolveResult(state, solution, moves_by_step, None)
+    except Exception as e:
+        return SolveResult(state, None, None, f'{type(e).__name__}: {e}')
+
+
+def _solve_chunk(chunk):
+    return [(i, solve_one(state)) for i, state in chunk]
+
+
+def _chunks(states, size):
+    chunk = []
+    for item in enumerate(states):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_solutions(states, workers=None, chunksize=CHUNKSIZE):
+    """
+    stream solutions as the workers finish them
+    :param states: iterable of 54 character strings, read lazily
+    :param workers: number of processes, defaults to the cpu count
+    :param chunksize: number of states sent to a worker at a time
+    :return: generator of (index in states, SolveResult) in completion order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(states, chunksize):
+            yield from _solve_chunk(chunk)
+        return
+
+    chunks = _chunks(states, chunksize)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # keep every worker busy without reading the whole input up front
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_solve_chunk, chunk))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(pool.submit(_solve_chunk, chunk))
+
+
+def solve_many(states, workers=None, chunksize=CHUNKSIZE):
+    """
+    solve every state on a process pool
+    :param states: iterable of 54 character strings
+    :param workers: number of processes, defaults to the cpu count
+    :param chunksize: number of states sent to a worker at a time
+    :return: list of SolveResult in the same order as states
+    """
+    results = {}
+    for i, result in iter_solutions(states, workers, chunksize):
+        results[i] = result
+    return [results[i] for i in range(len(results))]
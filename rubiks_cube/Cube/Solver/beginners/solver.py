@@ -1,4 +1,18 @@
+import logging
+import time
+
 from Cube.cube import Cube
+from Cube.engine import CORNER, EDGE
+from Cube.invariants import check
+from Cube.pieces import CENTER_SLOTS
+from Cube.notation import simplify
+from Cube.Solver.budget import MAX_MOVES, MAX_SECONDS, Budget, BudgetedCube, SolveCancelled, SolverStalled
+from Cube.Solver.profile import ProfiledCube
+
+logger = logging.getLogger(__name__)
+
+# the steps look for pieces by the colors of a solved Cube
+SOLVED_CENTERS = [Cube().get_cube_colors()[slot] for slot in CENTER_SLOTS]
 
 
 def __solve_cross(cube):
@@ -256,16 +270,7 @@ def __solve_corners(cube):
 def __solve_second_layer(cube):
     color_to_norm = {'g': (2, -1), 'o': (0, -1), 'b': (2, 1), 'r': (0, 1)}
     res = ''
-    edges = __get_all_edges(cube)
-    newEdges = []
-    for edge in edges:
-        currentEdgeColors = [edge.color, __get_neighbors(cube, edge)[0].color]
-        goodEdge = True
-        if 'w' in currentEdgeColors or 'y' in currentEdgeColors:
-            goodEdge = False
-        if goodEdge:
-            newEdges.append(edge)
-    edges = newEdges
+    edges = __get_middle_edges(cube)
 
     for edge in edges:
         already_solved = True
@@ -503,55 +508,26 @@ def __pll_step_2(cube):
 
 
 def __get_yellow_edges(cube):
-    edges = []
-    for cell in cube.cells:
-        if cell.color == 'y':
-            i = 0
-            for point in cell.point:
-                if point == 0:
-                    i += 1
-            if i == 1:
-                edges.append(cell)
-
-    return edges
+    return [cube.cells[i] for i in cube.stickers.find(EDGE, 'y')]
 
 
-def __get_all_edges(cube):
-    edges = []
-    for cell in cube.cells:
-        i = 0
-        for point in cell.point:
-            if point == 0:
-                i += 1
-        if i == 1:
-            edges.append(cell)
-
-    return edges
+def __get_middle_edges(cube):
+    stickers = []
+    for colors in (('g', 'r'), ('r', 'b'), ('b', 'o'), ('o', 'g')):
+        stickers.extend(cube.stickers.piece(colors))
+    return [cube.cells[i] for i in sorted(stickers)]
 
 
 def __get_all_corners(cube):
-    corners = []
-    for cell in cube.cells:
-        if 0 not in cell.point:
-            corners.append(cell)
-    return corners
+    return [cube.cells[i] for i in cube.stickers.find(CORNER)]
 
 
 def __get_yellow_corners(cube):
-    corners = []
-    for cell in cube.cells:
-        if cell.color == 'y':
-            if 0 not in cell.point:
-                corners.append(cell)
-    return corners
+    return [cube.cells[i] for i in cube.stickers.find(CORNER, 'y')]
 
 
 def __get_neighbors(cube, cell):
-    res = []
-    for item in cube.cells:
-        if item.point == cell.point and item != cell:
-            res.append(item)
-    return res
+    return [cube.cells[i] for i in cube.stickers.neighbors(cell.index)]
 
 
 def __get_side_corners(cube, side):
@@ -581,6 +557,18 @@ def __get_side_edges(cube, side):
     return res
 
 
+# (name, what it does, function) of every step in the order they are done
+STEPS = [
+    ("Yellow cross", "Creating the yellow cross", __solve_cross),
+    ("Yellow corners", "Solving the yellow corners", __solve_corners),
+    ("Second layer", "Solving the second (middle) layer", __solve_second_layer),
+    ("OLL Step 1", "Orienting the last layer (OLL Step 1)", __oll_step_1),
+    ("OLL Step 2", "Completing the yellow face (OLL Step 2)", __oll_step_2),
+    ("PLL Step 1", "Positioning last layer corners (PLL Step 1)", __pll_step_1),
+    ("PLL Step 2", "Positioning last layer edges (PLL Step 2)", __pll_step_2),
+]
+
+
 def __get_side_corners_map(cube, side, color):
     res = ''
     mat = cube.get_side_in_matrix(side)
@@ -612,167 +600,70 @@ def __get_side_edges_map(cube, side, color):
     return res
 
 
-def __optimize_sequence(sequence):
+def solve_3x3(cube, max_moves=MAX_MOVES, max_seconds=MAX_SECONDS, progress=None, cancel=None, stats=None):
     """
-    Optimize a move sequence by:
-    - Combining repeated moves (U U = U2, U U U = U')
-    - Removing canceling moves (U U' = nothing, U U U U = nothing)
-    - Simplifying sequences
+    solve a cube with the beginners method
+    :param cube: Cube to solve, it is turned while solving and put back afterwards
+    :param max_moves: moves the steps may make in total before giving up, None for no limit
+    :param max_seconds: time the steps may take in total before giving up, None for no limit
+    :param progress: called with (step name, step number, number of steps) before every step
+    :param cancel: threading.Event that stops the solve when it is set
+    :param stats: SolveStats from Cube.Solver.profile to fill in with the time, turns, sticker reads
+                  and moves of every step, None to count nothing
+    :return: solution string, dict of step name -> moves
+    :raise ValueError: for a cube that can't be solved
+    :raise SolverStalled: when a step runs out of moves or time
+    :raise SolveCancelled: when cancel was set
     """
-    if not sequence or not sequence.strip():
-        return ''
-    
-    sequence = sequence.split()
-    if not sequence:
-        return ''
-    
-    res = []
-    i = 0
-    
-    while i < len(sequence):
-        move = sequence[i]
-        
-        if move.startswith('m'):
-            rotation_count = 0
-            iterator = 0
-            
-            while i + iterator < len(sequence):
-                current_move = sequence[i + iterator]
-                
-                if not current_move.startswith('m'):
-                    break
-                
-                if current_move == 'mR':
-                    rotation_count += 1
-                elif current_move == 'mL':
-                    rotation_count -= 1
-                elif current_move == 'mR2' or current_move == 'mL2':
-                    if current_move == 'mR2':
-                        rotation_count += 2
-                    else:
-                        rotation_count -= 2
-                elif len(current_move) == 3 and current_move[1] in ['R', 'L']:
-                    if current_move == "mR'":
-                        rotation_count -= 1
-                    elif current_move == "mL'":
-                        rotation_count += 1
-                else:
-                    if 'R' in current_move:
-                        rotation_count += 1
-                    else:
-                        rotation_count -= 1
-                
-                iterator += 1
-            
-            normalized = rotation_count % 4
-            
-            if normalized == 0:
-                pass
-            elif normalized == 1:
-                res.append('mR')
-            elif normalized == 2:
-                res.append('mR')
-                res.append('mR')
-            elif normalized == 3:
-                res.append('mL')
-            else:
-                res.append(move)
-            
-            i += iterator
-            continue
-        
-        base_face = move[0] if move else ''
-        if not base_face or base_face not in 'RUFLBDMES':
-            i += 1
-            continue
-        
-        repeat_count = 0
-        iterator = 0
-        
-        while i + iterator < len(sequence):
-            current_move = sequence[i + iterator]
-            
-            if current_move.startswith('m') or (current_move and current_move[0] != base_face):
-                break
-            
-            if len(current_move) == 1:
-                repeat_count += 1
-            elif len(current_move) == 2:
-                if current_move[1] == "'" or current_move[1] == '`':
-                    repeat_count -= 1
-                elif current_move[1] == '2':
-                    repeat_count += 2
-                else:
-                    repeat_count += 1
-            else:
-                repeat_count += 1
-            
-            iterator += 1
-        
-        normalized = repeat_count % 4
-        
-        if normalized == 0:
-            pass
-        elif normalized == 1:
-            res.append(base_face)
-        elif normalized == 2:
-            res.append(base_face + '2')
-        elif normalized == 3:
-            res.append(base_face + "'")
-        else:
-            res.append(move)
-        
-        i += iterator
-    
-    return ' '.join(res) if res else ''
-
-
-def solve_3x3(cube):
     colors = cube.get_cube_colors()
+    # the steps below loop until their case shows up, which never happens on an impossible cube
+    reason = check(colors)
+    if reason:
+        raise ValueError(f"the cube can't be solved: {reason}")
+    if [colors[slot] for slot in CENTER_SLOTS] != SOLVED_CENTERS:
+        raise ValueError("the beginners solver needs the centers where a solved Cube has them")
+
+    budget = Budget(max_moves, max_seconds, cancel)
+    if stats is None:
+        budgeted = BudgetedCube(cube, budget)
+    else:
+        budgeted = ProfiledCube(cube, budget, stats)
+        stats.begin()
     moves_by_step = {}
-
-    print("[Step 1] Creating the yellow cross...")
-    step1 = __solve_cross(cube)
-    moves_by_step["Yellow cross"] = step1
-
-    print("[Step 2] Solving the yellow corners...")
-    step2 = __solve_corners(cube)
-    moves_by_step["Yellow corners"] = step2
-
-    print("[Step 3] Solving the second (middle) layer...")
-    step3 = __solve_second_layer(cube)
-    moves_by_step["Second layer"] = step3
-
-    print("[Step 4] Orienting the last layer (OLL Step 1)...")
-    step4 = __oll_step_1(cube)
-    moves_by_step["OLL Step 1"] = step4
-
-    print("[Step 5] Completing the yellow face (OLL Step 2)...")
-    step5 = __oll_step_2(cube)
-    moves_by_step["OLL Step 2"] = step5
-
-    print("[Step 6] Positioning last layer corners (PLL Step 1)...")
-    step6 = __pll_step_1(cube)
-    moves_by_step["PLL Step 1"] = step6
-
-    print("[Step 7] Positioning last layer edges (PLL Step 2)...")
-    step7 = __pll_step_2(cube)
-    moves_by_step["PLL Step 2"] = step7
-
+    try:
+        for number, (name, description, step) in enumerate(STEPS, 1):
+            logger.info("[Step %d] %s...", number, description)
+            if progress is not None:
+                progress(name, number, len(STEPS))
+            budget.start(name)
+            if stats is not None:
+                stats.start(name)
+            moves_by_step[name] = step(budgeted)
+            if stats is not None:
+                stats.finish(moves_by_step[name])
+            budget.finish()
+    except SolveCancelled as e:
+        logger.info("Stopped solving: %s", e)
+        cube.load_cube(colors)
+        raise
+    except SolverStalled as e:
+        logger.warning("Gave up solving: %s", e)
+        cube.load_cube(colors)
+        raise
+
+    simplify_start = time.perf_counter()
     # Optimize each step individually
     optimized_moves_by_step = {}
     for step_name, moves in moves_by_step.items():
-        if moves and moves.strip():
-            optimized_moves_by_step[step_name] = __optimize_sequence(moves).strip()
-        else:
-            optimized_moves_by_step[step_name] = moves
+        optimized_moves_by_step[step_name] = simplify(moves)
 
-    # Also optimize the full sequence (join all steps with spaces)
-    step_sequences = [moves for moves in optimized_moves_by_step.values() if moves and moves.strip()]
-    full_sequence = ' '.join(step_sequences)
-    optimized = __optimize_sequence(full_sequence)
+    # Also optimize the full sequence, moves cancel across the steps too
+    optimized = simplify(' '.join(optimized_moves_by_step.values()))
+    if stats is not None:
+        stats.simplified(optimized_moves_by_step, optimized, time.perf_counter() - simplify_start)
+        logger.debug("Solve stats: %s", stats)
 
     cube.load_cube(colors)
 
-    print("Finished solving!")
+    logger.info("Finished solving!")
     return optimized, optimized_moves_by_step
\ No newline at end of file
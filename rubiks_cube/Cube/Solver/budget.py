@@ -0,0 +1,139 @@
+"""
+Limits on how much work a solver may do on one cube.
+
+The steps of the beginners solver turn the cube until the case they wait for
+shows up. On a cube they don't expect that case may never come, and the step
+turns forever. A Budget caps the number of moves and the time of a whole
+solve, and BudgetedCube charges every move a step makes against it, so a
+step that goes round in circles is stopped with a SolverStalled error that
+says which step it was and what had been done so far. The same check stops a
+solve that the caller has cancelled.
+"""
+import time
+
+from Cube.notation import names, parse
+
+# a beginners solve takes 100 to 250 moves before simplifying
+MAX_MOVES = 2000
+MAX_SECONDS = 5.0
+
+
+class SolverStalled(RuntimeError):
+    """
+    a solver step ran out of moves or time
+    :ivar stage: name of the step that stalled
+    :ivar moves: every move made before it stopped, separated by spaces
+    :ivar moves_by_step: dict of step name -> moves of the steps that finished
+    :ivar reason: what ran out
+    """
+    def __init__(self, stage, moves, moves_by_step, reason):
+        super().__init__(f'{stage} stalled: {reason} after {len(moves.split())} moves')
+        self.stage = stage
+        self.moves = moves
+        self.moves_by_step = moves_by_step
+        self.reason = reason
+
+    def __reduce__(self):
+        # the default passes self.args, the message, back to __init__, which a process pool can't unpickle
+        return type(self), (self.stage, self.moves, self.moves_by_step, self.reason)
+
+
+class SolveCancelled(SolverStalled):
+    """
+    the solve was cancelled by the caller
+    """
+    def __init__(self, stage, moves, moves_by_step):
+        super().__init__(stage, moves, moves_by_step, 'cancelled')
+        self.args = (f'{stage} cancelled after {len(moves.split())} moves',)
+
+    def __reduce__(self):
+        return type(self), (self.stage, self.moves, self.moves_by_step)
+
+
+class Budget:
+    def __init__(self, max_moves=MAX_MOVES, max_seconds=MAX_SECONDS, cancel=None):
+        """
+        :param max_moves: moves allowed over all steps, None for no limit
+        :param max_seconds: wall time allowed for the whole solve, None for no limit
+        :param cancel: threading.Event, or anything with is_set(), that stops the solve when set
+        """
+        self.max_moves = max_moves
+        self.cancel = cancel
+        self.deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        self.max_seconds = max_seconds
+        self.stage = None
+        self.moves_by_step = {}
+        self.current = []
+        self.count = 0
+
+    def start(self, stage):
+        """
+        begin charging moves to a new step
+        :raise SolveCancelled: when the solve was cancelled
+        """
+        self.stage = stage
+        self.current = []
+        if self.cancel is not None and self.cancel.is_set():
+            raise SolveCancelled(stage, self.__moves(), dict(self.moves_by_step))
+
+    def finish(self):
+        """
+        :return: the moves made in the current step
+        """
+        moves = ' '.join(self.current)
+        self.moves_by_step[self.stage] = moves
+        self.current = []
+        return moves
+
+    def charge(self, moves, count=1):
+        """
+        record moves made by the current step
+        :param moves: the moves as text
+        :param count: how many moves that is
+        :raise SolverStalled: when the moves or the time have run out
+        :raise SolveCancelled: when the solve was cancelled
+        """
+        self.current.append(moves)
+        self.count += count
+        if self.cancel is not None and self.cancel.is_set():
+            raise SolveCancelled(self.stage, self.__moves(), dict(self.moves_by_step))
+        if self.max_moves is not None and self.count > self.max_moves:
+            self.__stall(f'more than {self.max_moves} moves')
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.__stall(f'more than {self.max_seconds:g} seconds')
+
+    def __moves(self):
+        return ' '.join([moves for moves in self.moves_by_step.values() if moves] + self.current)
+
+    def __stall(self, reason):
+        raise SolverStalled(self.stage, self.__moves(), dict(self.moves_by_step), reason)
+
+
+class BudgetedCube:
+    """
+    a Cube that charges every move made on it to a Budget, everything else is passed through
+    """
+    def __init__(self, cube, budget):
+        self.cube = cube
+        self.budget = budget
+
+    def __getattr__(self, name):
+        return getattr(self.cube, name)
+
+    def __str__(self):
+        return str(self.cube)
+
+    def move(self, direction):
+        self.cube.move(direction)
+        self.budget.charge('m' + direction.upper())
+
+    def turn(self, side, direction):
+        self.cube.turn(side, direction)
+        self.budget.charge(side if direction == 'r' else side + '`')
+
+    def sequence(self, sequence):
+        self.cube.sequence(sequence)
+        if isinstance(sequence, str):
+            self.budget.charge(sequence, len(parse(sequence)))
+        else:
+            self.budget.charge(' '.join(names(sequence, '`')), len(sequence))
@@ -0,0 +1,173 @@
+"""
+Cache of solutions keyed by the cube state.
+
+The key is the 54 character Cube.get_cube_colors() string, so the same
+scan or the same scramble is only solved once. The most recently used
+solutions are kept in memory, the oldest are dropped when there are more
+than maxsize. With a path the solutions are also kept in an SQLite file,
+which outlives the process and is shared by every process that opens it.
+
+A hit is answered from the string alone, no Cube is built for it.
+
+With symmetric=True the key is the canonical state of Cube.symmetry, so a
+position seen from another side, in a mirror or with other colors shares one
+entry. The stored solution is of the canonical state and is translated to the
+state that was asked for on every hit.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from Cube.cube import Cube
+from Cube.symmetry import canonicalize
+
+logger = logging.getLogger(__name__)
+
+MAXSIZE = 4096
+
+
+class SolutionCache:
+    def __init__(self, solver='beginners', maxsize=MAXSIZE, path=None, symmetric=False):
+        """
+        :param solver: name of the solver the solutions come from, solvers share a file but not solutions
+        :param maxsize: solutions kept in memory
+        :param path: SQLite file to keep the solutions in as well, None to only keep them in memory
+        :param symmetric: keep one solution for all states that are the same up to symmetry and colors
+        """
+        self.solver = solver
+        self.maxsize = maxsize
+        self.path = path
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.__memory = OrderedDict()
+        # the app solves on a worker thread while the Tk thread may look at the counters
+        self.__lock = threading.Lock()
+        self.__db = None
+        if path is not None:
+            self.__db = sqlite3.connect(path, check_same_thread=False)
+            self.__db.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                              'solver TEXT, state TEXT, solution TEXT, moves_by_step TEXT, '
+                              'PRIMARY KEY (solver, state))')
+            self.__db.commit()
+
+    def get(self, state):
+        """
+        :param state: 54 character string of colors
+        :return: (solution, moves_by_step) or None, moves_by_step is a new dict every time
+        """
+        key, transform = self.__key(state)
+        with self.__lock:
+            entry = self.__memory.get(key)
+            disk = False
+            if entry is not None:
+                self.__memory.move_to_end(key)
+            elif self.__db is not None:
+                row = self.__db.execute('SELECT solution, moves_by_step FROM solutions WHERE solver = ? AND state = ?',
+                                        (self.solver, key)).fetchone()
+                if row is not None:
+                    entry = row[0], json.loads(row[1])
+                    self.__remember(key, entry)
+                    disk = True
+            if entry is not None and transform is not None:
+                try:
+                    entry = self.__translate(entry, transform.moves_from_canonical)
+                except ValueError:
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += disk
+            return entry[0], dict(entry[1])
+
+    def put(self, state, solution, moves_by_step):
+        """
+        remember the solution of a state
+        :param state: 54 character string of colors
+        :param solution: solution string
+        :param moves_by_step: dict of step name -> moves
+        """
+        key, transform = self.__key(state)
+        entry = solution, dict(moves_by_step)
+        if transform is not None:
+            try:
+                entry = self.__translate(entry, transform.moves_to_canonical)
+            except ValueError as e:
+                # only a whole cube rotation can't be translated, solvers don't end with one
+                logger.debug("Not caching a solution that can't be translated: %s", e)
+                return
+        with self.__lock:
+            self.__remember(key, entry)
+            if self.__db is not None:
+                self.__db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)',
+                                  (self.solver, key, entry[0], json.dumps(entry[1])))
+                self.__db.commit()
+
+    def solve(self, state, solve_3x3, **kwargs):
+        """
+        the cached solution of a state, solved with solve_3x3 and remembered if there is none
+        :param state: 54 character string of colors
+        :param solve_3x3: solver function taking a Cube
+        :param kwargs: passed on to solve_3x3
+        :return: (solution, moves_by_step)
+        """
+        cached = self.get(state)
+        if cached is not None:
+            return cached
+        if not self.symmetric:
+            solution, moves_by_step = solve_3x3(Cube(state), **kwargs)
+            self.put(state, solution, moves_by_step)
+            return solution, dict(moves_by_step)
+        # the canonical state has the centers of a solved Cube whichever way state was held
+        key, transform = canonicalize(state)
+        entry = solve_3x3(Cube(key), **kwargs)
+        self.put(key, *entry)
+        return self.__translate(entry, transform.moves_from_canonical)
+
+    def __key(self, state):
+        """
+        :return: the key of state and the Transform to it, None if the key is state itself
+        """
+        if self.symmetric:
+            return canonicalize(state)
+        return state, None
+
+    @staticmethod
+    def __translate(entry, moves):
+        solution, moves_by_step = entry
+        return moves(solution), {step: moves(step_moves) for step, step_moves in moves_by_step.items()}
+
+    def __remember(self, state, entry):
+        self.__memory[state] = entry
+        self.__memory.move_to_end(state)
+        while len(self.__memory) > self.maxsize:
+            self.__memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        :return: dict of counter name -> value
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'disk_hits': self.disk_hits, 'size': len(self.__memory)}
+
+    def clear(self):
+        """
+        forget every solution, in memory and in the file, and reset the counters
+        """
+        with self.__lock:
+            self.__memory.clear()
+            self.hits = self.misses = self.evictions = self.disk_hits = 0
+            if self.__db is not None:
+                self.__db.execute('DELETE FROM solutions WHERE solver = ?', (self.solver,))
+                self.__db.commit()
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
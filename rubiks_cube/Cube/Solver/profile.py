@@ -0,0 +1,158 @@
+"""
+Where the time of a solve goes.
+
+Pass a SolveStats to solve_3x3 and it is filled in step by step: how long
+the step took, how many times it turned the cube (a sequence is one turn of
+many moves), how many stickers it read to look for pieces and how many moves
+it made before and after simplifying. Every cell a step takes from
+cube.cells is one sticker read, also the cells the helpers that find edges
+and corners hand back; finding which stickers those are goes through the
+sticker index and adds nothing more. A side is nine reads and the colors of
+the whole cube 54. Without a SolveStats the solver runs on a plain
+BudgetedCube and none of this is counted.
+"""
+import time
+
+from Cube.engine import SLOT_COUNT
+from Cube.notation import parse
+from Cube.Solver.budget import BudgetedCube
+
+SIDE_SIZE = SLOT_COUNT // 6
+
+
+class StepStats:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.turns = 0
+        self.reads = 0
+        self.moves_before = 0
+        self.moves_after = 0
+
+    def as_dict(self):
+        return {'seconds': self.seconds, 'turns': self.turns, 'reads': self.reads,
+                'moves_before': self.moves_before, 'moves_after': self.moves_after}
+
+    def __str__(self):
+        return (f'{self.name}: {1000 * self.seconds:.2f} ms, {self.turns} turns, {self.reads} sticker reads, '
+                f'{self.moves_before} -> {self.moves_after} moves')
+
+
+class SolveStats:
+    """
+    :ivar steps: dict of step name -> StepStats in the order the steps ran
+    :ivar simplify_seconds: time spent simplifying the moves of all steps
+    :ivar seconds: time of the whole solve
+    :ivar moves_before: moves of all steps as they were made
+    :ivar moves_after: moves of the simplified solution
+    """
+    def __init__(self):
+        self.steps = {}
+        self.current = None
+        self.simplify_seconds = 0.0
+        self.seconds = 0.0
+        self.moves_before = 0
+        self.moves_after = 0
+        self.__started = None
+
+    def begin(self):
+        self.__started = time.perf_counter()
+
+    def start(self, name):
+        """
+        begin counting for a step
+        """
+        self.current = self.steps[name] = StepStats(name)
+        self.current.seconds = time.perf_counter()
+
+    def finish(self, moves):
+        """
+        end the current step
+        :param moves: the moves it made
+        """
+        self.current.seconds = time.perf_counter() - self.current.seconds
+        self.current.moves_before = len(parse(moves))
+        self.moves_before += self.current.moves_before
+        self.current = None
+
+    def record(self, name, seconds, moves):
+        """
+        add a step the solver timed itself, for steps that don't run one after the other
+        :param name: name of the step
+        :param seconds: time the step took
+        :param moves: the moves it made
+        """
+        step = self.steps[name] = StepStats(name)
+        step.seconds = seconds
+        step.moves_before = len(parse(moves))
+        self.moves_before += step.moves_before
+
+    def simplified(self, moves_by_step, solution, seconds):
+        """
+        record the result of simplifying
+        :param moves_by_step: dict of step name -> simplified moves
+        :param solution: the simplified solution
+        :param seconds: time simplifying took
+        """
+        for name, moves in moves_by_step.items():
+            if name in self.steps:
+                self.steps[name].moves_after = len(parse(moves))
+        self.moves_after = len(parse(solution))
+        self.simplify_seconds = seconds
+        self.seconds = time.perf_counter() - self.__started
+
+    def slowest(self):
+        """
+        :return: StepStats of the step that took the longest, None before any step ran
+        """
+        return max(self.steps.values(), key=lambda step: step.seconds, default=None)
+
+    def as_dict(self):
+        return {'seconds': self.seconds, 'simplify_seconds': self.simplify_seconds,
+                'moves_before': self.moves_before, 'moves_after': self.moves_after,
+                'steps': {name: step.as_dict() for name, step in self.steps.items()}}
+
+    def __str__(self):
+        lines = [f'{1000 * self.seconds:.2f} ms, {self.moves_before} -> {self.moves_after} moves, '
+                 f'simplifying {1000 * self.simplify_seconds:.2f} ms']
+        lines += [f'  {step}' for step in self.steps.values()]
+        return '\n'.join(lines)
+
+
+class ProfiledCube(BudgetedCube):
+    """
+    a BudgetedCube that also counts the turns and sticker reads of the current step in a SolveStats
+    """
+    def __init__(self, cube, budget, stats):
+        super().__init__(cube, budget)
+        self.stats = stats
+
+    def __getattr__(self, name):
+        if name == 'cells':
+            # the steps and their helpers take one cell at a time, cube.cells[i]
+            self.stats.current.reads += 1
+        return getattr(self.cube, name)
+
+    def __str__(self):
+        self.stats.current.reads += SLOT_COUNT
+        return str(self.cube)
+
+    def get_side_in_matrix(self, side):
+        self.stats.current.reads += SIDE_SIZE
+        return self.cube.get_side_in_matrix(side)
+
+    def get_cube_colors(self):
+        self.stats.current.reads += SLOT_COUNT
+        return self.cube.get_cube_colors()
+
+    def move(self, direction):
+        self.stats.current.turns += 1
+        super().move(direction)
+
+    def turn(self, side, direction):
+        self.stats.current.turns += 1
+        super().turn(side, direction)
+
+    def sequence(self, sequence):
+        self.stats.current.turns += 1
+        super().sequence(sequence)
@@ -0,0 +1 @@
+from .solver import solve_3x3
@@ -0,0 +1,246 @@
+"""
+Cubie level representation of the cube for the two-phase solver.
+
+A CubieCube stores which corner and edge cubie sits in every position and how
+it is twisted or flipped. Positions and orientations follow Kociemba's
+numbering, so the usual coordinates (twist, flip, UD slice ...) can be read
+straight off the arrays. The six basic face turns are not written out by hand,
+they are read off Cube itself, so the solver speaks the same notation as
+Cube.sequence().
+"""
+from Cube.cube import Cube
+from Cube.engine import SLOT_COUNT
+from Cube.pieces import CENTER_SLOTS, CORNER_SLOTS, CORNERS, EDGE_SLOTS, EDGES, FACES, parity
+
+
+def binomial(n, k):
+    if k < 0 or k > n:
+        return 0
+    res = 1
+    for i in range(k):
+        res = res * (n - i) // (i + 1)
+    return res
+
+
+def perm_to_index(perm):
+    """
+    :param perm: list of the numbers 0..n-1
+    :return: rank of the permutation, 0..n!-1
+    """
+    n = len(perm)
+    res = 0
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        res = res * (n - i) + smaller
+    return res
+
+
+def index_to_perm(index, n):
+    """
+    :return: the permutation of 0..n-1 with the given rank
+    """
+    digits = []
+    for i in range(1, n + 1):
+        digits.append(index % i)
+        index //= i
+    digits.reverse()
+    left = list(range(n))
+    return [left.pop(d) for d in digits]
+
+
+class CubieCube:
+    def __init__(self, cp=None, co=None, ep=None, eo=None):
+        self.cp = list(cp) if cp is not None else list(range(8))
+        self.co = list(co) if co is not None else [0] * 8
+        self.ep = list(ep) if ep is not None else list(range(12))
+        self.eo = list(eo) if eo is not None else [0] * 12
+
+    def copy(self):
+        return CubieCube(self.cp, self.co, self.ep, self.eo)
+
+    def __eq__(self, other):
+        return (self.cp, self.co, self.ep, self.eo) == (other.cp, other.co, other.ep, other.eo)
+
+    def corner_multiply(self, other):
+        """
+        do other after self, corners only
+        """
+        cp = self.cp
+        co = self.co
+        self.cp = [cp[other.cp[i]] for i in range(8)]
+        self.co = [(co[other.cp[i]] + other.co[i]) % 3 for i in range(8)]
+
+    def edge_multiply(self, other):
+        """
+        do other after self, edges only
+        """
+        ep = self.ep
+        eo = self.eo
+        self.ep = [ep[other.ep[i]] for i in range(12)]
+        self.eo = [(eo[other.ep[i]] + other.eo[i]) % 2 for i in range(12)]
+
+    def multiply(self, other):
+        self.corner_multiply(other)
+        self.edge_multiply(other)
+
+    # phase 1 coordinates
+
+    def get_twist(self):
+        res = 0
+        for i in range(7):
+            res = res * 3 + self.co[i]
+        return res
+
+    def set_twist(self, twist):
+        total = 0
+        for i in range(6, -1, -1):
+            self.co[i] = twist % 3
+            total += self.co[i]
+            twist //= 3
+        self.co[7] = (-total) % 3
+
+    def get_flip(self):
+        res = 0
+        for i in range(11):
+            res = res * 2 + self.eo[i]
+        return res
+
+    def set_flip(self, flip):
+        total = 0
+        for i in range(10, -1, -1):
+            self.eo[i] = flip % 2
+            total += self.eo[i]
+            flip //= 2
+        self.eo[11] = total % 2
+
+    def get_slice(self):
+        """
+        :return: which 4 positions hold the FR, FL, BL and BR edges, 0..494
+        """
+        res = 0
+        x = 0
+        for j in range(11, -1, -1):
+            if self.ep[j] >= 8:
+                res += binomial(11 - j, x + 1)
+                x += 1
+        return res
+
+    def set_slice(self, index):
+        slice_edges = [8, 9, 10, 11]
+        other_edges = [0, 1, 2, 3, 4, 5, 6, 7]
+        self.ep = [-1] * 12
+        x = 4
+        for j in range(12):
+            if index - binomial(11 - j, x) >= 0:
+                self.ep[j] = slice_edges[4 - x]
+                index -= binomial(11 - j, x)
+                x -= 1
+        x = 0
+        for j in range(12):
+            if self.ep[j] == -1:
+                self.ep[j] = other_edges[x]
+                x += 1
+
+    # phase 2 coordinates
+
+    def get_corners(self):
+        return perm_to_index(self.cp)
+
+    def set_corners(self, index):
+        self.cp = index_to_perm(index, 8)
+
+    def get_ud_edges(self):
+        """
+        :return: permutation of the 8 U and D edges, only valid in phase 2
+        """
+        return perm_to_index(self.ep[:8])
+
+    def set_ud_edges(self, index):
+        self.ep = index_to_perm(index, 8) + [8, 9, 10, 11]
+
+    def get_slice_perm(self):
+        """
+        :return: permutation of the 4 slice edges, only valid in phase 2
+        """
+        return perm_to_index([e - 8 for e in self.ep[8:]])
+
+    def set_slice_perm(self, index):
+        self.ep = list(range(8)) + [e + 8 for e in index_to_perm(index, 4)]
+
+    def verify(self):
+        """
+        raise ValueError if no sequence of turns can reach this cube
+        """
+        if sorted(self.cp) != list(range(8)) or sorted(self.ep) != list(range(12)):
+            raise ValueError('some cubies are missing or appear twice')
+        if sum(self.co) % 3 != 0:
+            raise ValueError('a corner is twisted')
+        if sum(self.eo) % 2 != 0:
+            raise ValueError('an edge is flipped')
+        if parity(self.cp) != parity(self.ep):
+            raise ValueError('two pieces are swapped')
+
+
+def from_colors(colors):
+    """
+    read a cube in Cube.get_cube_colors() order
+    :param colors: 54 character string
+    :return: CubieCube
+    """
+    if len(colors) != SLOT_COUNT:
+        raise ValueError(f'expected {SLOT_COUNT} colors, got {len(colors)}')
+    face_of = {}
+    for slot, face in zip(CENTER_SLOTS, FACES):
+        face_of[colors[slot]] = face
+    if len(face_of) != 6:
+        raise ValueError('the centers must all have different colors')
+
+    def faces_at(slots):
+        try:
+            return ''.join(face_of[colors[slot]] for slot in slots)
+        except KeyError as e:
+            raise ValueError(f'{e.args[0]} is not the color of a center')
+
+    cube = CubieCube()
+    corner_names = [faces for _, faces in CORNERS]
+    for i, slots in enumerate(CORNER_SLOTS):
+        faces = faces_at(slots)
+        for ori in range(3):
+            if faces[ori] in 'UD':
+                break
+        else:
+            raise ValueError(f'corner {faces} has no U or D sticker')
+        turned = faces[ori:] + faces[:ori]
+        if turned not in corner_names:
+            raise ValueError(f'{faces} is not a corner')
+        cube.cp[i] = corner_names.index(turned)
+        cube.co[i] = ori
+
+    edge_names = [faces for _, faces in EDGES]
+    for i, slots in enumerate(EDGE_SLOTS):
+        faces = faces_at(slots)
+        if faces in edge_names:
+            cube.ep[i] = edge_names.index(faces)
+            cube.eo[i] = 0
+        elif faces[::-1] in edge_names:
+            cube.ep[i] = edge_names.index(faces[::-1])
+            cube.eo[i] = 1
+        else:
+            raise ValueError(f'{faces} is not an edge')
+    return cube
+
+
+def __basic_moves():
+    res = []
+    for face in FACES:
+        cube = Cube()
+        cube.turn(face, 'r')
+        res.append(from_colors(cube.get_cube_colors()))
+    return res
+
+
+# one clockwise quarter turn of every face in FACES order
+BASIC_MOVES = __basic_moves()
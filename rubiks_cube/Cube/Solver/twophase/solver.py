@@ -0,0 +1,186 @@
+"""
+Kociemba's two-phase algorithm.
+
+Phase 1 turns the cube into the subgroup <U, D, R2, L2, F2, B2>: no corner
+twisted, no edge flipped and the four middle layer edges in the middle layer.
+Phase 2 solves the cube with only those moves. Both phases are iterative
+deepening searches guided by the pruning tables in tables.py.
+"""
+import logging
+import time
+
+from Cube.Solver.budget import SolveCancelled
+from Cube.Solver.twophase.cubie import BASIC_MOVES, from_colors
+from Cube.Solver.twophase.tables import (MOVE_NAMES, N_CORNERS, N_FLIP, N_MOVE, N_MOVE2, N_TWIST,
+                                         N_UD_EDGES, PHASE2_MOVES, get_tables)
+
+logger = logging.getLogger(__name__)
+
+MAX_LENGTH = 25
+# no cube needs more than 12 phase 1 moves and 18 phase 2 moves
+LONGEST = 30
+# deep phase 2 searches that fail are where the time goes, so phase 2 is cut
+# off here and a different phase 1 solution is tried instead
+PHASE2_DEPTH = 12
+
+
+def __allowed(moves):
+    """
+    :return: for every last face (-1 for none) the (index, move, face) that may follow it,
+             a face never follows itself and D, L, B never come right before U, R, F
+    """
+    res = {}
+    for last_face in range(-1, 6):
+        res[last_face] = [(k, m, m // 3) for k, m in enumerate(moves)
+                          if m // 3 != last_face and m // 3 != last_face - 3]
+    return res
+
+
+ALLOWED1 = __allowed(range(N_MOVE))
+ALLOWED2 = __allowed(PHASE2_MOVES)
+
+
+class _Search:
+    def __init__(self, cubie, max_length, phase2_depth, cancel=None):
+        t = get_tables()
+        self.twist_move = t['twist_move']
+        self.flip_move = t['flip_move']
+        self.slice_move = t['slice_move']
+        self.corners_move = t['corners_move']
+        self.ud_edges_move = t['ud_edges_move']
+        self.slice_perm_move = t['slice_perm_move']
+        self.slice_twist_prune = t['slice_twist_prune']
+        self.slice_flip_prune = t['slice_flip_prune']
+        self.slice_corners_prune = t['slice_corners_prune']
+        self.slice_edges_prune = t['slice_edges_prune']
+        self.cubie = cubie
+        self.max_length = max_length
+        self.phase2_depth = phase2_depth
+        self.cancel = cancel
+        self.phase1 = []
+        self.phase2 = []
+        # the phase 2 searches run inside the phase 1 search, the rest of the time is phase 1
+        self.phase2_seconds = 0.0
+
+    def run(self):
+        twist = self.cubie.get_twist()
+        flip = self.cubie.get_flip()
+        slice_ = self.cubie.get_slice()
+        for depth in range(self.max_length + 1):
+            if self.__phase1(twist, flip, slice_, depth, -1):
+                return True
+        return False
+
+    def __phase1(self, twist, flip, slice_, togo, last_face):
+        if togo == 0:
+            if twist == 0 and flip == 0 and slice_ == 0:
+                # a phase 2 move at the end means a shorter phase 1 was already tried
+                if not self.phase1 or self.phase1[-1] not in PHASE2_MOVES:
+                    started = time.perf_counter()
+                    found = self.__start_phase2()
+                    self.phase2_seconds += time.perf_counter() - started
+                    return found
+            return False
+
+        twist_row = N_MOVE * twist
+        flip_row = N_MOVE * flip
+        slice_row = N_MOVE * slice_
+        for _, m, face in ALLOWED1[last_face]:
+            new_slice = self.slice_move[slice_row + m]
+            new_twist = self.twist_move[twist_row + m]
+            if self.slice_twist_prune[N_TWIST * new_slice + new_twist] >= togo:
+                continue
+            new_flip = self.flip_move[flip_row + m]
+            if self.slice_flip_prune[N_FLIP * new_slice + new_flip] >= togo:
+                continue
+            self.phase1.append(m)
+            if self.__phase1(new_twist, new_flip, new_slice, togo - 1, face):
+                return True
+            self.phase1.pop()
+        return False
+
+    def __start_phase2(self):
+        # every phase 1 solution is a fresh phase 2 search, a good place to look for a cancel
+        if self.cancel is not None and self.cancel.is_set():
+            raise SolveCancelled("Phase 1", ' '.join(MOVE_NAMES[m] for m in self.phase1), {})
+        cube = self.cubie.copy()
+        for m in self.phase1:
+            for _ in range(m % 3 + 1):
+                cube.multiply(BASIC_MOVES[m // 3])
+        corners = cube.get_corners()
+        ud_edges = cube.get_ud_edges()
+        slice_perm = cube.get_slice_perm()
+
+        togo = min(self.max_length - len(self.phase1), self.phase2_depth)
+        lower = max(self.slice_corners_prune[N_CORNERS * slice_perm + corners],
+                    self.slice_edges_prune[N_UD_EDGES * slice_perm + ud_edges])
+        last_face = self.phase1[-1] // 3 if self.phase1 else -1
+        for depth in range(lower, togo + 1):
+            if self.__phase2(corners, ud_edges, slice_perm, depth, last_face):
+                return True
+        return False
+
+    def __phase2(self, corners, ud_edges, slice_perm, togo, last_face):
+        if togo == 0:
+            return corners == 0 and ud_edges == 0 and slice_perm == 0
+
+        corners_row = N_MOVE2 * corners
+        edges_row = N_MOVE2 * ud_edges
+        slice_row = N_MOVE2 * slice_perm
+        for k, m, face in ALLOWED2[last_face]:
+            new_slice = self.slice_perm_move[slice_row + k]
+            new_corners = self.corners_move[corners_row + k]
+            if self.slice_corners_prune[N_CORNERS * new_slice + new_corners] >= togo:
+                continue
+            new_edges = self.ud_edges_move[edges_row + k]
+            if self.slice_edges_prune[N_UD_EDGES * new_slice + new_edges] >= togo:
+                continue
+            self.phase2.append(m)
+            if self.__phase2(new_corners, new_edges, new_slice, togo - 1, face):
+                return True
+            self.phase2.pop()
+        return False
+
+
+def solve_3x3(cube, max_length=MAX_LENGTH, progress=None, cancel=None, stats=None):
+    """
+    solve a cube with the two-phase algorithm, the cube itself is not turned
+    :param cube: Cube to solve
+    :param max_length: return the first solution with at most this many moves
+    :param progress: called with ("Search", 1, 1) when the search starts, like the beginners solver reports its steps
+    :param cancel: threading.Event that stops the search when it is set
+    :param stats: SolveStats from Cube.Solver.profile, the phases are recorded as the steps "Phase 1" and "Phase 2"
+    :return: solution string, dict of phase name -> moves
+    :raise SolveCancelled: when cancel was set
+    """
+    cubie = from_colors(cube.get_cube_colors())
+    cubie.verify()
+
+    if progress is not None:
+        progress("Search", 1, 1)
+    if stats is not None:
+        stats.begin()
+    started = time.perf_counter()
+    phase2_seconds = 0.0
+    # every cube is solved in LONGEST moves, a longer max_length asks for no more than that
+    for length in range(min(max_length, LONGEST), LONGEST + 1):
+        search = _Search(cubie, length, PHASE2_DEPTH if length < LONGEST else LONGEST, cancel)
+        found = search.run()
+        phase2_seconds += search.phase2_seconds
+        if found:
+            break
+    else:
+        raise ValueError('no solution found')
+    seconds = time.perf_counter() - started
+
+    phase1 = ' '.join(MOVE_NAMES[m] for m in search.phase1)
+    phase2 = ' '.join(MOVE_NAMES[m] for m in search.phase2)
+    logger.info('Two-phase solution: %d + %d moves', len(search.phase1), len(search.phase2))
+    solution = ' '.join(s for s in (phase1, phase2) if s)
+    moves_by_step = {"Phase 1": phase1, "Phase 2": phase2}
+    if stats is not None:
+        stats.record("Phase 1", seconds - phase2_seconds, phase1)
+        stats.record("Phase 2", phase2_seconds, phase2)
+        # the search never makes a move it takes back, there is nothing to simplify
+        stats.simplified(moves_by_step, solution, 0.0)
+    return solution, moves_by_step
@@ -0,0 +1,130 @@
+"""
+Move and pruning tables for the two-phase solver.
+
+The tables are built the first time they are needed (this takes about half
+a minute in pure Python) and written to a cache directory, so later runs only
+map them back (see Cube/store.py). The file is twophase.tables in
+RUBIKS_CUBE_TABLES if set, otherwise in ~/.cache/rubiks_cube.
+"""
+import os
+from array import array
+
+from Cube.Solver.twophase.cubie import BASIC_MOVES, CubieCube
+from Cube.store import load_or_build
+
+N_TWIST = 2187
+N_FLIP = 2048
+N_SLICE = 495
+N_CORNERS = 40320
+N_UD_EDGES = 40320
+N_SLICE_PERM = 24
+N_MOVE = 18
+
+# moves are numbered 3 * face + (quarter turns - 1), faces in FACES order
+MOVE_NAMES = []
+for __face in ['U', 'R', 'F', 'D', 'L', 'B']:
+    MOVE_NAMES += [__face, __face + '2', __face + "'"]
+
+# the moves that keep a cube inside phase 2: U, D and half turns of the rest
+PHASE2_MOVES = [0, 1, 2, 4, 7, 9, 10, 11, 13, 16]
+N_MOVE2 = len(PHASE2_MOVES)
+
+UNSET = 255
+
+
+def cache_dir():
+    return os.environ.get('RUBIKS_CUBE_TABLES',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'rubiks_cube'))
+
+
+def __move_table(size, setter, getter, multiply, moves):
+    """
+    :param size: number of coordinate values
+    :param setter: CubieCube method that sets the coordinate
+    :param getter: CubieCube method that reads the coordinate
+    :param multiply: CubieCube method that applies a move
+    :param moves: which of the 18 moves to put in the table
+    :return: array of size * len(moves) coordinates
+    """
+    table = array('H', bytes(2 * size * len(moves)))
+    cube = CubieCube()
+    for i in range(size):
+        setter(cube, i)
+        for k, m in enumerate(moves):
+            turned = cube.copy()
+            for _ in range(m % 3 + 1):
+                multiply(turned, BASIC_MOVES[m // 3])
+            table[len(moves) * i + k] = getter(turned)
+    return table
+
+
+def __pruning_table(size_a, move_a, size_b, move_b, n_move):
+    """
+    breadth first search from the solved cube over the pair of coordinates
+    :return: bytearray with the number of moves needed for a * size_b + b
+    """
+    table = bytearray([UNSET]) * (size_a * size_b)
+    table[0] = 0
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        found = []
+        for index in frontier:
+            a, b = divmod(index, size_b)
+            row_a = n_move * a
+            row_b = n_move * b
+            for m in range(n_move):
+                j = move_a[row_a + m] * size_b + move_b[row_b + m]
+                if table[j] == UNSET:
+                    table[j] = depth
+                    found.append(j)
+        frontier = found
+    return table
+
+
+def __build():
+    all_moves = list(range(N_MOVE))
+    tables = {}
+    tables['twist_move'] = __move_table(N_TWIST, CubieCube.set_twist, CubieCube.get_twist,
+                                        CubieCube.corner_multiply, all_moves)
+    tables['flip_move'] = __move_table(N_FLIP, CubieCube.set_flip, CubieCube.get_flip,
+                                       CubieCube.edge_multiply, all_moves)
+    tables['slice_move'] = __move_table(N_SLICE, CubieCube.set_slice, CubieCube.get_slice,
+                                        CubieCube.edge_multiply, all_moves)
+    tables['corners_move'] = __move_table(N_CORNERS, CubieCube.set_corners, CubieCube.get_corners,
+                                          CubieCube.corner_multiply, PHASE2_MOVES)
+    tables['ud_edges_move'] = __move_table(N_UD_EDGES, CubieCube.set_ud_edges, CubieCube.get_ud_edges,
+                                           CubieCube.edge_multiply, PHASE2_MOVES)
+    tables['slice_perm_move'] = __move_table(N_SLICE_PERM, CubieCube.set_slice_perm, CubieCube.get_slice_perm,
+                                             CubieCube.edge_multiply, PHASE2_MOVES)
+
+    tables['slice_twist_prune'] = __pruning_table(N_SLICE, tables['slice_move'],
+                                                  N_TWIST, tables['twist_move'], N_MOVE)
+    tables['slice_flip_prune'] = __pruning_table(N_SLICE, tables['slice_move'],
+                                                 N_FLIP, tables['flip_move'], N_MOVE)
+    tables['slice_corners_prune'] = __pruning_table(N_SLICE_PERM, tables['slice_perm_move'],
+                                                    N_CORNERS, tables['corners_move'], N_MOVE2)
+    tables['slice_edges_prune'] = __pruning_table(N_SLICE_PERM, tables['slice_perm_move'],
+                                                  N_UD_EDGES, tables['ud_edges_move'], N_MOVE2)
+    return tables
+
+
+NAMES = ['twist_move', 'flip_move', 'slice_move', 'corners_move', 'ud_edges_move', 'slice_perm_move',
+         'slice_twist_prune', 'slice_flip_prune', 'slice_corners_prune', 'slice_edges_prune']
+
+# bump TABLES_VERSION whenever the way the tables are built changes
+TABLES_VERSION = 1
+SCHEMA = f'twophase {TABLES_VERSION} moves={",".join(MOVE_NAMES)} phase2={PHASE2_MOVES} tables={",".join(NAMES)}'
+
+__tables = None
+
+
+def get_tables():
+    """
+    :return: dict of table name -> table, built or mapped from the cache on first use
+    """
+    global __tables
+    if __tables is None:
+        __tables = load_or_build(os.path.join(cache_dir(), 'twophase.tables'), SCHEMA, __build)
+    return __tables
@@ -1,8 +1,31 @@
+from Cube.engine import SLOT_POINTS, SLOT_NORMS
+
+
 class Cell:
-    def __init__(self, point=None, norm=None, color=None):
-        self.point = point
-        self.norm = norm
-        self.color = color
+    """
+    a single sticker of a cube, its point and norm follow it as the cube turns
+    """
+    __slots__ = ('stickers', 'index')
+
+    def __init__(self, stickers, index):
+        self.stickers = stickers
+        self.index = index
+
+    @property
+    def point(self):
+        return SLOT_POINTS[self.stickers.where[self.index]]
+
+    @property
+    def norm(self):
+        return SLOT_NORMS[self.stickers.where[self.index]]
+
+    @property
+    def color(self):
+        return self.stickers.colors[self.index]
+
+    @color.setter
+    def color(self, color):
+        self.stickers.set_color(self.index, color)
 
     def __str__(self):
-        return self.color
\ No newline at end of file
+        return self.color
@@ -0,0 +1,240 @@
+"""
+Array-backed sticker engine for the 3x3 cube.
+
+Every sticker slot is numbered in the order used by Cube.get_cube_colors()
+(Top, Left, Front, Right, Back, Bottom with 9 slots each). The state of a cube
+is a 54 byte string that holds, for every sticker, the slot it currently sits
+in. A turn is a precomputed slot -> slot table, so applying it is a single
+bytes.translate call instead of a scan over every cell.
+"""
+
+SIDES = ['U', 'L', 'F', 'R', 'B', 'D']
+POSITIONS = (-1, 0, 1)
+
+
+class _rotator:
+    def __init__(self):
+        # first number in the tuple means which axis in the order:
+        # {0:'x', 1:'y', 2:'z'}
+        # second number in the tuple means what to multiply that axis by
+        self.magical_rotator = [
+            [  # Up
+                [(2, 1), (1, 1), (0, -1)],
+                [(2, -1), (1, 1), (0, 1)]
+            ],
+            [  # Left
+                [(0, 1), (2, -1), (1, 1)],
+                [(0, 1), (2, 1), (1, -1)]
+            ],
+            [  # Front
+                [(1, -1), (0, 1), (2, 1)],
+                [(1, 1), (0, -1), (2, 1)]
+            ],
+            [  # Right
+                [(0, 1), (2, 1), (1, -1)],
+                [(0, 1), (2, -1), (1, 1)]
+            ],
+            [  # Back
+                [(1, 1), (0, -1), (2, 1)],
+                [(1, -1), (0, 1), (2, 1)]
+            ],
+            [  # Down
+                [(2, -1), (1, 1), (0, 1)],
+                [(2, 1), (1, 1), (0, -1)]
+            ]]
+
+    def get_rotator(self, move, direction):
+        moveInt = 0
+        directions = {'r': 0, 'l': 1}
+        for m in SIDES:
+            if m == move:
+                moveInt = SIDES.index(m)
+        return self.magical_rotator[moveInt][directions[direction]]
+
+    def rotate(self, cords, move, direction):
+        rotator = self.get_rotator(move, direction)
+        res = []
+        for operation in rotator:
+            res.append(cords[operation[0]] * operation[1])
+        return tuple(res)
+
+
+def __build_slots():
+    """
+    list the (point, norm) of every slot in get_cube_colors() order
+    :return: tuple of points, tuple of norms
+    """
+    slots = []
+    # top
+    for z in POSITIONS:
+        for x in POSITIONS:
+            slots.append(((x, -1, -z), (0, -1, 0)))
+    # left
+    for y in POSITIONS:
+        for z in POSITIONS:
+            slots.append(((-1, y, -z), (-1, 0, 0)))
+    # front
+    for y in POSITIONS:
+        for x in POSITIONS:
+            slots.append(((x, y, -1), (0, 0, -1)))
+    # right
+    for y in POSITIONS:
+        for z in POSITIONS:
+            slots.append(((1, y, z), (1, 0, 0)))
+    # back
+    for y in POSITIONS:
+        for x in POSITIONS:
+            slots.append(((-x, y, 1), (0, 0, 1)))
+    # bottom
+    for z in POSITIONS:
+        for x in POSITIONS:
+            slots.append(((x, 1, z), (0, 1, 0)))
+    return tuple(s[0] for s in slots), tuple(s[1] for s in slots)
+
+
+SLOT_POINTS, SLOT_NORMS = __build_slots()
+SLOT_COUNT = len(SLOT_POINTS)
+SOLVED = bytes(range(SLOT_COUNT))
+
+# number of stickers on a cubie
+CENTER = 1
+EDGE = 2
+CORNER = 3
+
+
+def __build_pieces():
+    """
+    group the slots by the cubie they belong to
+    :return: dict of point -> slots, tuple of the other slots of every slot's cubie
+    """
+    point_slots = {}
+    for slot in range(SLOT_COUNT):
+        point_slots.setdefault(SLOT_POINTS[slot], []).append(slot)
+    neighbors = []
+    for slot in range(SLOT_COUNT):
+        piece = point_slots[SLOT_POINTS[slot]]
+        neighbors.append(tuple(s for s in piece if s != slot))
+    return {p: tuple(s) for p, s in point_slots.items()}, tuple(neighbors)
+
+
+# a sticker starts in the slot with its own index and never leaves its
+# cubie, so SLOT_NEIGHBORS is also the list of every sticker's cubie mates
+POINT_SLOTS, SLOT_NEIGHBORS = __build_pieces()
+
+
+def __build_turns():
+    """
+    derive the slot table of every quarter turn from the rotator geometry
+    :return: dict of (side, direction) -> 256 byte translate table
+    """
+    rotator = _rotator()
+    slot_of = {}
+    for slot in range(SLOT_COUNT):
+        slot_of[(SLOT_POINTS[slot], SLOT_NORMS[slot])] = slot
+
+    # the first number in the tuple means
+    # which axis on the coordinates are we going to compare
+    sidesPoint = {'U': (1, -1),
+                  'L': (0, -1),
+                  'F': (2, -1),
+                  'R': (0, 1),
+                  'B': (2, 1),
+                  'D': (1, 1),
+                  'M': (1, 0)}
+
+    turns = {}
+    for side, (axis, value) in sidesPoint.items():
+        for direction in ('r', 'l'):
+            table = bytearray(range(256))
+            for slot in range(SLOT_COUNT):
+                point = SLOT_POINTS[slot]
+                if point[axis] != value:
+                    continue
+                point = rotator.rotate(point, side, direction)
+                norm = rotator.rotate(SLOT_NORMS[slot], side, direction)
+                table[slot] = slot_of[(point, norm)]
+            turns[(side, direction)] = bytes(table)
+    return turns
+
+
+TURNS = __build_turns()
+
+
+class StickerArray:
+    """
+    sticker state of a cube: the color of every sticker and the slot it sits in
+
+    the stickers of a cubie always move together, so which cubie a sticker
+    belongs to never changes and the color index only has to be rebuilt when
+    a sticker is recolored, not on every turn.
+    """
+    def __init__(self, colors):
+        self.colors = list(colors)
+        self.where = SOLVED
+        self.__by_color = None
+        self.__pieces = None
+
+    def turn(self, table):
+        """
+        move every sticker through a slot table from TURNS
+        :param table: 256 byte translate table
+        :return: void
+        """
+        self.where = self.where.translate(table)
+
+    def at(self, slot):
+        """
+        :param slot: slot index in get_cube_colors() order
+        :return: index of the sticker sitting in that slot
+        """
+        return self.where.index(slot)
+
+    def neighbors(self, sticker):
+        """
+        :return: list of the other stickers on the same cubie
+        """
+        return list(SLOT_NEIGHBORS[sticker])
+
+    def find(self, size, color=None):
+        """
+        :param size: CENTER, EDGE or CORNER
+        :param color: only return stickers of this color
+        :return: list of sticker indexes in ascending order
+        """
+        self.__build_index()
+        return list(self.__by_color.get((size, color), ()))
+
+    def piece(self, colors):
+        """
+        :param colors: colors of a cubie in any order
+        :return: tuple of the stickers of that cubie in ascending order
+        """
+        self.__build_index()
+        return self.__pieces[frozenset(colors)]
+
+    def set_color(self, sticker, color):
+        self.colors[sticker] = color
+        self.__by_color = None
+        self.__pieces = None
+
+    def facelets(self):
+        """
+        :return: string of the colors in get_cube_colors() order
+        """
+        colors = self.colors
+        order = sorted(range(SLOT_COUNT), key=self.where.__getitem__)
+        return ''.join([colors[sticker] for sticker in order])
+
+    def __build_index(self):
+        if self.__by_color is not None:
+            return
+        by_color = {}
+        pieces = {}
+        for sticker in range(SLOT_COUNT):
+            piece = (sticker,) + SLOT_NEIGHBORS[sticker]
+            size = len(piece)
+            by_color.setdefault((size, None), []).append(sticker)
+            by_color.setdefault((size, self.colors[sticker]), []).append(sticker)
+            pieces[frozenset(self.colors[s] for s in piece)] = tuple(sorted(piece))
+        self.__by_color = by_color
+        self.__pieces = pieces
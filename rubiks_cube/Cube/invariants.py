@@ -0,0 +1,70 @@
+"""
+Quick check that a sticker state is a cube that can be solved.
+
+Only a third of all ways to put the stickers on are reachable by turning. A
+state must have six different centers, every corner and edge position must
+hold a real piece and every piece must be there once. On top of that the
+corner twists must add up to a multiple of three, the edge flips to an even
+number and the corner and edge permutations must have the same parity.
+
+check() reads every sticker once and does not build a Cube, so a bad scan is
+turned away before a solver starts searching for a solution that isn't there.
+"""
+from Cube.pieces import CENTER_SLOTS, CORNER_NAMES, CORNER_SLOTS, EDGE_NAMES, EDGE_SLOTS, FACES, parity
+
+# (piece, orientation) for every way the faces of a corner or edge can be read at a position
+CORNER_READINGS = {name[-ori:] + name[:-ori] if ori else name: (piece, ori)
+                   for piece, name in enumerate(CORNER_NAMES) for ori in range(3)}
+EDGE_READINGS = {name[::-1] if flip else name: (piece, flip)
+                 for piece, name in enumerate(EDGE_NAMES) for flip in range(2)}
+
+
+def __read(colors, face_of, positions, readings, kind):
+    """
+    :return: list of pieces, sum of the orientations, or None and the reason
+    """
+    pieces = []
+    orientation = 0
+    seen = 0
+    for slots in positions:
+        faces = ''.join(face_of.get(colors[slot], '?') for slot in slots)
+        reading = readings.get(faces)
+        if reading is None:
+            return None, f"no {kind} has the colors {''.join(colors[slot] for slot in slots)}"
+        piece, ori = reading
+        if seen >> piece & 1:
+            return None, f"the {kind} {''.join(colors[slot] for slot in slots)} appears twice"
+        seen |= 1 << piece
+        pieces.append(piece)
+        orientation += ori
+    return pieces, orientation
+
+
+def check(colors):
+    """
+    :param colors: 54 colors in Cube.get_cube_colors() order, any characters
+    :return: None if the cube can be solved, otherwise the reason why not
+    """
+    if len(colors) != 54:
+        return f'expected 54 colors, got {len(colors)}'
+    face_of = {colors[slot]: face for slot, face in zip(CENTER_SLOTS, FACES)}
+    if len(face_of) != 6:
+        return 'the centers must all have different colors'
+
+    corners, twist = __read(colors, face_of, CORNER_SLOTS, CORNER_READINGS, 'corner')
+    if corners is None:
+        return twist
+    edges, flip = __read(colors, face_of, EDGE_SLOTS, EDGE_READINGS, 'edge')
+    if edges is None:
+        return flip
+    if twist % 3:
+        return 'a corner is twisted'
+    if flip % 2:
+        return 'an edge is flipped'
+    if parity(corners) != parity(edges):
+        return 'two pieces are swapped'
+    return None
+
+
+def is_solvable(colors):
+    return check(colors) is None
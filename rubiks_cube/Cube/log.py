@@ -0,0 +1,27 @@
+"""
+Verbosity switch for the Cube package.
+
+Every module logs through logging.getLogger(__name__), so all messages sit
+under the 'Cube' logger. The default is QUIET: the solver's step messages are
+dropped by a level check before any formatting happens. Call set_verbosity
+with INFO or DEBUG to print them, or configure the 'Cube' logger yourself.
+"""
+import logging
+
+QUIET = logging.WARNING
+INFO = logging.INFO
+DEBUG = logging.DEBUG
+
+logger = logging.getLogger('Cube')
+
+
+def set_verbosity(level=QUIET):
+    """
+    :param level: QUIET, INFO or DEBUG
+    :return: void
+    """
+    logger.setLevel(level)
+    if level < QUIET and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
@@ -0,0 +1,56 @@
+"""
+Precomputed move tables for the sticker engine.
+
+Every move the cube understands is turned into a single slot table once at
+import time: quarter, inverse and half turns of U, L, F, R, B, D, M, E and S
+plus the whole cube rotations mR and mL. Tables compose with bytes.translate,
+so a whole algorithm can be applied to a cube as one table (see
+notation.compose).
+"""
+from Cube.engine import TURNS
+
+IDENTITY = bytes(range(256))
+# the solver writes inverse moves with ` while the UI uses '
+INVERSE_MARKS = ('`', "'")
+
+
+def compose_tables(*tables):
+    """
+    join slot tables into one table that does them in order
+    :param tables: 256 byte translate tables
+    :return: 256 byte translate table
+    """
+    res = IDENTITY
+    for table in tables:
+        res = res.translate(table)
+    return res
+
+
+def __add_move(moves, name, clockwise, counter_clockwise):
+    moves[name] = clockwise
+    for mark in INVERSE_MARKS:
+        moves[name + mark] = counter_clockwise
+    moves[name + '2'] = compose_tables(clockwise, clockwise)
+
+
+def __build_moves():
+    moves = {}
+    for side in ['U', 'L', 'F', 'R', 'B', 'D', 'M']:
+        __add_move(moves, side, TURNS[(side, 'r')], TURNS[(side, 'l')])
+
+    # E and S the way the MainThesis app turns them: the two faces around the slice
+    __add_move(moves, 'E', compose_tables(TURNS[('D', 'r')], TURNS[('U', 'l')]),
+               compose_tables(TURNS[('D', 'l')], TURNS[('U', 'r')]))
+    __add_move(moves, 'S', compose_tables(TURNS[('F', 'r')], TURNS[('B', 'l')]),
+               compose_tables(TURNS[('F', 'l')], TURNS[('B', 'r')]))
+
+    # turning the whole cube is U, M and the opposite D
+    right = compose_tables(TURNS[('U', 'r')], TURNS[('M', 'r')], TURNS[('D', 'l')])
+    left = compose_tables(TURNS[('U', 'l')], TURNS[('M', 'l')], TURNS[('D', 'r')])
+    __add_move(moves, 'mR', right, left)
+    __add_move(moves, 'mL', left, right)
+    return moves
+
+
+MOVES = __build_moves()
+
@@ -0,0 +1,220 @@
+"""
+Parsing, composing and simplifying move sequences.
+
+A sequence is parsed once into move codes: 3 * the index of the layer in
+LAYERS plus the number of quarter turns minus one, stored in an array('B').
+mL is read as an inverse mR, so every move has exactly one code. Both cube
+engines take these codes (Cube.sequence here and apply_move in MainThesis),
+so a sequence that is replayed over and over is never split again.
+
+simplify() rewrites a sequence into an equivalent one that only turns the
+six faces, followed by at most one whole cube rotation:
+- M, E and S are replaced by the faces next to them and a rotation
+- rotations are moved to the end, relabeling the faces they pass
+- turns of the same face are merged, also across a turn of the opposite face
+The result does exactly what the original sequence did to the cube.
+"""
+import re
+from array import array
+from functools import lru_cache
+
+from Cube.engine import SIDES
+from Cube.moves import INVERSE_MARKS, MOVES, compose_tables
+
+LAYERS = SIDES + ['M', 'E', 'S', 'mR']
+FACE_COUNT = len(SIDES)
+ROTATION = LAYERS.index('mR')
+
+SUFFIXES = {'': 1, '2': 2}
+for __mark in INVERSE_MARKS:
+    SUFFIXES[__mark] = 3
+
+
+def __build_codes():
+    codes = {}
+    for layer, name in enumerate(LAYERS):
+        for suffix, turns in SUFFIXES.items():
+            codes[name + suffix] = 3 * layer + turns - 1
+    for suffix, turns in SUFFIXES.items():
+        codes['mL' + suffix] = 3 * ROTATION + (-turns) % 4 - 1
+    return codes
+
+
+CODES = __build_codes()
+# longest names first so R2 is read as one move and not as R and a stray 2
+TOKEN = re.compile('|'.join(re.escape(name) for name in sorted(CODES, key=len, reverse=True)))
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def move_name(code, mark="'"):
+    """
+    :param code: move code
+    :param mark: inverse mark to write
+    :return: the move as text
+    """
+    layer, turns = divmod(code, 3)
+    if layer == ROTATION:
+        return ('mR', 'mR2', 'mL')[turns]
+    return LAYERS[layer] + ('', '2', mark)[turns]
+
+
+def names(codes, mark="'"):
+    """
+    :return: list with the text of every move in codes
+    """
+    return [move_name(code, mark) for code in codes]
+
+
+@lru_cache(maxsize=1024)
+def parse(sequence):
+    """
+    read a sequence of moves, spaces and commas between moves are optional
+    :param sequence: e.g. "R U R` U`" or "RUR'U'"
+    :return: array('B') of move codes, shared between callers so it must not be changed
+    :raise ValueError: for text that isn't a move
+    """
+    codes = array('B')
+    pos = SEPARATORS.match(sequence).end()
+    while pos < len(sequence):
+        match = TOKEN.match(sequence, pos)
+        if match is None:
+            raise ValueError(f'unknown move {sequence[pos:].split()[0]!r}')
+        codes.append(CODES[match.group()])
+        pos = SEPARATORS.match(sequence, match.end()).end()
+    return codes
+
+
+def inverse(code):
+    """
+    :return: the code of the move that undoes code
+    """
+    return code - code % 3 + 2 - code % 3
+
+
+def codes_of(moves):
+    """
+    :param moves: sequence as text or codes
+    :return: move codes
+    """
+    return parse(moves) if isinstance(moves, str) else moves
+
+
+# the slot table of every move code
+TABLES = [MOVES[move_name(code, INVERSE_MARKS[0])] for code in range(3 * len(LAYERS))]
+
+
+@lru_cache(maxsize=1024)
+def __compose_text(sequence):
+    return compose_tables(*[TABLES[code] for code in parse(sequence)])
+
+
+def compose(moves):
+    """
+    turn a sequence of moves into one slot table
+    :param moves: sequence as text, e.g. "R U R` U`", or move codes
+    :return: 256 byte translate table
+    """
+    if isinstance(moves, str):
+        return __compose_text(moves)
+    return compose_tables(*[TABLES[code] for code in moves])
+
+
+def __relabel():
+    """
+    :return: for every face the face it becomes when it is done before mR instead of after it
+    """
+    rotation = MOVES['mR']
+    res = []
+    for face in SIDES:
+        after = compose_tables(rotation, MOVES[face])
+        for index, other in enumerate(SIDES):
+            if compose_tables(MOVES[other], rotation) == after:
+                res.append(index)
+                break
+        else:
+            raise ValueError(f'{face} has no match under mR')
+    return res
+
+
+def __expand(name, first, second):
+    """
+    :return: (face, turns) pairs and rotation turns that together do one turn of the slice name
+    """
+    target = MOVES[name]
+    for a in range(4):
+        for b in range(4):
+            for rotation in range(4):
+                table = compose_tables(*[MOVES[first]] * a, *[MOVES[second]] * b, *[MOVES['mR']] * rotation)
+                if table == target:
+                    return [(SIDES.index(first), a), (SIDES.index(second), b)], rotation
+    raise ValueError(f'{name} is not a combination of {first}, {second} and mR')
+
+
+# RELABEL[k][face] is the face to turn instead when k rotations have been moved past it
+RELABEL = [list(range(FACE_COUNT))]
+__step = __relabel()
+for __k in range(3):
+    RELABEL.append([__step[face] for face in RELABEL[-1]])
+OPPOSITE = [SIDES.index(face) for face in ['D', 'R', 'B', 'L', 'F', 'U']]
+SLICES = {LAYERS.index('M'): __expand('M', 'U', 'D'),
+          LAYERS.index('E'): __expand('E', 'U', 'D'),
+          LAYERS.index('S'): __expand('S', 'F', 'B')}
+
+
+def __push(res, face, turns):
+    """
+    add a face turn to a simplified list of [face, turns]
+    the list never holds the same face twice in a row, or more than two turns on one axis in a row
+    """
+    turns %= 4
+    if not turns:
+        return
+    if res and res[-1][0] == face:
+        index = -1
+    elif len(res) > 1 and res[-1][0] == OPPOSITE[face] and res[-2][0] == face:
+        index = -2
+    else:
+        res.append([face, turns])
+        # opposite faces commute, keep them in LAYERS order
+        if len(res) > 1 and res[-2][0] == OPPOSITE[face] and face < OPPOSITE[face]:
+            res[-1], res[-2] = res[-2], res[-1]
+        return
+    res[index][1] = (res[index][1] + turns) % 4
+    if not res[index][1]:
+        del res[index]
+
+
+def simplify_codes(codes):
+    """
+    :param codes: move codes
+    :return: array('B') of face turns with at most one rotation at the end
+    """
+    res = []
+    rotation = 0
+    for code in codes:
+        layer, turns = divmod(code, 3)
+        turns += 1
+        if layer == ROTATION:
+            rotation = (rotation + turns) % 4
+        elif layer in SLICES:
+            faces, slice_rotation = SLICES[layer]
+            for face, face_turns in faces:
+                __push(res, RELABEL[rotation][face], face_turns * turns)
+            rotation = (rotation + slice_rotation * turns) % 4
+        else:
+            __push(res, RELABEL[rotation][layer], turns)
+    codes = array('B', [3 * face + turns - 1 for face, turns in res])
+    if rotation:
+        codes.append(3 * ROTATION + rotation - 1)
+    return codes
+
+
+@lru_cache(maxsize=1024)
+def simplify(sequence, mark="'"):
+    """
+    :param sequence: string of moves
+    :param mark: inverse mark to write
+    :return: the shortest equivalent sequence this can find, as a string
+    :raise ValueError: for text that isn't a move
+    """
+    return ' '.join(names(simplify_codes(parse(sequence)), mark))
@@ -0,0 +1,77 @@
+"""
+Where the pieces of the cube are.
+
+Every corner, edge and center position is listed with the slots of its
+stickers (slot numbers as in Cube.get_cube_colors()) and the faces they
+point at. Corners and edges are numbered as in Kociemba's papers, a
+corner's U or D sticker comes first and the others follow clockwise.
+"""
+from Cube.engine import SLOT_COUNT, SLOT_NORMS, SLOT_POINTS
+
+FACES = ['U', 'R', 'F', 'D', 'L', 'B']
+FACE_NORMS = {'U': (0, -1, 0),
+              'R': (1, 0, 0),
+              'F': (0, 0, -1),
+              'D': (0, 1, 0),
+              'L': (-1, 0, 0),
+              'B': (0, 0, 1)}
+
+# corner positions URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB with the faces of
+# their stickers, the U/D sticker first and then clockwise around the corner
+CORNERS = [((1, -1, -1), 'URF'),
+           ((-1, -1, -1), 'UFL'),
+           ((-1, -1, 1), 'ULB'),
+           ((1, -1, 1), 'UBR'),
+           ((1, 1, -1), 'DFR'),
+           ((-1, 1, -1), 'DLF'),
+           ((-1, 1, 1), 'DBL'),
+           ((1, 1, 1), 'DRB')]
+
+# edge positions UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR
+EDGES = [((1, -1, 0), 'UR'),
+         ((0, -1, -1), 'UF'),
+         ((-1, -1, 0), 'UL'),
+         ((0, -1, 1), 'UB'),
+         ((1, 1, 0), 'DR'),
+         ((0, 1, -1), 'DF'),
+         ((-1, 1, 0), 'DL'),
+         ((0, 1, 1), 'DB'),
+         ((1, 0, -1), 'FR'),
+         ((-1, 0, -1), 'FL'),
+         ((-1, 0, 1), 'BL'),
+         ((1, 0, 1), 'BR')]
+
+CENTERS = [(FACE_NORMS[face], face) for face in FACES]
+
+
+def __slot_of(point, face):
+    norm = FACE_NORMS[face]
+    for slot in range(SLOT_COUNT):
+        if SLOT_POINTS[slot] == point and SLOT_NORMS[slot] == norm:
+            return slot
+    raise KeyError((point, face))
+
+
+CORNER_SLOTS = [tuple(__slot_of(point, face) for face in faces) for point, faces in CORNERS]
+EDGE_SLOTS = [tuple(__slot_of(point, face) for face in faces) for point, faces in EDGES]
+CENTER_SLOTS = [__slot_of(point, face) for point, face in CENTERS]
+
+CORNER_NAMES = [faces for _, faces in CORNERS]
+EDGE_NAMES = [faces for _, faces in EDGES]
+
+
+def parity(perm):
+    """
+    :return: 0 if perm is an even permutation, 1 if it is odd
+    """
+    # a cycle of length k is k - 1 swaps, so the parity is that of n - number of cycles
+    seen = [False] * len(perm)
+    res = len(perm)
+    for start in range(len(perm)):
+        if not seen[start]:
+            res -= 1
+            i = start
+            while not seen[i]:
+                seen[i] = True
+                i = perm[i]
+    return res % 2
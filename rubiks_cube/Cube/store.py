@@ -0,0 +1,131 @@
+"""
+On-disk store for generated lookup tables.
+
+All the tables of a solver go into one file: a header with the format
+version and a digest of the caller's schema, a directory of the tables and
+then the raw table data. Every table has a crc32 so a damaged file is noticed
+instead of giving wrong answers.
+
+Loading maps the file with mmap and hands out memoryviews into it, so a
+warm start costs almost nothing and the pages are shared by every process
+that loads the same file (the workers of a process pool for example).
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import zlib
+from array import array
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RCTABLES'
+FORMAT_VERSION = 1
+
+# magic, format version, number of tables, sha256 of the schema
+HEADER = struct.Struct('<8sII32s')
+# name, typecode, offset of the data from the start of the file, size in bytes, crc32
+ENTRY = struct.Struct('<32sc7xQQI4x')
+ALIGN = 64
+
+
+def schema_digest(schema):
+    """
+    :param schema: string that changes whenever the tables would come out different
+    :return: 32 byte digest stored in the header
+    """
+    return hashlib.sha256(schema.encode()).digest()
+
+
+def save_tables(path, schema, tables):
+    """
+    write the tables to path, the file is replaced in one step so readers never see half of it
+    :param path: file to write
+    :param schema: see schema_digest()
+    :param tables: dict of name -> array, bytearray or anything with a buffer
+    """
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(tables)
+    for name, table in tables.items():
+        data = memoryview(table)
+        offset += -offset % ALIGN
+        typecode = table.typecode if isinstance(table, array) else data.format
+        entries.append((name, typecode, offset, data.cast('B')))
+        offset += data.nbytes
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), schema_digest(schema)))
+        for name, typecode, offset, data in entries:
+            f.write(ENTRY.pack(name.encode(), typecode.encode(), offset, data.nbytes, zlib.crc32(data)))
+        for name, typecode, offset, data in entries:
+            f.write(bytes(offset - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def load_tables(path, schema, verify=True):
+    """
+    map a file written by save_tables()
+    :param path: file to read
+    :param schema: must be the same schema the file was saved with
+    :param verify: check the crc32 of every table, this reads the whole file once
+    :return: dict of name -> read only memoryview with the table's typecode
+    :raise OSError: the file can't be opened
+    :raise ValueError: the file is damaged, from another format version or another schema
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f'{path} is too short to be a table file')
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(buffer)
+    magic, version, count, digest = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a table file')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'{path} has format version {version}, expected {FORMAT_VERSION}')
+    if digest != schema_digest(schema):
+        raise ValueError(f'{path} was built for a different schema')
+    if HEADER.size + ENTRY.size * count > len(view):
+        raise ValueError(f'{path} is truncated')
+
+    tables = {}
+    for i in range(count):
+        name, typecode, offset, nbytes, crc = ENTRY.unpack_from(view, HEADER.size + ENTRY.size * i)
+        name = name.rstrip(b'\0').decode()
+        if offset + nbytes > len(view):
+            raise ValueError(f'{path} is truncated in table {name}')
+        data = view[offset:offset + nbytes]
+        if verify and zlib.crc32(data) != crc:
+            raise ValueError(f'{path} has a bad checksum in table {name}')
+        tables[name] = data.cast(typecode.decode())
+    return tables
+
+
+def load_or_build(path, schema, build):
+    """
+    load the tables from path, or build and save them if the file is missing or out of date
+    :param build: function that returns a dict of name -> table
+    :return: dict of name -> table
+    """
+    try:
+        return load_tables(path, schema)
+    except OSError:
+        pass
+    except ValueError as e:
+        logger.warning('Rebuilding tables: %s', e)
+
+    logger.info('Building tables for %s, this takes a while...', path)
+    tables = build()
+    try:
+        save_tables(path, schema, tables)
+    except OSError as e:
+        logger.warning('Could not cache tables: %s', e)
+        return tables
+    # hand out the mapped copy so every process shares the same pages
+    return load_tables(path, schema, verify=False)
@@ -0,0 +1,176 @@
+"""
+Symmetries of the cube and canonical states.
+
+The same position can be held in 24 ways, seen in a mirror (24 more ways,
+48 symmetries in all) and stickered with any six colors. canonicalize()
+maps a state to one representative of all of these: it moves the stickers
+with every symmetry, renames the colors so the centers have the colors of a
+solved Cube and keeps the smallest string. The representative is a state the
+solvers take like any other.
+
+The Transform it returns relates the two. Turning a face of the original is
+turning some face of the representative, so a solution of one is translated
+into a solution of the other move by move. A mirror swaps the direction of
+every turn.
+"""
+from itertools import permutations, product
+from operator import itemgetter
+
+from Cube.cube import Cube
+from Cube.engine import SLOT_COUNT, SLOT_NORMS, SLOT_POINTS
+from Cube.notation import LAYERS, TABLES, codes_of, names
+from Cube.pieces import CENTER_SLOTS
+
+# colors of the centers in CENTER_SLOTS order, canonical states are colored like this
+CENTER_COLORS = [Cube().get_cube_colors()[slot] for slot in CENTER_SLOTS]
+
+_SLOT_OF = {(SLOT_POINTS[slot], SLOT_NORMS[slot]): slot for slot in range(SLOT_COUNT)}
+# slot tables of the moves, to recognize a conjugated move
+_CODE_OF = {}
+for __code in range(3 * len(LAYERS)):
+    _CODE_OF.setdefault(TABLES[__code][:SLOT_COUNT], __code)
+
+
+def _apply(matrix, vector):
+    return tuple(sum(m * v for m, v in zip(row, vector)) for row in matrix)
+
+
+class Symmetry:
+    """
+    a rotation or reflection of the whole cube, given by a signed permutation matrix
+    :ivar slots: slots[s] is the slot the sticker in slot s is moved to
+    :ivar proper: True for the 24 rotations, False for the mirrored ones
+    """
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.slots = [_SLOT_OF[(_apply(matrix, SLOT_POINTS[slot]), _apply(matrix, SLOT_NORMS[slot]))]
+                      for slot in range(SLOT_COUNT)]
+        self.gather = itemgetter(*sorted(range(SLOT_COUNT), key=self.slots.__getitem__))
+        determinant = (matrix[0][0] * (matrix[1][1] * matrix[2][2] - matrix[1][2] * matrix[2][1])
+                       - matrix[0][1] * (matrix[1][0] * matrix[2][2] - matrix[1][2] * matrix[2][0])
+                       + matrix[0][2] * (matrix[1][0] * matrix[2][1] - matrix[1][1] * matrix[2][0]))
+        self.proper = determinant == 1
+        self.__codes = None
+
+    def move(self, colors):
+        """
+        :param colors: 54 colors in Cube.get_cube_colors() order
+        :return: the colors after moving every sticker with the symmetry, as a string
+        """
+        return ''.join(self.gather(colors))
+
+    def codes(self):
+        """
+        :return: for every move code the code of the move that does the same after the symmetry,
+                 None where there is no such move (a rotation around another axis than mR's)
+        """
+        if self.__codes is None:
+            slots = self.slots
+            self.__codes = []
+            for code in range(3 * len(LAYERS)):
+                table = TABLES[code]
+                conjugated = bytearray(SLOT_COUNT)
+                for slot in range(SLOT_COUNT):
+                    conjugated[slots[slot]] = slots[table[slot]]
+                self.__codes.append(_CODE_OF.get(bytes(conjugated)))
+        return self.__codes
+
+
+def __symmetries():
+    res = []
+    for axes in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            matrix = tuple(tuple(signs[row] if column == axes[row] else 0 for column in range(3))
+                           for row in range(3))
+            res.append(Symmetry(matrix))
+    return res
+
+
+# the identity comes first
+SYMMETRIES = __symmetries()
+ROTATIONS = [symmetry for symmetry in SYMMETRIES if symmetry.proper]
+
+
+class Transform:
+    """
+    takes a state to its canonical representative: move the stickers with symmetry, then rename the colors
+    """
+    def __init__(self, symmetry, colors):
+        """
+        :param symmetry: Symmetry applied first
+        :param colors: dict of original color -> canonical color
+        """
+        self.symmetry = symmetry
+        self.colors = colors
+        self.__table = str.maketrans(colors)
+        self.__back = str.maketrans({new: old for old, new in colors.items()})
+
+    def apply(self, colors):
+        """
+        :return: the canonical state of colors
+        """
+        return self.symmetry.move(colors).translate(self.__table)
+
+    def undo(self, canonical):
+        """
+        :return: the original state of the canonical state
+        """
+        moved = canonical.translate(self.__back)
+        res = [''] * SLOT_COUNT
+        for slot, target in enumerate(self.symmetry.slots):
+            res[slot] = moved[target]
+        return ''.join(res)
+
+    def moves_to_canonical(self, moves, mark="'"):
+        """
+        :param moves: moves on the original state, as text or codes
+        :param mark: inverse mark to write
+        :return: the moves that do the same to the canonical state
+        :raise ValueError: for a whole cube rotation that has no name after the symmetry
+        """
+        return self.__translate(moves, self.symmetry.codes(), mark)
+
+    def moves_from_canonical(self, moves, mark="'"):
+        """
+        :param moves: moves on the canonical state, e.g. its solution, as text or codes
+        :param mark: inverse mark to write
+        :return: the moves that do the same to the original state
+        :raise ValueError: for a whole cube rotation that has no name after the symmetry
+        """
+        codes = self.symmetry.codes()
+        back = [None] * len(codes)
+        for code, image in enumerate(codes):
+            if image is not None and back[image] is None:
+                back[image] = code
+        return self.__translate(moves, back, mark)
+
+    @staticmethod
+    def __translate(moves, table, mark):
+        res = []
+        for code in codes_of(moves):
+            image = table[code]
+            if image is None:
+                raise ValueError(f'{names([code])[0]} has no name after this symmetry')
+            res.append(image)
+        return ' '.join(names(res, mark))
+
+
+def canonicalize(colors, symmetries=SYMMETRIES):
+    """
+    find the representative of a state under the symmetries and all renamings of the colors
+    :param colors: 54 colors in Cube.get_cube_colors() order, any six characters
+    :param symmetries: SYMMETRIES for rotations and mirrors, ROTATIONS for rotations only
+    :return: (canonical state, Transform that takes colors to it)
+    :raise ValueError: if the centers aren't six different colors
+    """
+    best = None
+    for symmetry in symmetries:
+        moved = symmetry.move(colors)
+        renaming = {moved[slot]: color for slot, color in zip(CENTER_SLOTS, CENTER_COLORS)}
+        if len(renaming) != len(CENTER_COLORS):
+            raise ValueError('the centers must all have different colors')
+        candidate = moved.translate(str.maketrans(renaming))
+        if best is None or candidate < best[0]:
+            best = candidate, symmetry, renaming
+    canonical, symmetry, renaming = best
+    return canonical, Transform(symmetry, renaming)
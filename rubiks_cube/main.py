@@ -11,6 +11,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from Cube.cube import Cube
+from Cube.log import INFO, set_verbosity
 from Cube.Solver.beginners.solver import solve_3x3
 
 def test_solver_with_specific_state():
@@ -183,6 +184,9 @@ def test_m_moves_specifically():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    # Show the solver's step messages
+    set_verbosity(INFO)
+
     # Test the solver with the specific state
     test_solver_with_specific_state()
     
@@ -0,0 +1,12 @@
+"""
+Shared setup for the tests: the same import paths as the benchmarks, so
+rubiks_cube is imported as Cube and MainThesis as cube and ui.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for __package in ('rubiks_cube', 'MainThesis'):
+    __path = os.path.join(ROOT, __package)
+    if __path not in sys.path:
+        sys.path.insert(0, __path)
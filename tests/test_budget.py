@@ -0,0 +1,76 @@
+"""
+Stopping a solve that runs out of moves or time, and what it hands back.
+"""
+import pickle
+
+import pytest
+
+from Cube.cube import Cube
+from Cube.notation import parse
+from Cube.Solver.beginners.solver import STEPS, solve_3x3
+from Cube.Solver.budget import Budget, SolveCancelled, SolverStalled
+
+SCRAMBLE = "R U F' D2 L B R2 U' F D' L2 B'"
+
+
+def scrambled():
+    cube = Cube()
+    cube.sequence(SCRAMBLE)
+    return cube
+
+
+def test_budget_keeps_the_partial_moves():
+    budget = Budget(max_moves=3, max_seconds=None)
+    budget.start('first')
+    budget.charge('R')
+    assert budget.finish() == 'R'
+    budget.start('second')
+    budget.charge("U F'", 2)
+    with pytest.raises(SolverStalled) as info:
+        budget.charge('L')
+    assert info.value.stage == 'second'
+    assert info.value.moves == "R U F' L"
+    assert info.value.moves_by_step == {'first': 'R'}
+    assert 'more than 3 moves' in str(info.value)
+
+
+def test_solve_out_of_moves():
+    cube = scrambled()
+    colors = cube.get_cube_colors()
+    with pytest.raises(SolverStalled) as info:
+        solve_3x3(cube, max_moves=40)
+    stalled = info.value
+    assert stalled.stage in [name for name, _, _ in STEPS]
+    assert len(parse(stalled.moves)) > 40
+    # the steps that finished are a prefix of the moves made
+    finished = ' '.join(moves for moves in stalled.moves_by_step.values() if moves)
+    assert stalled.moves.startswith(finished)
+    assert cube.get_cube_colors() == colors
+
+
+def test_solve_out_of_time():
+    cube = scrambled()
+    with pytest.raises(SolverStalled, match='more than 0 seconds') as info:
+        solve_3x3(cube, max_seconds=0)
+    assert info.value.stage == STEPS[0][0]
+    assert info.value.moves_by_step == {}
+
+
+def test_solve_within_budget():
+    cube = scrambled()
+    solution, _ = solve_3x3(cube, max_moves=None, max_seconds=None)
+    cube = scrambled()
+    cube.sequence(solution)
+    assert cube.get_cube_colors() == Cube().get_cube_colors()
+
+
+@pytest.mark.parametrize('error', [
+    SolverStalled('Cross', "R U F'", {'Cross': "R U F'"}, 'more than 3 moves'),
+    SolveCancelled('Cross', "R U F'", {}),
+], ids=['stalled', 'cancelled'])
+def test_pickle(error):
+    # a process pool pickles the errors of its workers
+    copy = pickle.loads(pickle.dumps(error))
+    assert type(copy) is type(error)
+    assert str(copy) == str(error)
+    assert (copy.stage, copy.moves, copy.moves_by_step) == (error.stage, error.moves, error.moves_by_step)
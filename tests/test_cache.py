@@ -0,0 +1,157 @@
+"""
+The solution cache, on its own and behind the bridge.
+"""
+import pytest
+
+from Cube.cube import Cube
+from Cube.Solver.beginners.solver import solve_3x3
+from Cube.Solver.cache import SolutionCache
+from Cube.Solver.twophase.solver import solve_3x3 as solve_3x3_twophase
+from Cube.symmetry import ROTATIONS
+
+from cube import rubiks_cube_bridge
+from cube.rubiks_cube_bridge import RubiksCubeBridge
+from cube.state import CubeState
+
+SCRAMBLE = "R U F' D2 L B R2 U' F D' L2 B'"
+# turns the whole of a CubeState about the U-D axis, M is the slice between U and D
+ROTATION = "U M D'"
+
+
+def scrambled():
+    cube = Cube()
+    cube.sequence(SCRAMBLE)
+    return cube.get_cube_colors()
+
+
+def is_solved(colors):
+    return all(len(set(colors[9 * side:9 * side + 9])) == 1 for side in range(6))
+
+
+def solves(state, moves):
+    cube = Cube(state)
+    cube.sequence(moves)
+    return is_solved(cube.get_cube_colors())
+
+
+def scrambles(count):
+    res = []
+    for moves in ["R", "U", "F", "L'", "D2", "B"][:count]:
+        cube = Cube()
+        cube.sequence(SCRAMBLE + ' ' + moves)
+        res.append(cube.get_cube_colors())
+    return res
+
+
+def test_hit_and_miss():
+    cache = SolutionCache()
+    state = scrambled()
+    assert cache.get(state) is None
+    solution, moves_by_step = cache.solve(state, solve_3x3)
+    assert solves(state, solution)
+    assert cache.get(state) == (solution, moves_by_step)
+    # the caller may change what it gets back
+    cache.get(state)[1].clear()
+    assert cache.get(state)[1] == moves_by_step
+    assert cache.stats() == {'hits': 3, 'misses': 2, 'evictions': 0, 'disk_hits': 0, 'size': 1}
+
+
+def test_evicts_least_recently_used():
+    cache = SolutionCache(maxsize=2)
+    first, second, third = scrambles(3)
+    for state in (first, second):
+        cache.solve(state, solve_3x3)
+    cache.get(first)
+    cache.solve(third, solve_3x3)
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_kept_on_disk(tmp_path):
+    path = str(tmp_path / 'solutions.sqlite')
+    state = scrambled()
+    cache = SolutionCache(path=path)
+    expected = cache.solve(state, solve_3x3)
+    cache.close()
+
+    cache = SolutionCache(path=path)
+    assert cache.get(state) == expected
+    assert cache.stats()['disk_hits'] == 1
+    # solvers share the file, not the solutions
+    assert SolutionCache('twophase', path=path).get(state) is None
+    cache.clear()
+    assert SolutionCache(path=path).get(state) is None
+
+
+@pytest.mark.parametrize('solver', [solve_3x3, solve_3x3_twophase], ids=['beginners', 'twophase'])
+def test_rotated_state_hits(solver):
+    cache = SolutionCache(symmetric=True)
+    state = scrambled()
+    cache.solve(state, solver)
+    for rotation in ROTATIONS[1:]:
+        rotated = rotation.move(state)
+        solution, moves_by_step = cache.solve(rotated, solver)
+        assert solves(rotated, solution)
+        assert solves(rotated, ' '.join(moves_by_step.values()))
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == len(ROTATIONS) - 1
+
+
+def test_rotated_state_stored_first():
+    # the beginners solver can't solve a cube held with the centers out of place, the cache can
+    cache = SolutionCache(symmetric=True)
+    state = scrambled()
+    rotated = ROTATIONS[5].move(state)
+    assert solves(rotated, cache.solve(rotated, solve_3x3)[0])
+    assert solves(state, cache.get(state)[0])
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    monkeypatch.setitem(rubiks_cube_bridge.SOLUTION_CACHES, 'beginners', SolutionCache(symmetric=True))
+    return RubiksCubeBridge(profile=True)
+
+
+def test_bridge_rotated_scan_hits(bridge):
+    state = CubeState()
+    state.set_solved()
+    state.sequence(SCRAMBLE)
+    rotated = state.copy()
+    rotated.sequence(ROTATION)
+
+    solution, _ = bridge.solve_with_rubiks_cube(rotated)
+    assert not bridge.cache_hit
+    assert bridge.solve_stats is not None
+    rotated.sequence(solution)
+    # solved the way round it was held, every face one color but not the colors of set_solved
+    assert rotated.is_solved()
+
+    solution, _ = bridge.solve_with_rubiks_cube(state)
+    assert bridge.cache_hit
+    assert bridge.solve_stats is None
+    state.sequence(solution)
+    assert state.is_solved()
+
+
+def test_is_solved_held_another_way():
+    state = CubeState()
+    state.set_solved()
+    state.sequence(ROTATION)
+    assert state.is_solved()
+    state.sequence('R')
+    assert not state.is_solved()
+    assert not CubeState().is_solved()
+
+
+def test_bridge_counts_only_when_profiling(bridge):
+    bridge.profile = False
+    state = CubeState()
+    state.set_solved()
+    state.sequence(SCRAMBLE)
+    bridge.solve_with_rubiks_cube(state)
+    assert not bridge.cache_hit
+    assert bridge.solve_stats is None
+    bridge.solve_with_rubiks_cube(state)
+    assert bridge.cache_hit
@@ -0,0 +1,42 @@
+"""
+The ring of camera frames shared by the capture thread and its readers.
+"""
+import numpy as np
+
+from ui.camera import FrameRing
+
+CORNERS = np.float32([[10, 10], [50, 10], [50, 50], [10, 50]])
+
+
+def capture(ring, count):
+    """write count frames the way the capture thread does, every one filled with its number"""
+    for n in range(ring.count, ring.count + count):
+        frame = ring.next_slot()
+        if frame is None:
+            frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        frame[:] = n
+        ring.publish(frame, float(n + 1), CORNERS + n if n % 2 else None)
+
+
+def test_last_n_outlives_the_ring():
+    ring = FrameRing(size=4)
+    capture(ring, 6)
+    frames = ring.last_n(3)
+    assert [timestamp for _, timestamp, _ in frames] == [4.0, 5.0, 6.0]
+    # the capture thread goes round the whole ring, the copies keep what they had
+    capture(ring, 4)
+    assert ring.last_n(1)[0][1] == 10.0
+    assert [int(frame[0, 0, 0]) for frame, _, _ in frames] == [3, 4, 5]
+    assert [corners is None for _, _, corners in frames] == [False, True, False]
+    assert np.array_equal(frames[0][2], CORNERS + 3)
+
+
+def test_last_n_limits():
+    ring = FrameRing(size=4)
+    assert ring.last_n(3) == []
+    capture(ring, 2)
+    assert len(ring.last_n(3)) == 2
+    capture(ring, 4)
+    # the slot the next frame is decoded into is never handed out
+    assert len(ring.last_n(10)) == 3
+    assert [timestamp for _, timestamp, _ in ring.last_n(3, since=4.5)] == [5.0, 6.0]
@@ -0,0 +1,70 @@
+"""
+Finding the face of the cube in synthetic frames, no camera needed.
+"""
+import cv2
+import numpy as np
+import pytest
+
+from ui.detection import FaceDetector, patch_cell_means, warp_face
+
+WIDTH, HEIGHT = 1280, 720
+# BGR colors of the stickers
+STICKERS = [(255, 255, 255), (0, 220, 255), (0, 0, 200), (0, 128, 255), (0, 160, 0), (200, 60, 0)]
+SIZE = 154
+BORDER = 6
+GAP = 5
+# Pixels the corners found may be off by
+TOLERANCE = 2
+
+
+def frame(center, angle, seed=1):
+    """
+    a face of nine stickers on dark plastic over noise
+    :return: the frame, corners of the stickers, BGR colors of the stickers row by row
+    """
+    rng = np.random.default_rng(seed)
+    image = rng.normal(110, 25, (HEIGHT, WIDTH, 3)).clip(0, 255).astype(np.uint8)
+    rotation = cv2.getRotationMatrix2D((0, 0), angle, 1)[:, :2]
+
+    def points(x0, y0, x1, y1):
+        corners = np.float32([[x0, y0], [x1, y0], [x1, y1], [x0, y1]]) - SIZE / 2
+        return corners @ rotation.T + np.float32(center)
+
+    cv2.fillConvexPoly(image, np.round(points(-BORDER, -BORDER, SIZE + BORDER, SIZE + BORDER)).astype(np.int32),
+                       (20, 20, 20))
+    colors = []
+    side = (SIZE - 2 * GAP) / 3
+    for row in range(3):
+        for col in range(3):
+            color = STICKERS[rng.integers(len(STICKERS))]
+            colors.append(color)
+            x0, y0 = col * (side + GAP), row * (side + GAP)
+            sticker = points(x0, y0, x0 + side, y0 + side)
+            cv2.fillConvexPoly(image, np.round(sticker).astype(np.int32), color)
+    return image, points(0, 0, SIZE, SIZE), colors
+
+
+@pytest.mark.parametrize('center, angle', [((640, 360), 0), ((400, 300), 12), ((900, 450), -20)])
+def test_corners(center, angle):
+    image, corners, colors = frame(center, angle)
+    found = FaceDetector().detect(image)
+    assert found is not None
+    assert np.abs(found - corners).max() <= TOLERANCE
+    means = patch_cell_means(warp_face(image, found)).reshape(9, 3).astype(int)
+    assert np.abs(means - np.array(colors)).max() < 30
+
+
+def test_tracks_a_moving_face():
+    detector = FaceDetector()
+    for step in range(12):
+        # smoothing trails a moving face, it catches up once the face is held still
+        moved = min(step, 6)
+        image, corners, _ = frame((500 + 8 * moved, 300 + 4 * moved), 10 + moved, seed=step)
+        found = detector.detect(image)
+        assert found is not None
+    assert np.abs(found - corners).max() <= TOLERANCE
+
+
+def test_no_face():
+    image = np.random.default_rng(2).normal(110, 25, (HEIGHT, WIDTH, 3)).clip(0, 255).astype(np.uint8)
+    assert FaceDetector().detect(image) is None
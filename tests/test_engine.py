@@ -0,0 +1,25 @@
+"""
+The sticker index the solvers look pieces up in.
+"""
+from Cube.cube import Cube
+from Cube.engine import EDGE
+
+
+def test_piece_follows_turns():
+    cube = Cube()
+    before = cube.stickers.piece(('g', 'r'))
+    cube.sequence('R U F` D2')
+    # a cubie keeps its stickers, only where they are changes
+    assert cube.stickers.piece(('r', 'g')) == before
+    assert sorted(cube.cells[i].color for i in before) == ['g', 'r']
+    assert sorted(cube.stickers.neighbors(before[0]) + [before[0]]) == list(before)
+
+
+def test_piece_after_recolor():
+    cube = Cube()
+    edge = cube.stickers.piece(('g', 'r'))
+    other = cube.stickers.piece(('y', 'r'))
+    cube.stickers.set_color(edge[0], 'y')
+    cube.stickers.set_color(edge[1], 'r')
+    assert cube.stickers.piece(('y', 'r')) in (edge, other)
+    assert len(cube.stickers.find(EDGE, 'y')) == 5
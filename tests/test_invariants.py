@@ -0,0 +1,38 @@
+"""
+Cubes the solvers turn away before they start.
+"""
+import pytest
+
+from Cube.cube import Cube
+from Cube.Solver.beginners.solver import solve_3x3
+from Cube.Solver.cache import SolutionCache
+
+from cube import rubiks_cube_bridge
+from cube.rubiks_cube_bridge import RubiksCubeBridge
+from cube.state import CubeState
+
+
+def test_beginners_rejects_moved_centers():
+    cube = Cube()
+    cube.move('r')
+    with pytest.raises(ValueError, match='centers'):
+        solve_3x3(cube)
+
+
+def test_beginners_rejects_impossible_cube():
+    cube = Cube()
+    colors = list(cube.get_cube_colors())
+    # two stickers of one corner swapped twist it, no turns can untwist it
+    colors[0], colors[9] = colors[9], colors[0]
+    with pytest.raises(ValueError, match="can't be solved"):
+        solve_3x3(Cube(''.join(colors)))
+
+
+def test_bridge_passes_moved_centers_through(monkeypatch):
+    # the bridge's own caches solve every state with the centers in place, a plain one doesn't
+    monkeypatch.setitem(rubiks_cube_bridge.SOLUTION_CACHES, 'beginners', SolutionCache())
+    state = CubeState()
+    state.set_solved()
+    state.sequence('mR')
+    with pytest.raises(ValueError, match='centers'):
+        RubiksCubeBridge().solve_with_rubiks_cube(state)
@@ -0,0 +1,55 @@
+"""
+Reading moves in MainThesis, with and without rubiks_cube.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Cube import notation
+
+from cube import notation as main_notation
+
+SEQUENCES = ["R U R' U'", "R U` R2 mL M2 E' S", "RUR'U'", "F, B2, mR, mR2, mL2", "L' D2 B`"]
+MAIN_THESIS = os.path.dirname(os.path.dirname(os.path.abspath(main_notation.__file__)))
+
+
+@pytest.fixture
+def local_notation(monkeypatch):
+    """cube.notation loaded again as if rubiks_cube weren't installed"""
+    monkeypatch.setitem(sys.modules, 'Cube', None)
+    monkeypatch.setitem(sys.modules, 'Cube.notation', None)
+    spec = importlib.util.spec_from_file_location('local_notation', main_notation.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_shares_rubiks_cube_parser():
+    assert main_notation.parse is notation.parse
+
+
+@pytest.mark.parametrize('sequence', SEQUENCES)
+def test_local_parser_matches(local_notation, sequence):
+    assert local_notation.parse is not notation.parse
+    codes = local_notation.parse(sequence)
+    assert codes == notation.parse(sequence)
+    assert local_notation.names(codes) == notation.names(codes)
+    assert [local_notation.inverse(code) for code in codes] == [notation.inverse(code) for code in codes]
+
+
+def test_local_parser_rejects(local_notation):
+    with pytest.raises(ValueError, match='unknown move'):
+        local_notation.parse('R Q')
+
+
+def test_main_thesis_without_rubiks_cube():
+    script = ("import sys; sys.modules['Cube'] = None\n"
+              "from cube.rubiks_cube_bridge import RUBIKS_CUBE_AVAILABLE\n"
+              "from cube.state import CubeState\n"
+              "state = CubeState(); state.set_solved(); state.sequence(\"R U R' U'\" * 6)\n"
+              "assert not RUBIKS_CUBE_AVAILABLE and state.is_solved()\n")
+    result = subprocess.run([sys.executable, '-c', script], cwd=MAIN_THESIS, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,40 @@
+"""
+Per-step stats of a solve.
+"""
+from Cube.cube import Cube
+from Cube.Solver.beginners.solver import STEPS, solve_3x3
+from Cube.Solver.budget import Budget
+from Cube.Solver.profile import ProfiledCube, SolveStats
+
+SCRAMBLE = "R U F' D2 L B R2 U' F D' L2 B'"
+
+
+def test_sticker_reads():
+    stats = SolveStats()
+    stats.start('step')
+    cube = ProfiledCube(Cube(), Budget(), stats)
+    cube.get_side_in_matrix('U')
+    assert stats.current.reads == 9
+    cube.get_cube_colors()
+    assert stats.current.reads == 9 + 54
+    corners = cube.stickers.find(3)
+    assert stats.current.reads == 9 + 54
+    [cube.cells[i] for i in corners]
+    assert stats.current.reads == 9 + 54 + 24
+    cube.turn('U', 'r')
+    cube.sequence("R U R'")
+    assert stats.current.turns == 2
+
+
+def test_solve_stats():
+    cube = Cube()
+    cube.sequence(SCRAMBLE)
+    stats = SolveStats()
+    solution, moves_by_step = solve_3x3(cube, stats=stats)
+    assert list(stats.steps) == [name for name, _, _ in STEPS]
+    assert all(step.reads > 0 for step in stats.steps.values())
+    assert stats.moves_after == len(solution.split())
+    assert stats.moves_before >= stats.moves_after
+    assert sum(step.moves_after for step in stats.steps.values()) == \
+        sum(len(moves.split()) for moves in moves_by_step.values())
+    assert set(stats.as_dict()['steps'][STEPS[0][0]]) == {'seconds', 'turns', 'reads', 'moves_before', 'moves_after'}
@@ -0,0 +1,125 @@
+"""
+Solving on a worker thread while the window keeps running.
+"""
+import time
+
+import pytest
+
+from Cube.Solver.budget import SolveCancelled
+from Cube.Solver.cache import SolutionCache
+
+from cube import rubiks_cube_bridge
+from cube.constants import FACE_OFFSETS, Face
+from cube.state import CubeState
+from ui.solving import SolveResult, SolveTask
+
+SCRAMBLE = "R U F' D2 L B R2 U' F D' L2 B'"
+TIMEOUT = 30
+
+
+class FakeWidget:
+    """Runs after() callbacks in order on the calling thread, like Tk's event loop would"""
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append((time.monotonic() + ms / 1000, callback))
+
+    def run(self):
+        deadline = time.monotonic() + TIMEOUT
+        while self.pending:
+            assert time.monotonic() < deadline, "the solve never finished"
+            self.pending.sort(key=lambda item: item[0])
+            when, callback = self.pending.pop(0)
+            time.sleep(max(0.0, when - time.monotonic()))
+            callback()
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    # every test asks the solver, a cached solution would be handed back without it
+    for name in rubiks_cube_bridge.SOLVERS:
+        monkeypatch.setitem(rubiks_cube_bridge.SOLUTION_CACHES, name, SolutionCache(name, symmetric=True))
+
+
+def scrambled():
+    state = CubeState()
+    state.set_solved()
+    state.sequence(SCRAMBLE)
+    return state
+
+
+def solve(task_state, solver='beginners', cancel_after=None):
+    """
+    :param cancel_after: cancel the task once this many progress messages came in, None to let it finish
+    :return: the task and what its callbacks were called with
+    """
+    widget = FakeWidget()
+    calls = []
+
+    def on_progress(*stage):
+        calls.append(('progress', stage))
+        if cancel_after is not None and len(calls) >= cancel_after:
+            task.cancel()
+
+    task = SolveTask(widget, task_state, on_progress, lambda result: calls.append(('done', result)),
+                     lambda error: calls.append(('error', error)), solver)
+    if cancel_after == 0:
+        task.cancel()
+    task.start()
+    widget.run()
+    task.thread.join(TIMEOUT)
+    return task, calls
+
+
+@pytest.mark.parametrize('solver', ['beginners', 'twophase'])
+def test_solves(solver):
+    state = scrambled()
+    task, calls = solve(state, solver)
+    kind, result = calls[-1]
+    assert kind == 'done'
+    assert isinstance(result, SolveResult)
+    assert result.verified
+    assert [kind for kind, _ in calls[:-1]] == ['progress'] * (len(calls) - 1)
+    assert not task.is_running()
+    # the task solved a copy
+    assert not state.is_solved()
+
+
+@pytest.mark.parametrize('solver', ['beginners', 'twophase'])
+def test_cancel_before_start(solver):
+    task, calls = solve(scrambled(), solver, cancel_after=0)
+    assert task.cancelled
+    assert calls[-1][0] == 'error'
+    assert isinstance(calls[-1][1], SolveCancelled)
+    assert not any(kind == 'done' for kind, _ in calls)
+
+
+def test_cancel_while_solving(monkeypatch):
+    beginners = rubiks_cube_bridge.SOLVERS['beginners']
+
+    def slow(cube, progress, cancel, stats):
+        def wait(name, number, count):
+            progress(name, number, count)
+            # the first step is reported and then takes until the Tk thread cancels
+            if number == 2:
+                cancel.wait(TIMEOUT)
+        return beginners(cube, progress=wait, cancel=cancel, stats=stats)
+
+    monkeypatch.setitem(rubiks_cube_bridge.SOLVERS, 'beginners', slow)
+    task, calls = solve(scrambled(), cancel_after=1)
+    assert task.cancelled
+    assert isinstance(calls[-1][1], SolveCancelled)
+    assert calls[-1][1].stage == 'Yellow corners'
+    assert 'Yellow cross' in calls[-1][1].moves_by_step
+
+
+def test_errors_reach_on_error():
+    state = scrambled()
+    # a corner sticker swapped with an edge sticker makes pieces no cube has
+    up, front = FACE_OFFSETS[Face.UP], FACE_OFFSETS[Face.FRONT] + 1
+    state.stickers[up], state.stickers[front] = state.stickers[front], state.stickers[up]
+    _, calls = solve(state)
+    assert calls[-1][0] == 'error'
+    assert isinstance(calls[-1][1], ValueError)
+    assert "can't be solved" in str(calls[-1][1])
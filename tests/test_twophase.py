@@ -0,0 +1,33 @@
+"""
+The two-phase solver.
+"""
+import pytest
+
+from Cube.cube import Cube
+from Cube.Solver.profile import SolveStats
+from Cube.Solver.twophase.solver import LONGEST, MAX_LENGTH, solve_3x3
+
+SCRAMBLE = "R U F' D2 L B R2 U' F D' L2 B'"
+
+
+@pytest.mark.parametrize('max_length', [MAX_LENGTH, LONGEST, LONGEST + 10])
+def test_solves(max_length):
+    cube = Cube()
+    cube.sequence(SCRAMBLE)
+    solution, phases = solve_3x3(cube, max_length=max_length)
+    assert len(solution.split()) <= min(max_length, LONGEST)
+    assert ' '.join(moves for moves in phases.values() if moves) == solution
+    cube.sequence(solution)
+    assert cube.get_cube_colors() == Cube().get_cube_colors()
+
+
+def test_stats_per_phase():
+    cube = Cube()
+    cube.sequence(SCRAMBLE)
+    stats = SolveStats()
+    solution, phases = solve_3x3(cube, stats=stats)
+    assert list(stats.steps) == list(phases)
+    for name, moves in phases.items():
+        assert stats.steps[name].moves_before == stats.steps[name].moves_after == len(moves.split())
+    assert stats.moves_after == len(solution.split())
+    assert 0 < sum(step.seconds for step in stats.steps.values()) <= stats.seconds
@@ -0,0 +1,62 @@
+"""
+Checking scanned cubes and correcting the stickers the camera wasn't sure of.
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from cube import validation
+from cube.constants import FACE_OFFSETS, Face
+from cube.state import CubeState
+from cube.validation import LOCKED, correct, find_problems
+
+MAIN_THESIS = os.path.dirname(os.path.dirname(os.path.abspath(validation.__file__)))
+
+
+def misread():
+    """a solved cube with one corner sticker read as the color of the opposite face"""
+    state = CubeState()
+    state.set_solved()
+    up = state.get_face(Face.UP)
+    down = state.get_face(Face.DOWN)
+    wrong = down[1][1]
+    right = up[0][0]
+    up[0][0] = wrong
+    return state, right, wrong
+
+
+def test_valid_cube():
+    state = CubeState()
+    state.set_solved()
+    assert find_problems(state) == []
+    assert correct(state, np.ones(54)) == []
+
+
+@pytest.mark.parametrize('sure, corrected', [(0.9, True), (LOCKED, False), (1.0, False)])
+def test_locked_stickers(sure, corrected):
+    state, right, wrong = misread()
+    assert find_problems(state)
+    confidence = np.full(54, LOCKED)
+    confidence[FACE_OFFSETS[Face.UP]] = sure
+    corrections = correct(state, confidence)
+    if corrected:
+        assert [(c.face, c.row, c.col, c.old, c.new) for c in corrections] == [(Face.UP, 0, 0, wrong, right)]
+    else:
+        assert corrections is None
+
+
+def test_without_rubiks_cube():
+    script = ("import sys; sys.modules['Cube'] = None\n"
+              "import numpy as np\n"
+              "from cube.validation import PIECES_AVAILABLE, correct, find_problems\n"
+              "from cube.constants import Face\n"
+              "from cube.state import CubeState\n"
+              "state = CubeState(); state.set_solved()\n"
+              "assert not PIECES_AVAILABLE and find_problems(state) == [] and correct(state, np.ones(54)) is None\n"
+              "state.get_face(Face.UP)[0][0] = None\n"
+              "assert find_problems(state) == ['Not every sticker has a color']\n")
+    result = subprocess.run([sys.executable, '-c', script], cwd=MAIN_THESIS, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr